@@ -0,0 +1,237 @@
+# benchmarks/fake_joplin.py
+
+"""
+Local stand-in for the Joplin Data API (the endpoints our sync paths use:
+/ping, /search, /folders, /notes), for benchmarks and offline runs.
+
+    server = FakeJoplin(latency=0.002, rate_429=0.01).start()
+    server.seed_notes(["Atlanta Hawks", ...])
+    os.environ["JOPLIN_API"] = server.url
+    ...
+    print(server.stats())
+    server.stop()
+
+Every request except /ping can be delayed by `latency` seconds and answered
+with a 429 at `rate_429` probability (with a Retry-After header when
+`retry_after` is set), so retry and throttle behaviour shows up in timings.
+Connections are HTTP/1.1 keep-alive like the real clipper server.
+"""
+
+import json
+import time
+import random
+import threading
+from collections import Counter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+NOTEBOOK_ID = "bench0000000000000000000000notebook"
+DEFAULT_PAGE_SIZE = 100
+
+
+class FakeJoplin:
+    def __init__(self, latency=0.0, rate_429=0.0, retry_after=None, seed=0, notebook_id=NOTEBOOK_ID):
+        self.latency = latency
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.notebook_id = notebook_id
+        self.folders = {notebook_id: {"id": notebook_id, "title": "Benchmark", "parent_id": ""}}
+        self.notes = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.RLock()
+        self._next_id = 0
+        self._clock = 0
+        self._counts = Counter()
+        self._server = None
+
+    # ---- Lifecycle ----
+
+    def start(self, host="127.0.0.1", port=0):
+        handler = type("Handler", (_Handler,), {"joplin": self})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    # ---- State ----
+
+    def _timestamp(self):
+        # Strictly increasing, like updated_time after every write
+        self._clock = max(self._clock + 1, int(time.time() * 1000))
+        return self._clock
+
+    def add_note(self, title, body="", parent_id=None):
+        with self._lock:
+            self._next_id += 1
+            note_id = f"{self._next_id:032x}"
+            now = self._timestamp()
+            note = {"id": note_id, "title": title, "body": body, "parent_id": parent_id or self.notebook_id,
+                    "created_time": now, "updated_time": now}
+            self.notes[note_id] = note
+            return dict(note)
+
+    def seed_notes(self, titles, body=""):
+        for title in titles:
+            self.add_note(title, body)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counts)
+
+    def reset_stats(self):
+        with self._lock:
+            self._counts.clear()
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self._counts[key] += amount
+
+    def _throttled(self):
+        with self._lock:
+            return self.rate_429 > 0 and self._rng.random() < self.rate_429
+
+
+def _select(item, params):
+    fields = params.get("fields")
+    if not fields:
+        return dict(item)
+    return {field: item[field] for field in fields.split(",") if field in item}
+
+
+def _page(items, params):
+    limit = int(params.get("limit") or DEFAULT_PAGE_SIZE)
+    page = int(params.get("page") or 1)
+    chunk = items[(page - 1) * limit:page * limit]
+    return {"items": [_select(item, params) for item in chunk], "has_more": page * limit < len(items)}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # One write per response (headers + body); unbuffered writes stall on delayed ACKs
+    wbufsize = 1 << 16
+    disable_nagle_algorithm = True
+    joplin = None  # set per server in FakeJoplin.start
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, payload=None, headers=None):
+        body = b"" if payload is None else (
+            payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8"))
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json" if not isinstance(payload, bytes) else "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        self.joplin._count("bytes_out", len(body))
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        self.joplin._count("bytes_in", len(raw))
+        return json.loads(raw) if raw else {}
+
+    def _handle(self, method):
+        joplin = self.joplin
+        url = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split("/") if part]
+        body = self._read_json() if method in ("POST", "PUT") else None
+
+        endpoint = parts[0] if parts else ""
+        joplin._count(f"{method} /{endpoint}")
+        if endpoint == "ping":
+            return self._reply(200, b"JoplinClipperServer")
+
+        if joplin.latency:
+            time.sleep(joplin.latency)
+        if joplin._throttled():
+            joplin._count("429")
+            headers = {"Retry-After": str(joplin.retry_after)} if joplin.retry_after is not None else None
+            return self._reply(429, {"error": "Too many requests"}, headers)
+
+        route = getattr(self, f"_{method.lower()}_{endpoint}", None)
+        if route is None:
+            return self._reply(404, {"error": f"Not found: {url.path}"})
+        return route(parts[1:], params, body)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+    # ---- Routes ----
+
+    def _get_search(self, parts, params, body):
+        query = params.get("query", "").strip()
+        if query.startswith("title:"):
+            query = query[len("title:"):]
+        query = query.strip('"').lower()
+        with self.joplin._lock:
+            matches = [note for note in self.joplin.notes.values() if query in note["title"].lower()]
+        return self._reply(200, _page(matches, params))
+
+    def _get_folders(self, parts, params, body):
+        joplin = self.joplin
+        if not parts:
+            return self._reply(200, _page(list(joplin.folders.values()), params))
+        folder = joplin.folders.get(parts[0])
+        if folder is None:
+            return self._reply(404, {"error": "Not found"})
+        if len(parts) > 1 and parts[1] == "notes":
+            with joplin._lock:
+                notes = [note for note in joplin.notes.values() if note["parent_id"] == parts[0]]
+            return self._reply(200, _page(notes, params))
+        return self._reply(200, _select(folder, params))
+
+    def _get_notes(self, parts, params, body):
+        joplin = self.joplin
+        if not parts:
+            with joplin._lock:
+                notes = list(joplin.notes.values())
+            return self._reply(200, _page(notes, params))
+        note = joplin.notes.get(parts[0])
+        if note is None:
+            return self._reply(404, {"error": "Not found"})
+        return self._reply(200, _select(note, params))
+
+    def _post_notes(self, parts, params, body):
+        note = self.joplin.add_note(body.get("title", ""), body.get("body", ""), body.get("parent_id"))
+        return self._reply(200, note)
+
+    def _put_notes(self, parts, params, body):
+        joplin = self.joplin
+        with joplin._lock:
+            note = joplin.notes.get(parts[0]) if parts else None
+            if note is not None:
+                note.update({key: value for key, value in body.items() if key != "id"})
+                note["updated_time"] = joplin._timestamp()
+                note = dict(note)
+        if note is None:
+            return self._reply(404, {"error": "Not found"})
+        return self._reply(200, note)
+
+    def _delete_notes(self, parts, params, body):
+        with self.joplin._lock:
+            self.joplin.notes.pop(parts[0] if parts else None, None)
+        return self._reply(200)
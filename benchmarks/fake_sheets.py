@@ -0,0 +1,228 @@
+# benchmarks/fake_sheets.py
+
+"""
+In-process stand-ins for the Google Sheets and Drive clients, plus local
+workbooks with the same synthetic teams, for benchmarks.
+
+    sheets = FakeSheets(team_sheet_ids(300), latency=0.01, rate_429=0.02)
+    sheets.open_by_key(sheet_id).worksheet("Roster").batch_get(["C8:K27", "Q6:Q10"])
+    FakeDrive(sheets).files().list(...).execute()
+
+FakeSheets quacks like a gspread client for the calls joplin_sync makes
+(open_by_key, worksheet, batch_get, get, acell). Every call can sleep for
+`latency` seconds and fail with a 429 at `rate_429` probability; the error
+carries a Retry-After header like the real API, so the throttle's backoff
+path runs. Cell contents are generated once up front from a seed, so every
+run (and every commit) reads the same league.
+"""
+
+import os
+import sys
+import time
+import random
+import threading
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from joplin.utils.range_planner import parse_a1
+from league.money import format_money
+
+ROWS, COLS = 30, 20  # A1:T30 covers every md_var_map range
+PAYROLL_ROWS = range(8, 28)
+NAME_COL = 3                       # C
+SALARY_COLS = (4, 8, 10)           # D, H, J
+STATUS_COLS = (5, 9, 11)           # E, I, K
+STATUSES = ["", "", "", "", "🔵", "🟢", "⚪", "🔴"]
+
+
+def team_names(count):
+    return [f"Team {n:04d}" for n in range(1, count + 1)]
+
+
+def team_sheet_ids(count):
+    """team name → fake spreadsheet id, in the shape of teamsheets.yaml URLs' ids."""
+    return {team: f"bench{n:04d}{'x' * 35}" for n, team in enumerate(team_names(count), start=1)}
+
+
+def _money(rng, low, high):
+    return format_money(rng.randint(low, high))
+
+
+def roster_grid(seed):
+    """One team's Roster tab as a ROWS × COLS grid of display strings."""
+    rng = random.Random(seed)
+    grid = [["" for _ in range(COLS)] for _ in range(ROWS)]
+    for row in range(ROWS):
+        for col in range(COLS):
+            grid[row][col] = _money(rng, -30_000_000, 60_000_000) if rng.random() < 0.3 else ""
+
+    players = rng.randint(12, 17)
+    for slot, row in enumerate(PAYROLL_ROWS):
+        cells = grid[row - 1]
+        signed = slot < players
+        cells[NAME_COL - 1] = f"Player {seed % 10_000:04d}-{slot:02d}" if signed else ""
+        years = rng.randint(1, 3)
+        for season, (sal_col, stat_col) in enumerate(zip(SALARY_COLS, STATUS_COLS)):
+            paid = signed and season < years
+            cells[sal_col - 1] = _money(rng, 1_200_000, 55_000_000) if paid else ""
+            cells[stat_col - 1] = rng.choice(STATUSES) if paid else ""
+    return grid
+
+
+def workbook_values(seed):
+    """(cell → value) for the cells joplin_local_sync reads from one team worksheet."""
+    rng = random.Random(seed)
+    values = {f"Q{row}": _money(rng, -40_000_000, 60_000_000) for row in (3, 4, 6, 7)}
+    for row, amount_cell in ((11, None), (12, "S12"), (13, "S13"), (14, "S14")):
+        values[f"Q{row}"] = rng.choice(["Yes", "No"])
+        if amount_cell:
+            values[amount_cell] = _money(rng, 0, 14_000_000)
+    for n in range(rng.randint(0, 4)):
+        values[f"Q{17 + n}"] = f"TPE Player {n + 1}"
+        values[f"R{17 + n}"] = _money(rng, 1_000_000, 20_000_000)
+    return values
+
+
+# ---- Sheets / Drive fakes ----
+
+class FakeQuotaError(Exception):
+    """Looks like gspread's APIError on a 429 to throttle.quota_error_info."""
+
+    def __init__(self, retry_after):
+        super().__init__("429 RESOURCE_EXHAUSTED: Quota exceeded (fake)")
+        self.response = SimpleNamespace(status_code=429, headers={"Retry-After": str(retry_after)})
+
+
+class FakeSheets:
+    def __init__(self, sheet_ids, latency=0.0, rate_429=0.0, retry_after=0.01, seed=0):
+        """`sheet_ids` is team → spreadsheet id (see team_sheet_ids)."""
+        self.latency = latency
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.sheets = {sheet_id: roster_grid(seed * 1_000_003 + n) for n, sheet_id in enumerate(sheet_ids.values())}
+        self.names = {sheet_id: team for team, sheet_id in sheet_ids.items()}
+        self.calls = 0
+        self.quota_errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _api_call(self):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.calls += 1
+            throttled = self.rate_429 > 0 and self._rng.random() < self.rate_429
+            if throttled:
+                self.quota_errors += 1
+        if throttled:
+            raise FakeQuotaError(self.retry_after)
+
+    def stats(self):
+        with self._lock:
+            return {"calls": self.calls, "quota_errors": self.quota_errors}
+
+    def open_by_key(self, key):
+        self._api_call()
+        if key not in self.sheets:
+            raise KeyError(f"Spreadsheet not found: {key}")
+        return FakeSpreadsheet(self, key)
+
+
+class FakeSpreadsheet:
+    def __init__(self, client, key):
+        self.client = client
+        self.id = key
+
+    def worksheet(self, title):
+        self.client._api_call()
+        return FakeWorksheet(self.client, self.client.sheets[self.id], title)
+
+
+class FakeWorksheet:
+    def __init__(self, client, grid, title):
+        self.client = client
+        self.grid = grid
+        self.title = title
+
+    def _values(self, cell_range):
+        rect = parse_a1(cell_range)
+        rows = [
+            [self.grid[r - 1][c - 1] if r <= ROWS and c <= COLS else "" for c in range(rect.col1, rect.col2 + 1)]
+            for r in range(rect.row1, rect.row2 + 1)
+        ]
+        # The API trims trailing empty cells and rows
+        for row in rows:
+            while row and row[-1] == "":
+                row.pop()
+        while rows and not rows[-1]:
+            rows.pop()
+        return rows
+
+    def batch_get(self, ranges):
+        self.client._api_call()
+        return [self._values(cell_range) for cell_range in ranges]
+
+    def get(self, cell_range):
+        self.client._api_call()
+        return self._values(cell_range)
+
+    def acell(self, cell):
+        self.client._api_call()
+        rows = self._values(cell)
+        return SimpleNamespace(value=rows[0][0] if rows and rows[0] else "")
+
+
+class FakeDrive:
+    """files().list(...).execute() over the FakeSheets spreadsheets, 100 per page."""
+
+    def __init__(self, sheets, version=1):
+        self.sheets = sheets
+        self.version = version
+
+    def files(self):
+        return self
+
+    def list(self, q=None, fields=None, pageSize=100, pageToken=None):
+        sheets, version = self.sheets, self.version
+
+        def execute():
+            sheets._api_call()
+            ids = list(sheets.sheets)
+            start = int(pageToken or 0)
+            page = ids[start:start + pageSize]
+            result = {"files": [
+                {"id": sheet_id, "name": f"{sheets.names[sheet_id]} - TeamSheet",
+                 "modifiedTime": "2025-07-01T00:00:00.000Z", "version": str(version)}
+                for sheet_id in page
+            ]}
+            if start + pageSize < len(ids):
+                result["nextPageToken"] = str(start + pageSize)
+            return result
+
+        return SimpleNamespace(execute=execute)
+
+
+# ---- Local workbooks ----
+
+def write_workbooks(directory, count, per_workbook=30, seed=0):
+    """
+    Write `count` team worksheets across ceil(count / per_workbook) .xlsx files
+    (write-only mode, so 3,000 teams take seconds). Returns the paths.
+    """
+    import openpyxl
+
+    os.makedirs(directory, exist_ok=True)
+    names = team_names(count)
+    paths = []
+    for start in range(0, count, per_workbook):
+        wb = openpyxl.Workbook(write_only=True)
+        for n, team in enumerate(names[start:start + per_workbook], start=start):
+            ws = wb.create_sheet(team)
+            values = workbook_values(seed * 1_000_003 + n)
+            for row in range(1, 31):
+                ws.append([values.get(f"{chr(ord('A') + col)}{row}") for col in range(19)])  # A..S
+        path = os.path.join(directory, f"league_{start // per_workbook + 1:03d}.xlsx")
+        wb.save(path)
+        paths.append(path)
+    return paths
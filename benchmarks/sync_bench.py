@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+# benchmarks/sync_bench.py
+
+"""
+Offline benchmarks for the sync paths, against local Sheets / Joplin stand-ins.
+
+Scenarios, each run at every --teams size:
+  joplin_sync             joplin_sync.main over FakeSheets/FakeDrive → FakeJoplin
+                          (stages: setup, fetch, render, push)
+  joplin_local_sync       joplin_local_sync.main over generated workbooks, cold cache
+                          (stages: load, render, push)
+  joplin_local_sync_warm  the same run again: workbook cache hit, every note unchanged
+  render                  compiling and filling the note templates (both sync paths)
+  salary_check            the salary_check functions on random trades
+
+Every scenario runs in its own process, with config pointed at a scratch
+directory and the fake server, so state files, caches and process-wide
+clients/limiters never leak between runs. Stage times are summed across a
+stage's workers (so they can exceed wall time); "setup" is wall time. API
+throttles are lifted unless --real-throttles, so numbers reflect our code
+plus the injected latency rather than quota pacing.
+
+Results are appended to benchmarks/results/sync_bench.jsonl keyed by commit;
+--compare prints the current commit against an earlier one.
+
+    python benchmarks/sync_bench.py                                 # all scenarios, 30/300/3000 teams
+    python benchmarks/sync_bench.py --scenario joplin_sync --teams 300 --sheets-latency 20 --joplin-429 0.02
+    python benchmarks/sync_bench.py --compare                       # vs the previous benchmarked commit
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from benchmarks.fake_sheets import (
+    FakeSheets, FakeDrive, team_names, team_sheet_ids, workbook_values, write_workbooks,
+)
+from benchmarks.fake_joplin import FakeJoplin
+
+SCENARIOS = ("joplin_sync", "joplin_local_sync", "joplin_local_sync_warm", "render", "salary_check")
+DEFAULT_TEAMS = (30, 300, 3000)
+RESULTS_PATH = os.path.join(ROOT, "benchmarks", "results", "sync_bench.jsonl")
+FIXTURE_DIR = os.path.join(ROOT, ".cache", "bench")
+TRADES_PER_TEAM = 10
+UNTHROTTLED = {"THROTTLE_SHEETS_RATE": "1e9", "THROTTLE_SHEETS_BURST": "1000000000",
+               "THROTTLE_DRIVE_RATE": "1e9", "THROTTLE_DRIVE_BURST": "1000000000",
+               "THROTTLE_JOPLIN_RATE": "1e9", "THROTTLE_JOPLIN_BURST": "1000000000"}
+
+
+class StageTimer:
+    """Thread-safe running totals of seconds and calls per stage name."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.seconds = {}
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds, calls=1):
+        with self._lock:
+            self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+            self.calls[name] = self.calls.get(name, 0) + calls
+
+    def wrap(self, name, func):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add(name, time.perf_counter() - start)
+        return timed
+
+    def time(self, name, func, *args, **kwargs):
+        return self.wrap(name, func)(*args, **kwargs)
+
+
+# ---- Scenarios (run inside the child process) ----
+
+def bench_joplin_sync(params, timer):
+    import joplin.joplin_sync as sync
+    from joplin.utils.pipeline import Stage
+
+    sheets = FakeSheets(team_sheet_ids(params["teams"]), params["sheets_latency"], params["sheets_429"],
+                        seed=params["seed"])
+    sync.get_sheets_client = lambda: sheets
+    sync.get_drive_service = lambda: FakeDrive(sheets)
+
+    run_pipeline = sync.run_pipeline
+
+    def timed_pipeline(items, stages, **kwargs):
+        timer.add("setup", time.perf_counter() - timer.started)
+        stages = [Stage(stage.name, timer.wrap(stage.name, stage.func), stage.workers) for stage in stages]
+        return run_pipeline(items, stages, **kwargs)
+
+    sync.run_pipeline = timed_pipeline
+    sys.argv = ["joplin_sync"]
+    timer.started = time.perf_counter()
+    sync.main()
+    return {"sheets": sheets.stats()}
+
+
+def _time_local_sync(params, timer):
+    import joplin.utils.joplin_local_sync as local
+
+    local.load_teams = timer.wrap("load", local.load_teams)
+    local.render_team = timer.wrap("render", local.render_team)
+    local.push_team = timer.wrap("push", local.push_team)
+    sys.argv = ["joplin_local_sync"] + params["workbooks"]
+    timer.started = time.perf_counter()
+    local.main()
+    return {}
+
+
+def bench_joplin_local_sync(params, timer):
+    return _time_local_sync(params, timer)
+
+
+def bench_joplin_local_sync_warm(params, timer):
+    import joplin.utils.joplin_local_sync as local
+
+    # Untimed first run fills the workbook cache and the sync state
+    sys.argv = ["joplin_local_sync"] + params["workbooks"]
+    local.main()
+    return _time_local_sync(params, timer)
+
+
+def bench_render(params, timer):
+    import joplin.joplin_sync as sync
+    import joplin.utils.joplin_local_sync as local
+    from config.sheets_config import MD_TEMPLATE_PATH
+    from joplin.utils.template_engine import load_template
+    from joplin.utils.workbook_reader import CellGrid
+
+    sheets = FakeSheets(team_sheet_ids(params["teams"]), seed=params["seed"])
+    plan = sync.get_range_plan()
+    fetched = []
+    for team, sheet_id in team_sheet_ids(params["teams"]).items():
+        ws = sheets.open_by_key(sheet_id).worksheet("Roster")
+        fetched.append((team, plan.extract(ws.batch_get(plan.ranges))))
+    workbook = [local.extract_sheet(CellGrid(workbook_values(params["seed"] * 1_000_003 + n)))
+                for n in range(params["teams"])]
+
+    timer.started = time.perf_counter()
+    template = timer.time("compile", load_template, MD_TEMPLATE_PATH, known=sync.template_known())
+    for team, (flat_vars, list_vars) in fetched:
+        timer.time("sheets_notes", sync.fill_template, template, flat_vars, list_vars, team)
+    for values, missing, tpes in workbook:
+        timer.time("workbook_notes", local.render_team, values, tpes)
+    return {}
+
+
+def bench_salary_check(params, timer):
+    from scripts import salary_check
+    from league.absorption import absorb, greedy_absorb, exception_bins
+    from league.money import format_money
+
+    rng = random.Random(params["seed"])
+    teams = team_names(params["teams"])
+    timer.started = time.perf_counter()
+
+    def package(low, high):
+        return ", ".join(format_money(rng.randint(low, high)) for _ in range(rng.randint(1, 4)))
+
+    for n in range(params["teams"] * TRADES_PER_TEAM):
+        team = teams[n % len(teams)]
+        outgoing = timer.time("parse", salary_check.parse_salary_list, package(1_200_000, 40_000_000))
+        incoming = timer.time("parse", salary_check.parse_salary_list, package(1_200_000, 40_000_000))
+        tpe = rng.randint(0, 15_000_000)
+
+        bins = exception_bins([tpe])
+        timer.time("absorb_greedy", greedy_absorb, incoming, bins)
+        remaining = timer.time("absorb_optimal", absorb, incoming, bins).remaining
+        timer.time("legality", salary_check.evaluate_legality, team, sum(outgoing), sum(remaining))
+    return {"trades": params["teams"] * TRADES_PER_TEAM}
+
+
+def run_child(scenario, params):
+    """Child process entry: run one scenario and print its measurements as one JSON line."""
+    timer = StageTimer()
+    output = io.StringIO()
+    error = None
+    timer.started = time.perf_counter()
+    try:
+        with redirect_stdout(output):
+            extra = globals()[f"bench_{scenario}"](params, timer)
+    except (Exception, SystemExit) as e:
+        extra, error = {}, f"{type(e).__name__}: {e}"
+    total = time.perf_counter() - timer.started
+
+    try:
+        from joplin.utils.throttle import limiter_stats
+        limiters = limiter_stats()
+    except Exception:
+        limiters = {}
+
+    lines = output.getvalue().splitlines()
+    print(json.dumps({
+        "total_seconds": round(total, 4),
+        "stages": {name: round(seconds, 4) for name, seconds in timer.seconds.items()},
+        "calls": timer.calls,
+        # Sync paths report a failed team with a ❌ line (salary_check uses it for illegal trades)
+        "failures": sum(1 for line in lines if line.startswith("❌")) if scenario.startswith("joplin") else 0,
+        "error": error,
+        "limiters": limiters,
+        **extra,
+    }))
+
+
+# ---- Orchestration (parent process) ----
+
+def git_revision():
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ""
+
+    return {
+        "commit": git("rev-parse", "--short", "HEAD"),
+        "subject": git("log", "-1", "--format=%s"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+    }
+
+
+def workbook_fixture(teams, seed):
+    """Generated workbooks for `teams` teams, reused across runs (and commits) from .cache/bench."""
+    directory = os.path.join(FIXTURE_DIR, f"workbooks-{teams}-seed{seed}")
+    marker = os.path.join(directory, ".complete")
+    if not os.path.exists(marker):
+        shutil.rmtree(directory, ignore_errors=True)
+        print(f"🛠️  Generating workbooks for {teams:,} teams...")
+        write_workbooks(directory, teams, seed=seed)
+        open(marker, "w").close()
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".xlsx"))
+
+
+def child_env(workdir, server, teams, real_throttles):
+    import yaml
+
+    teamsheets = os.path.join(workdir, "teamsheets.yaml")
+    with open(teamsheets, "w") as f:
+        yaml.safe_dump({team: f"https://docs.google.com/spreadsheets/d/{sheet_id}"
+                        for team, sheet_id in team_sheet_ids(teams).items()}, f)
+
+    env = dict(
+        os.environ,
+        JOPLIN_API=server.url,
+        JOPLIN_TOKEN="bench",
+        JOPLIN_NOTEBOOK_ID=server.notebook_id,
+        TEAM_SHEETS_CONFIG=teamsheets,
+        SYNC_STATE_DIR=os.path.join(workdir, "sync_state"),
+        NOTE_INDEX_CACHE=os.path.join(workdir, "note_index.json"),
+        NOTE_INDEX_CACHE_TTL="0",
+        WORKBOOK_CACHE_DIR=os.path.join(workdir, "workbook_cache"),
+        SNAPSHOT_DB=os.path.join(workdir, "snapshots.sqlite"),
+        SYNC_METRICS_DIR=os.path.join(workdir, "metrics"),
+        PYTHONHASHSEED="0",
+    )
+    env.pop("SYNC_METRICS_TEXTFILE_DIR", None)  # never overwrite the cron's .prom files
+    if not real_throttles:
+        env.update(UNTHROTTLED)
+    return env
+
+
+def run_scenario(scenario, teams, args, workdir):
+    server = FakeJoplin(args.joplin_latency / 1000, args.joplin_429, args.joplin_retry_after, args.seed).start()
+    try:
+        if not args.fresh_notes:
+            server.seed_notes(team_names(teams))
+        params = {
+            "teams": teams, "seed": args.seed,
+            "sheets_latency": args.sheets_latency / 1000, "sheets_429": args.sheets_429,
+        }
+        if scenario.startswith("joplin_local_sync"):
+            params["workbooks"] = workbook_fixture(teams, args.seed)
+
+        scratch = os.path.join(workdir, f"{scenario}-{teams}")
+        os.makedirs(scratch)
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", scenario, json.dumps(params)],
+            cwd=ROOT, env=child_env(scratch, server, teams, args.real_throttles),
+            capture_output=True, text=True,
+        )
+        if proc.returncode != 0 or not proc.stdout.strip():
+            raise RuntimeError(f"{scenario} ({teams} teams) crashed:\n{proc.stderr.strip()}")
+        measured = json.loads(proc.stdout.strip().splitlines()[-1])
+        measured["joplin_api"] = server.stats()
+        return measured
+    finally:
+        server.stop()
+
+
+def profile(args):
+    """The knobs that change what a number means; results only compare within one profile."""
+    return {
+        "sheets_latency_ms": args.sheets_latency, "sheets_429": args.sheets_429,
+        "joplin_latency_ms": args.joplin_latency, "joplin_429": args.joplin_429,
+        "real_throttles": args.real_throttles, "fresh_notes": args.fresh_notes, "seed": args.seed,
+    }
+
+
+def print_record(record):
+    stages = " · ".join(f"{name} {seconds:.3f}s" for name, seconds in record["stages"].items())
+    flags = ""
+    if record["failures"]:
+        flags += f"  ⚠️ {record['failures']} failed"
+    if record["error"]:
+        flags += f"  ❌ {record['error']}"
+    print(f"  {record['scenario']:<24}{record['teams']:>6,}{record['total_seconds']:>10.3f}s   {stages}{flags}")
+
+
+def load_results(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare(path, baseline=None):
+    records = load_results(path)
+    if not records:
+        print(f"❌ No results in {path}")
+        return
+
+    current = git_revision()["commit"]
+    commits = list(dict.fromkeys(record["commit"] for record in records))
+    if baseline:
+        resolved = subprocess.run(["git", "rev-parse", "--short", baseline], cwd=ROOT,
+                                  capture_output=True, text=True).stdout.strip()
+        baseline = resolved or baseline
+    else:
+        earlier = [commit for commit in commits if commit != current]
+        baseline = earlier[-1] if earlier else None
+    if current not in commits or baseline not in commits:
+        print(f"❌ Need results for both commits (have: {', '.join(commits)})")
+        return
+
+    def latest(commit):
+        found = {}
+        for record in records:
+            if record["commit"] == commit:
+                found[(record["scenario"], record["teams"], json.dumps(record["profile"], sort_keys=True))] = record
+        return found
+
+    before, after = latest(baseline), latest(current)
+    print(f"📊 {baseline} → {current}")
+    for key in sorted(set(before) & set(after)):
+        old, new = before[key], after[key]
+        change = (new["total_seconds"] - old["total_seconds"]) / old["total_seconds"] if old["total_seconds"] else 0
+        print(f"  {key[0]:<24}{key[1]:>6,}{old['total_seconds']:>10.3f}s →{new['total_seconds']:>9.3f}s"
+              f"  {change:+7.1%}")
+        for stage in new["stages"]:
+            if stage in old["stages"]:
+                print(f"      {stage:<20}{old['stages'][stage]:>12.3f}s →{new['stages'][stage]:>9.3f}s")
+    if not set(before) & set(after):
+        print("  No scenario/size/profile in common")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the sync paths against local Sheets/Joplin stand-ins.")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, help="Scenario(s) to run (default: all)")
+    parser.add_argument("--teams", type=int, nargs="+", default=list(DEFAULT_TEAMS), help="League sizes")
+    parser.add_argument("--sheets-latency", type=float, default=0.0, help="Milliseconds per Sheets/Drive call")
+    parser.add_argument("--sheets-429", type=float, default=0.0, help="Share of Sheets calls answered with a 429")
+    parser.add_argument("--joplin-latency", type=float, default=0.0, help="Milliseconds per Joplin API request")
+    parser.add_argument("--joplin-429", type=float, default=0.0, help="Share of Joplin requests answered with a 429")
+    parser.add_argument("--joplin-retry-after", type=int, default=None,
+                        help="Retry-After seconds the fake Joplin sends with a 429")
+    parser.add_argument("--real-throttles", action="store_true", help="Keep the configured API rate limits")
+    parser.add_argument("--fresh-notes", action="store_true",
+                        help="Start with an empty notebook (every note is created) instead of one note per team")
+    parser.add_argument("--seed", type=int, default=2025)
+    parser.add_argument("--results", default=RESULTS_PATH, help="JSONL file results are appended to")
+    parser.add_argument("--no-save", action="store_true", help="Print results without recording them")
+    parser.add_argument("--compare", nargs="?", const="", metavar="REF",
+                        help="Compare this commit's results with REF's (default: previous benchmarked commit)")
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child[0], json.loads(args.child[1]))
+        return
+    if args.compare is not None:
+        compare(args.results, args.compare or None)
+        return
+
+    revision = git_revision()
+    print(f"🏁 Benchmarking {revision['commit']}{' (dirty)' if revision['dirty'] else ''}: {revision['subject']}")
+    workdir = tempfile.mkdtemp(prefix="sync-bench-")
+    records = []
+    try:
+        for scenario in args.scenario or SCENARIOS:
+            for teams in args.teams:
+                measured = run_scenario(scenario, teams, args, workdir)
+                record = {
+                    **revision,
+                    "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                    "python": platform.python_version(),
+                    "scenario": scenario,
+                    "teams": teams,
+                    "profile": profile(args),
+                    **measured,
+                }
+                print_record(record)
+                records.append(record)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+        if records and not args.no_save:
+            os.makedirs(os.path.dirname(os.path.abspath(args.results)), exist_ok=True)
+            with open(args.results, "a", encoding="utf-8") as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            print(f"💾 {len(records)} result(s) appended to {args.results}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,16 +7,23 @@ GOOGLE_CREDENTIALS = os.getenv(
     os.path.join(BASE_DIR, "auth/secrets/oauth/credentials.json")
 )
 
+# GOOGLE_TOKEN_PATH is the older name make_teamsheets_yaml used; both point at one shared token
 GOOGLE_TOKEN = os.getenv(
     "GOOGLE_TOKEN",
-    os.path.join(BASE_DIR, "auth/secrets/oauth/.token.json")
+    os.getenv("GOOGLE_TOKEN_PATH", os.path.join(BASE_DIR, "auth/secrets/oauth/.token.json"))
 )
 
+# Every scope any tool needs, so one token (and one login) serves them all
 SCOPES = [
     "https://www.googleapis.com/auth/spreadsheets",
     "https://www.googleapis.com/auth/drive.metadata.readonly",
 ]
 
+# Refresh the access token this many seconds before it expires, in the background
+GOOGLE_REFRESH_MARGIN = int(os.getenv("GOOGLE_REFRESH_MARGIN", "300"))
+# Connections kept open to the Sheets API (at least one per fetch worker)
+GOOGLE_POOL_SIZE = int(os.getenv("GOOGLE_POOL_SIZE", "10"))
+
 # # ==== Team Sheet Config ====
 # TEAM_SHEETS_CONFIG = os.getenv(
 #     "TEAM_SHEETS_CONFIG",
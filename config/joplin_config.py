@@ -5,4 +5,28 @@ from config.base import BASE_DIR  # Optional, if needed for path logic
 JOPLIN_API = os.getenv("JOPLIN_API", "http://127.0.0.1:41184")
 JOPLIN_TOKEN = os.getenv("JOPLIN_TOKEN")
 JOPLIN_NOTEBOOK_ID = os.getenv("JOPLIN_NOTEBOOK_ID")
-TEMPLATE_PATH = os.path.join("templates", "team_sheet_template.md")
\ No newline at end of file
+TEMPLATE_PATH = os.path.join("templates", "team_sheet_template.md")
+
+# ==== Sync State ====
+# Per-team hashes of the last body pushed to Joplin, so unchanged notes are skipped
+SYNC_STATE_DIR = os.getenv("SYNC_STATE_DIR", os.path.join(BASE_DIR, ".cache", "sync_state"))
+
+# ==== Note Index ====
+# Title → id index of the notebook, built from one paginated /folders/{id}/notes listing.
+# Set NOTE_INDEX_CACHE_TTL (seconds) to reuse the on-disk copy between runs; each pushed
+# note's updated_time is still re-read, so hand edits in Joplin are never overwritten.
+NOTE_INDEX_CACHE = os.getenv("NOTE_INDEX_CACHE", os.path.join(BASE_DIR, ".cache", "note_index.json"))
+NOTE_INDEX_CACHE_TTL = int(os.getenv("NOTE_INDEX_CACHE_TTL", "0"))
+
+# ==== Joplin Client ====
+JOPLIN_TIMEOUT = float(os.getenv("JOPLIN_TIMEOUT", "10"))
+JOPLIN_RETRIES = int(os.getenv("JOPLIN_RETRIES", "3"))
+JOPLIN_BACKOFF = float(os.getenv("JOPLIN_BACKOFF", "0.5"))
+JOPLIN_POOL_SIZE = int(os.getenv("JOPLIN_POOL_SIZE", "4"))
+
+# ==== Run Metrics ====
+# Every sync command writes a JSON run summary to SYNC_METRICS_DIR/<command>.json.
+# Set SYNC_METRICS_TEXTFILE_DIR (e.g. node_exporter's textfile collector directory)
+# to also export each run as Prometheus metrics in <dir>/<command>.prom.
+SYNC_METRICS_DIR = os.getenv("SYNC_METRICS_DIR", os.path.join(BASE_DIR, ".cache", "metrics"))
+SYNC_METRICS_TEXTFILE_DIR = os.getenv("SYNC_METRICS_TEXTFILE_DIR")
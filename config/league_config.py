@@ -0,0 +1,10 @@
+import os
+from config.base import BASE_DIR  # Optional, if needed for path logic
+
+# ==== League Snapshot Store ====
+# SQLite file holding timestamped snapshots of every team's roster, contracts and cap summary
+SNAPSHOT_DB = os.getenv("SNAPSHOT_DB", os.path.join(BASE_DIR, ".cache", "league_snapshots.sqlite"))
+
+# ==== Cap Engine ====
+# League-wide cap, tax, apron and exception figures per season (keyed by payroll_seasons label)
+CAP_THRESHOLDS_PATH = os.getenv("CAP_THRESHOLDS_PATH", os.path.join(BASE_DIR, "config", "cap_thresholds.yaml"))
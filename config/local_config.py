@@ -1,9 +1,19 @@
-# import os
-# from config.base import BASE_DIR  # Optional, if needed for path logic
+import os
+from config.base import BASE_DIR  # Optional, if needed for path logic
 # ==== Team Sheet Config ====
 
 
 # Optional: default headers for HTTP requests
 HEADERS = {"Content-Type": "application/json"}
 
-WORKBOOK_PATH='/home/erik/Desktop/Charlotte.xlsx'
\ No newline at end of file
+WORKBOOK_PATH='/home/erik/Desktop/Charlotte.xlsx'
+
+# ==== Parsed Workbook Cache ====
+# Extracted per-sheet values keyed by workbook fingerprint, least recently used evicted first
+WORKBOOK_CACHE_DIR = os.getenv("WORKBOOK_CACHE_DIR", os.path.join(BASE_DIR, ".cache", "workbooks"))
+WORKBOOK_CACHE_MAX_ENTRIES = int(os.getenv("WORKBOOK_CACHE_MAX_ENTRIES", "8"))
+
+# ==== Watch Mode ====
+# Seconds without further saves before a change is synced, and the polling interval without inotify
+WATCH_DEBOUNCE = float(os.getenv("WATCH_DEBOUNCE", "1.0"))
+WATCH_POLL_INTERVAL = float(os.getenv("WATCH_POLL_INTERVAL", "1.0"))
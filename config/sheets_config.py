@@ -9,6 +9,14 @@ TEAM_SHEETS_CONFIG = os.getenv(
 )
 
 MD_TEMPLATE_PATH = os.path.join(BASE_DIR, "templates", "team_sheet_template.md")
+MD_VAR_MAP_PATH = os.path.join(BASE_DIR, "config", "md_var_map.yaml")
+
+# ==== Sync Pipeline Config ====
+# Worker counts per stage of joplin_sync (fetch sheets → render → push to Joplin)
+SYNC_FETCH_WORKERS = int(os.getenv("SYNC_FETCH_WORKERS", "4"))
+SYNC_RENDER_WORKERS = int(os.getenv("SYNC_RENDER_WORKERS", "1"))
+SYNC_PUSH_WORKERS = int(os.getenv("SYNC_PUSH_WORKERS", "2"))
+SYNC_QUEUE_SIZE = int(os.getenv("SYNC_QUEUE_SIZE", "8"))
 # # Optional: default headers for HTTP requests
 # HEADERS = {"Content-Type": "application/json"}
 #
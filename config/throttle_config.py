@@ -0,0 +1,12 @@
+import os
+
+# ==== API Rate Limits ====
+# Token buckets shared by every call to each API in a process (see joplin/utils/throttle.py):
+# requests per second and burst size. Sheets allows 60 reads/min per user,
+# so rate * 60 + burst stays under that for any one-minute window.
+THROTTLE_SHEETS_RATE = float(os.getenv("THROTTLE_SHEETS_RATE", "0.75"))
+THROTTLE_SHEETS_BURST = int(os.getenv("THROTTLE_SHEETS_BURST", "15"))
+THROTTLE_DRIVE_RATE = float(os.getenv("THROTTLE_DRIVE_RATE", "10"))
+THROTTLE_DRIVE_BURST = int(os.getenv("THROTTLE_DRIVE_BURST", "20"))
+THROTTLE_JOPLIN_RATE = float(os.getenv("THROTTLE_JOPLIN_RATE", "50"))
+THROTTLE_JOPLIN_BURST = int(os.getenv("THROTTLE_JOPLIN_BURST", "50"))
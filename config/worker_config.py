@@ -0,0 +1,10 @@
+import os
+from config.base import BASE_DIR
+
+# ==== Warm Worker ====
+# `python main.py worker start` keeps every command's imports and parsed config resident
+# and forks a fresh copy per invocation; main.py uses it whenever WORKER_SOCKET answers.
+WORKER_SOCKET = os.getenv("WORKER_SOCKET", os.path.join(BASE_DIR, ".cache", "worker.sock"))
+WORKER_LOG = os.getenv("WORKER_LOG", os.path.join(BASE_DIR, ".cache", "worker.log"))
+# Seconds without a command before the worker exits (0 = stay up until `main.py worker stop`)
+WORKER_IDLE_TIMEOUT = float(os.getenv("WORKER_IDLE_TIMEOUT", "14400"))
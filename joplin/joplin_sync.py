@@ -1,39 +1,49 @@
 #!/usr/bin/env python3
 import os
 import sys
+import argparse
 import yaml
-import gspread
-import requests
-from pathlib import Path
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
+from functools import lru_cache
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from config.google_config import GOOGLE_TOKEN, GOOGLE_CREDENTIALS, SCOPES
-from config.joplin_config import JOPLIN_API, JOPLIN_TOKEN, JOPLIN_NOTEBOOK_ID
-from config.sheets_config import TEAM_SHEETS_CONFIG, MD_TEMPLATE_PATH
-from utils.throttle import rate_limited
+from config.joplin_config import JOPLIN_NOTEBOOK_ID, NOTE_INDEX_CACHE, NOTE_INDEX_CACHE_TTL
+from config.sheets_config import (
+    TEAM_SHEETS_CONFIG, MD_TEMPLATE_PATH, MD_VAR_MAP_PATH,
+    SYNC_FETCH_WORKERS, SYNC_RENDER_WORKERS, SYNC_PUSH_WORKERS, SYNC_QUEUE_SIZE,
+)
+from joplin.utils.throttle import rate_limited, get_limiter, limiter_stats
+from joplin.utils.range_planner import RangePlan
+from joplin.utils.pipeline import Stage, run_pipeline
+from joplin.utils.sync_state import SyncState, UNCHANGED, EDITED, body_hash, state_path
+from joplin.utils.make_teamsheets_yaml import fetch_team_sheet_versions
+from joplin.utils.note_index import NoteIndex
+from joplin.utils.joplin_client import get_client
+from joplin.utils.template_engine import compile_template, load_template
+from joplin.utils.payroll_table import build_payroll_table
+from joplin.utils.cassette import add_cassette_args, cassette_from_args, local_file, replay_credentials
+from joplin.utils.google_auth import get_sheets_client, get_drive_service, use_credentials
+from joplin.utils.metrics import add_metrics_args, metrics_from_args
+from league.snapshot import SnapshotStore
+from league.cap_engine import CapEngine, COMPUTED_SECTIONS, contracts_from_payroll
+
+# md_var_map.yaml and its plans are parsed on first use (not at import), then kept
+@lru_cache(maxsize=None)
+def load_md_var_map():
+    with open(MD_VAR_MAP_PATH, "r") as f:
+        return yaml.safe_load(f)
 
-# Load md_var_map.yaml
-with open(os.path.join("config", "md_var_map.yaml"), "r") as f:
-    md_var_map = yaml.safe_load(f)
 
+@lru_cache(maxsize=None)
+def get_range_plan():
+    """md_var_map compiled into the coalesced batchGet ranges."""
+    return RangePlan(load_md_var_map())
 
-def authenticate():
-    creds = None
-    if os.path.exists(GOOGLE_TOKEN):
-        creds = Credentials.from_authorized_user_file(GOOGLE_TOKEN, SCOPES)
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            flow = InstalledAppFlow.from_client_secrets_file(GOOGLE_CREDENTIALS, SCOPES)
-            creds = flow.run_local_server(port=0)
-        with open(GOOGLE_TOKEN, "w") as token_file:
-            token_file.write(creds.to_json())
-    return creds
+
+@lru_cache(maxsize=None)
+def template_known():
+    """Placeholders the template may use: every md_var_map key plus the ones we fill ourselves."""
+    return frozenset({key for key, _, _ in get_range_plan().vars} | {"team_name", "PLAYER_SALARY_TABLE"})
 
 
 def load_team_sheets():
@@ -41,121 +51,269 @@ def load_team_sheets():
         return yaml.safe_load(f)
 
 
-def check_joplin_api_available():
-    try:
-        res = requests.get(f"{JOPLIN_API}/ping", timeout=3)
-        if res.status_code != 200:
-            raise Exception(f"Unexpected response code: {res.status_code}")
-    except Exception as e:
-        print(f"❌ Joplin API is not available: {e}")
+def sheet_id_from_url(url):
+    return url.split("/d/")[1].split("/")[0]
+
+
+def select_changed_teams(teams, versions, state, template_hash):
+    """
+    Split teams into (changed, unchanged) by comparing each sheet's Drive
+    version/modifiedTime (and the template) with what was recorded at its last
+    successful sync. Sheets missing from the Drive listing always count as changed.
+    """
+    changed, unchanged = {}, {}
+    for team, url in teams.items():
+        current = versions.get(sheet_id_from_url(url))
+        entry = state.get(team)
+        if current and entry.get("sheet_version") == current["version"] \
+                and entry.get("sheet_modified_time") == current["modifiedTime"] \
+                and entry.get("template_hash") == template_hash:
+            unchanged[team] = url
+        else:
+            changed[team] = url
+    return changed, unchanged
+
+
+def check_joplin_api_available(client):
+    if not client.ping():
+        print(f"❌ Joplin API is not available at {client.api}")
         exit(1)
 
 
-def notebook_exists(notebook_id):
-    res = requests.get(f"{JOPLIN_API}/folders/{notebook_id}", params={"token": JOPLIN_TOKEN})
-    return res.status_code == 200
+def get_or_create_note(client, index, title, notebook_id):
+    note = index.current(title, client)
+    if note:
+        return note["id"]
 
+    note = client.create_note(title, "", notebook_id)
+    index.add({"id": note["id"], "title": title, "updated_time": note.get("updated_time")})
+    return note["id"]
 
-def get_or_create_note(title, notebook_id):
-    search_url = f"{JOPLIN_API}/search?query={title}&type=note&token={JOPLIN_TOKEN}"
-    resp = requests.get(search_url)
-    for item in resp.json().get("items", []):
-        if item.get("title") == title:
-            return item["id"]
 
-    create_url = f"{JOPLIN_API}/notes?token={JOPLIN_TOKEN}"
-    resp = requests.post(create_url, json={"title": title, "parent_id": notebook_id, "body": ""})
-    return resp.json()["id"]
+def iter_var_ranges(skip_sections=()):
+    md_var_map = load_md_var_map()
+    for section in md_var_map:
+        if not isinstance(md_var_map[section], dict) or section in skip_sections:
+            continue
+        for key, cell_range in md_var_map[section].items():
+            yield key, cell_range
+
 
+@rate_limited("sheets")
+def fetch_sheet_values(sheet, plan=None):
+    """
+    Fetch every md_var_map range for one team in a single values:batchGet call,
+    using the coalesced blocks from get_range_plan() (or `plan`).
+    Returns (flat_vars, list_vars) in the same shape as the per-cell path.
+    """
+    plan = plan or get_range_plan()
+    return plan.extract(sheet.batch_get(plan.ranges))
 
-def update_note_body(note_id, markdown):
-    url = f"{JOPLIN_API}/notes/{note_id}?token={JOPLIN_TOKEN}"
-    return requests.put(url, json={"body": markdown}).status_code == 200
 
+def fetch_sheet_values_per_cell(sheet, skip_sections=()):
+    """Legacy path: one acell()/get() round trip per md_var_map key."""
+    sheets = get_limiter("sheets")
 
-def render_template_with_data(template_str, sheet):
-    @rate_limited(0.5)
     def get_range(sheet, cell_range):
         try:
-            return sheet.get(cell_range)
+            return sheets.call(sheet.get, cell_range)
         except Exception:
             return []
 
-    @rate_limited(0.5)
     def get_cell(sheet, cell):
         try:
-            return sheet.acell(cell).value
+            return sheets.call(sheet.acell, cell).value
         except Exception:
             return ""
 
     flat_vars = {}
     list_vars = {}
 
-    for section in md_var_map:
-        for key, cell_range in md_var_map[section].items():
-            if ":" in cell_range:
-                list_vars[key] = get_range(sheet, cell_range)
-            else:
-                flat_vars[key] = get_cell(sheet, cell_range)
-
-    # Build player salary/status table
-    player_md = (
-        "| # | Player Name | 2025–26 Salary | Status | 2026–27 Salary | Status | 2027–28 Salary | Status |\n"
-        "|---|-------------|----------------|--------|----------------|--------|----------------|--------|\n"
-    )
+    for key, cell_range in iter_var_ranges(skip_sections):
+        if ":" in cell_range:
+            list_vars[key] = get_range(sheet, cell_range)
+        else:
+            flat_vars[key] = get_cell(sheet, cell_range)
 
-    players = list_vars.get("player_name", [])
-    sal_26 = list_vars.get("player_sal_26", [])
-    sal_27 = list_vars.get("player_sal_27", [])
-    sal_28 = list_vars.get("player_sal_28", [])
-    stat_26 = list_vars.get("player_stat_26", [])
-    stat_27 = list_vars.get("player_stat_27", [])
-    stat_28 = list_vars.get("player_stat_28", [])
+    return flat_vars, list_vars
 
-    for i in range(len(players)):
-        name = players[i][0] if i < len(players) else ""
-        s26 = sal_26[i][0] if i < len(sal_26) else ""
-        s27 = sal_27[i][0] if i < len(sal_27) else ""
-        s28 = sal_28[i][0] if i < len(sal_28) else ""
-        st26 = stat_26[i][0] if i < len(stat_26) else ""
-        st27 = stat_27[i][0] if i < len(stat_27) else ""
-        st28 = stat_28[i][0] if i < len(stat_28) else ""
 
-        if name:
-            player_md += f"| {i+1} | {name} | {s26} | {st26} | {s27} | {st27} | {s28} | {st28} |\n"
+def fill_template(template, flat_vars, list_vars, team_name=None):
+    player_table = build_payroll_table(list_vars, load_md_var_map().get("payroll_seasons", []))
 
-    filled = template_str.replace("{{PLAYER_SALARY_TABLE}}", player_md)
+    values = dict(flat_vars, PLAYER_SALARY_TABLE=player_table)
+    if team_name:
+        values["team_name"] = team_name
+    return template.render(values)
 
-    for key, value in flat_vars.items():
-        filled = filled.replace(f"{{{{{key}}}}}", value)
 
-    return filled
+def render_template_with_data(template, sheet, batched=True, team_name=None):
+    if isinstance(template, str):
+        template = compile_template(template)
+    if batched:
+        flat_vars, list_vars = fetch_sheet_values(sheet)
+    else:
+        flat_vars, list_vars = fetch_sheet_values_per_cell(sheet)
+    return fill_template(template, flat_vars, list_vars, team_name)
 
 
 def main():
-    check_joplin_api_available()
-
-    if not notebook_exists(JOPLIN_NOTEBOOK_ID):
-        raise ValueError("❌ Invalid or missing JOPLIN_NOTEBOOK_ID")
-
-    creds = authenticate()
-    gc = gspread.authorize(creds)
-    teams = load_team_sheets()
-    template_str = Path(MD_TEMPLATE_PATH).read_text(encoding="utf-8")
-
+    parser = argparse.ArgumentParser(description="Sync Google team sheets into Joplin notes.")
+    parser.add_argument("--per-cell", action="store_true",
+                        help="Fetch each md_var_map key separately instead of one batchGet per team")
+    parser.add_argument("--fetch-workers", type=int, default=SYNC_FETCH_WORKERS,
+                        help="Concurrent Google Sheets fetches")
+    parser.add_argument("--render-workers", type=int, default=SYNC_RENDER_WORKERS,
+                        help="Concurrent template renders")
+    parser.add_argument("--push-workers", type=int, default=SYNC_PUSH_WORKERS,
+                        help="Concurrent Joplin note updates")
+    parser.add_argument("--queue-size", type=int, default=SYNC_QUEUE_SIZE,
+                        help="Max teams buffered between stages")
+    parser.add_argument("--force", action="store_true",
+                        help="Push every note, even unchanged or hand-edited ones")
+    parser.add_argument("--full", action="store_true",
+                        help="Fetch every team sheet, not just the ones Drive reports as modified")
+    parser.add_argument("--snapshot", nargs="?", const="latest",
+                        help="Render from a stored league snapshot (id or 'latest') instead of live Sheets")
+    parser.add_argument("--local-cap", action="store_true",
+                        help="Compute the cap summary and exceptions from payroll rows instead of fetching them")
+    add_cassette_args(parser)
+    add_metrics_args(parser)
+    args = parser.parse_args()
+
+    # Metrics hook HTTP after the cassette, so replayed calls are counted too
+    with cassette_from_args(args) as cassette, metrics_from_args("joplin_sync", args) as metrics:
+        run(args, metrics, cassette)
+
+
+def run(args, metrics, cassette=None):
+    with metrics.stage("setup"):
+        client = get_client()
+        check_joplin_api_available(client)
+
+        if not client.folder_exists(JOPLIN_NOTEBOOK_ID):
+            raise ValueError("❌ Invalid or missing JOPLIN_NOTEBOOK_ID")
+
+        teams = load_team_sheets()
+        template = load_template(MD_TEMPLATE_PATH, known=template_known())
+        sheets = get_limiter("sheets")
+        # Under a cassette, replays start from the recorded run's state (see cassette.local_file)
+        state = SyncState(local_file(cassette, "sync_state/joplin_sync.json", state_path("joplin_sync")))
+        index = NoteIndex.load(JOPLIN_NOTEBOOK_ID, client,
+                               cache_path=local_file(cassette, "note_index.json", NOTE_INDEX_CACHE))
+    template_hash = body_hash(template.source)
+    versions = {}
+
+    md_var_map = load_md_var_map()
+    plan, skip_sections, engine = get_range_plan(), (), None
+    if args.local_cap:
+        season = md_var_map["payroll_seasons"][0]
+        engine = CapEngine.for_season(season["label"])
+        skip_sections = COMPUTED_SECTIONS
+        plan = RangePlan({section: ranges for section, ranges in md_var_map.items()
+                          if section not in skip_sections})
+        print(f"🧮 Computing cap summaries locally ({season['label']}); fetching {', '.join(plan.ranges)}")
+
+    if args.snapshot:
+        store = SnapshotStore()
+        snapshot_id = store.resolve(args.snapshot)
+        stored = set(store.teams(snapshot_id))
+        teams = {team: url for team, url in teams.items() if team in stored}
+        print(f"📸 Rendering {len(teams)} teams from snapshot {snapshot_id}")
+    else:
+        if args.replay:
+            use_credentials(replay_credentials())
+        gc = get_sheets_client()
+
+        # Versions are recorded even on --full runs so the next incremental run has a baseline
+        try:
+            with metrics.stage("versions"):
+                versions = fetch_team_sheet_versions(get_drive_service())
+        except Exception as e:
+            print(f"⚠️  Could not list sheet versions from Drive, doing a full sync: {e}")
+
+    if versions and not args.full:
+        teams, unchanged = select_changed_teams(teams, versions, state, template_hash)
+        for team in unchanged:
+            print(f"⏩ No sheet changes: {team}")
+            metrics.outcome(team, "skipped")
+        print(f"🔎 {len(teams)} of {len(teams) + len(unchanged)} team sheets changed since the last sync")
+
+    def record_sheet_version(team):
+        current = versions.get(sheet_id_from_url(teams[team]))
+        if current:
+            state.record(
+                team,
+                sheet_version=current["version"],
+                sheet_modified_time=current["modifiedTime"],
+                template_hash=template_hash,
+            )
+
+    def fetch(team, url):
+        if args.snapshot:
+            return store.team_values(team, snapshot_id, md_var_map.get("payroll_seasons", []))
 
-    for team, url in teams.items():
         print(f"📥 Fetching: {team}")
-        sheet_id = url.split("/d/")[1].split("/")[0]
+        sheet_id = sheet_id_from_url(url)
+        spreadsheet = sheets.call(gc.open_by_key, sheet_id)
+        sheet = sheets.call(spreadsheet.worksheet, "Roster")
+        if args.per_cell:
+            return fetch_sheet_values_per_cell(sheet, skip_sections)
+        return fetch_sheet_values(sheet, plan)
+
+    def render(team, values):
+        flat_vars, list_vars = values
+        if engine:
+            engine.set_roster(team, contracts_from_payroll(list_vars, season))
+            flat_vars = dict(flat_vars, **engine.md_vars(team))
+        return fill_template(template, flat_vars, list_vars, team_name=team)
+
+    def push(team, rendered):
+        note_id = get_or_create_note(client, index, team, JOPLIN_NOTEBOOK_ID)
+
+        if not args.force:
+            status = state.check(team, rendered, note_id, index.get(team).get("updated_time"))
+            if status == UNCHANGED:
+                print(f"⏩ Unchanged {team}")
+                record_sheet_version(team)
+                metrics.outcome(team, "unchanged")
+                return True
+            if status == EDITED:
+                print(f"⚠️  {team} was edited in Joplin since the last sync; skipping (use --force to overwrite)")
+                metrics.outcome(team, "edited")
+                return False
+
+        note = client.update_note(note_id, body=rendered)
+        index.update(team, updated_time=note["updated_time"])
+        state.record(team, rendered, note_id, note["updated_time"])
+        record_sheet_version(team)
+        print(f"✅ Synced {team}")
+        metrics.outcome(team, "synced")
+        return True
+
+    def on_error(team, stage, e):
+        print(f"❌ Failed to sync {team} ({stage}): {e}")
+        metrics.outcome(team, "failed")
 
-        try:
-            sheet = gc.open_by_key(sheet_id).worksheet("Roster")
-            rendered = render_template_with_data(template_str, sheet)
-            note_id = get_or_create_note(team, JOPLIN_NOTEBOOK_ID)
-            success = update_note_body(note_id, rendered)
-            print(f"{'✅' if success else '❌'} Synced {team}")
-        except Exception as e:
-            print(f"❌ Failed to sync {team}: {e}")
+    try:
+        run_pipeline(
+            teams.items(),
+            [
+                Stage("fetch", metrics.timed("fetch", fetch), args.fetch_workers),
+                Stage("render", metrics.timed("render", render), args.render_workers),
+                Stage("push", metrics.timed("push", push), args.push_workers),
+            ],
+            queue_size=args.queue_size,
+            on_error=on_error,
+        )
+    finally:
+        state.save()
+        if NOTE_INDEX_CACHE_TTL > 0:
+            index.save()
+
+    for name, stats in limiter_stats().items():
+        print(f"⏱️  {name}: {stats['calls']} calls, waited {stats['wait_seconds']}s, "
+              f"{stats['quota_errors']} quota backoffs ({stats['backoff_seconds']}s)")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,329 @@
+# utils/cassette.py
+
+"""
+Record / replay every outbound API call of a sync run.
+
+    with Cassette("runs/monday.jsonl.gz", "record"):
+        ...                       # talks to Sheets, Drive and Joplin as usual
+    with Cassette("runs/monday.jsonl.gz", "replay", latency="original"):
+        ...                       # same run, served from disk
+
+Both HTTP stacks we use are hooked at their lowest common point:
+requests' HTTPAdapter.send (gspread, the Joplin client) and httplib2's
+Http.request (the Drive API client). A cassette is gzip'd JSON lines, one
+interaction per line: method, URL with credentials stripped, a hash of the
+request body, status, the few response headers we read, the body and how
+long the call took.
+
+Replay matches on (method, path + query, body hash), falling back to
+(method, path + query) so a run whose rendered notes changed still
+replays; repeated identical calls are served in recorded order (the last
+one repeats once exhausted).
+With latency="original" each call sleeps for its recorded duration, so a
+slow production run replays with the same timing; "none" runs at full
+speed. OAuth token traffic is never recorded, and replaying runs skip
+authentication entirely (see replay_credentials).
+
+What a run sends also depends on local state (SyncState, the note-index
+cache, the Drive-version baseline). Tools open those files through
+local_file(): a recording stores each file as it was when the run started,
+and a replay works on a scratch copy seeded from it, so it makes the same
+decisions as the recorded run and never touches the real files.
+"""
+
+import os
+import json
+import gzip
+import time
+import base64
+import shutil
+import hashlib
+import tempfile
+import threading
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+FORMAT_VERSION = 1
+LATENCY_MODES = ("original", "none")
+
+# Query parameters that carry credentials; dropped from stored and matched URLs
+SECRET_PARAMS = {"token", "access_token", "key"}
+# Auth endpoints: passed straight through, never written to a cassette
+PASSTHROUGH_HOSTS = {"oauth2.googleapis.com", "accounts.google.com"}
+KEPT_HEADERS = ("content-type", "retry-after")
+
+
+class CassetteMiss(requests.exceptions.ConnectionError):
+    """Replay asked for a request the cassette never saw."""
+
+
+def normalize_url(url):
+    parts = urlsplit(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in SECRET_PARAMS)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ""))
+
+
+def _route(url):
+    """What replay matches on: path and query, so a Joplin on another host/port still replays."""
+    parts = urlsplit(url)
+    return f"{parts.path}?{parts.query}"
+
+
+def body_digest(body):
+    if not body:
+        return ""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    elif not isinstance(body, bytes):
+        return ""  # streamed bodies: match on the URL alone
+    return hashlib.sha1(body).hexdigest()[:16]
+
+
+def _encode_body(content):
+    try:
+        return content.decode("utf-8"), False
+    except UnicodeDecodeError:
+        return base64.b64encode(content).decode("ascii"), True
+
+
+def _decode_body(entry):
+    return base64.b64decode(entry["body"]) if entry.get("b64") else entry["body"].encode("utf-8")
+
+
+class Cassette:
+    def __init__(self, path, mode, latency="original"):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode {mode!r}")
+        if latency not in LATENCY_MODES:
+            raise ValueError(f"Unknown replay latency {latency!r} (use one of {', '.join(LATENCY_MODES)})")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.interactions = []
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._exact = {}
+        self._loose = {}
+        self._served = {}  # key → position of the next entry to serve
+        self._patched = None
+        self.files = {}  # name → {"content": text or None, "age": seconds since modified}
+        self._scratch = None
+        if mode == "replay":
+            self._load()
+
+    # ---- Storage ----
+
+    def _load(self):
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            header = json.loads(f.readline())
+            if header.get("version") != FORMAT_VERSION:
+                raise ValueError(f"{self.path}: unsupported cassette version {header.get('version')}")
+            self.files = header.get("files", {})
+            self.interactions = [json.loads(line) for line in f if line.strip()]
+        for entry in self.interactions:
+            route = _route(entry["url"])
+            self._exact.setdefault((entry["method"], route, entry["body_hash"]), []).append(entry)
+            self._loose.setdefault((entry["method"], route), []).append(entry)
+
+    def save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        header = {"version": FORMAT_VERSION, "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                  "interactions": len(self.interactions), "files": self.files}
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".cassette-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as f:
+                for item in [header] + self.interactions:
+                    f.write((json.dumps(item, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8"))
+            os.replace(tmp, self.path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    # ---- Local state ----
+
+    def local_file(self, name, path):
+        """
+        Path a tool should use for the local state file `name` (normally at `path`).
+        Recording snapshots the file as it is now; replay returns a scratch copy
+        of the recorded snapshot (absent if the file didn't exist then).
+        """
+        if self.mode == "record":
+            with self._lock:
+                if name not in self.files:
+                    snapshot = {"content": None, "age": None}
+                    if os.path.exists(path):
+                        with open(path, "r", encoding="utf-8") as f:
+                            snapshot["content"] = f.read()
+                        snapshot["age"] = round(time.time() - os.path.getmtime(path), 3)
+                    self.files[name] = snapshot
+            return path
+
+        with self._lock:
+            if self._scratch is None:
+                self._scratch = tempfile.mkdtemp(prefix="cassette-state-")
+        scratch_path = os.path.join(self._scratch, *name.split("/"))
+        snapshot = self.files.get(name)
+        if snapshot and snapshot.get("content") is not None and not os.path.exists(scratch_path):
+            os.makedirs(os.path.dirname(scratch_path), exist_ok=True)
+            with open(scratch_path, "w", encoding="utf-8") as f:
+                f.write(snapshot["content"])
+            # Same age as at record time, so TTL-based caches decide the same way
+            modified = time.time() - (snapshot.get("age") or 0)
+            os.utime(scratch_path, (modified, modified))
+        return scratch_path
+
+    # ---- Record / play ----
+
+    def record(self, method, url, body, status, headers, content, elapsed):
+        text, is_b64 = _encode_body(content or b"")
+        entry = {
+            "method": method, "url": normalize_url(url), "body_hash": body_digest(body),
+            "status": status,
+            "headers": {name: headers[name] for name in KEPT_HEADERS if headers.get(name) is not None},
+            "body": text, "elapsed": round(elapsed, 4),
+            "at": round(time.monotonic() - self._started, 4),
+        }
+        if is_b64:
+            entry["b64"] = True
+        with self._lock:
+            self.interactions.append(entry)
+
+    def play(self, method, url, body):
+        """The recorded entry for this request (sleeping its recorded latency), or CassetteMiss."""
+        url = normalize_url(url)
+        route = _route(url)
+        with self._lock:
+            key = (method, route, body_digest(body))
+            entries = self._exact.get(key)
+            if not entries:
+                key = (method, route)
+                entries = self._loose.get(key)
+            if not entries:
+                self.misses += 1
+                raise CassetteMiss(f"No recorded response for {method} {url} in {self.path}")
+            position = self._served.get(key, 0)
+            self._served[key] = position + 1
+            entry = entries[min(position, len(entries) - 1)]
+        if self.latency == "original" and entry["elapsed"]:
+            time.sleep(entry["elapsed"])
+        return entry
+
+    # ---- Hooks ----
+
+    def _send(self, original):
+        cassette = self
+
+        def send(adapter, request, **kwargs):
+            if urlsplit(request.url).hostname in PASSTHROUGH_HOSTS:
+                return original(adapter, request, **kwargs)
+            if cassette.mode == "replay":
+                entry = cassette.play(request.method, request.url, request.body)
+                response = requests.Response()
+                response.status_code = entry["status"]
+                response.headers = CaseInsensitiveDict(entry["headers"])
+                response._content = _decode_body(entry)
+                response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+                response.url = request.url
+                response.request = request
+                response.reason = "Replayed"
+                return response
+
+            start = time.perf_counter()
+            response = original(adapter, request, **kwargs)
+            cassette.record(request.method, request.url, request.body, response.status_code,
+                            response.headers, response.content, time.perf_counter() - start)
+            return response
+
+        return send
+
+    def _http_request(self, original):
+        import httplib2
+
+        cassette = self
+
+        def request(http, uri, method="GET", body=None, headers=None, *args, **kwargs):
+            if urlsplit(uri).hostname in PASSTHROUGH_HOSTS:
+                return original(http, uri, method, body, headers, *args, **kwargs)
+            if cassette.mode == "replay":
+                entry = cassette.play(method, uri, body)
+                info = {"status": str(entry["status"])}
+                info.update(entry["headers"])
+                return httplib2.Response(info), _decode_body(entry)
+
+            start = time.perf_counter()
+            response, content = original(http, uri, method, body, headers, *args, **kwargs)
+            cassette.record(method, uri, body, response.status, response, content, time.perf_counter() - start)
+            return response, content
+
+        return request
+
+    def install(self):
+        import httplib2  # only the Drive client uses it; loaded when a hook is installed
+
+        if self._patched is None:
+            self._patched = (HTTPAdapter.send, httplib2.Http.request)
+            HTTPAdapter.send = self._send(self._patched[0])
+            httplib2.Http.request = self._http_request(self._patched[1])
+        return self
+
+    def uninstall(self):
+        import httplib2
+
+        if self._patched is not None:
+            HTTPAdapter.send, httplib2.Http.request = self._patched
+            self._patched = None
+
+    def __enter__(self):
+        return self.install()
+
+    def __exit__(self, *exc):
+        self.uninstall()
+        if self._scratch is not None:
+            shutil.rmtree(self._scratch, ignore_errors=True)
+            self._scratch = None
+        if self.mode == "record":
+            self.save()
+            print(f"📼 Recorded {len(self.interactions)} API calls to {self.path}")
+        else:
+            print(f"📼 Replayed {len(self.interactions)} recorded API calls from {self.path}"
+                  f"{f' ({self.misses} unmatched)' if self.misses else ''}")
+        return False
+
+
+# ---- CLI glue shared by the sync tools ----
+
+def add_cassette_args(parser):
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--record", metavar="CASSETTE", help="Save every API request/response to this file")
+    group.add_argument("--replay", metavar="CASSETTE", help="Serve API calls from a recorded cassette")
+    parser.add_argument("--replay-latency", choices=LATENCY_MODES, default="original",
+                        help="Sleep for each call's recorded duration, or replay at full speed")
+
+
+def cassette_from_args(args):
+    """Cassette for --record/--replay, or a no-op context."""
+    if getattr(args, "record", None):
+        return Cassette(args.record, "record")
+    if getattr(args, "replay", None):
+        return Cassette(args.replay, "replay", args.replay_latency)
+    return nullcontext()
+
+
+def local_file(cassette, name, path):
+    """`path`, or the cassette's view of it (see Cassette.local_file) while one is active."""
+    return cassette.local_file(name, path) if cassette is not None else path
+
+
+def replay_credentials():
+    """Stand-in Google credentials for replayed runs: no token file, no login, no refresh."""
+    from google.auth.credentials import AnonymousCredentials
+
+    return AnonymousCredentials()
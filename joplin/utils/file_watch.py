@@ -0,0 +1,93 @@
+# utils/file_watch.py
+
+"""
+Wait for saves to a set of files and yield them in debounced batches.
+
+Uses inotify (via the optional `inotify_simple` package) on the files'
+directories, so editors that save through a temp file + rename are seen too;
+without it, or off Linux, the files' size/mtime are polled instead. A batch is
+yielded once no further save has arrived for `debounce` seconds.
+"""
+
+import os
+import time
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:  # optional dependency
+    INotify = None
+
+
+def _signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def save_time(path):
+    """When `path` was last written (epoch seconds), for save → update latency."""
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return time.time()
+
+
+def _watch_inotify(paths, debounce):
+    inotify = INotify()
+    mask = flags.CLOSE_WRITE | flags.MOVED_TO | flags.CREATE
+    dirs = {}
+    for path in paths:
+        directory = os.path.dirname(path)
+        if directory not in dirs.values():
+            dirs[inotify.add_watch(directory, mask)] = directory
+
+    try:
+        while True:
+            pending = set()
+            events = inotify.read()  # block until the first event
+            while events:
+                for event in events:
+                    path = os.path.join(dirs.get(event.wd, ""), event.name)
+                    if path in paths:
+                        pending.add(path)
+                events = inotify.read(timeout=int(debounce * 1000)) if pending else inotify.read()
+            yield pending
+    finally:
+        inotify.close()
+
+
+def _watch_polling(paths, debounce, interval):
+    seen = {path: _signature(path) for path in paths}
+    while True:
+        time.sleep(interval)
+        current = {path: _signature(path) for path in paths}
+        pending = {path for path in paths if current[path] != seen[path]}
+        if not pending:
+            continue
+        # Keep polling until nothing has changed for `debounce` seconds
+        last_change = time.monotonic()
+        while time.monotonic() - last_change < debounce:
+            time.sleep(min(interval, debounce))
+            latest = {path: _signature(path) for path in paths}
+            if latest != current:
+                pending |= {path for path in paths if latest[path] != current[path]}
+                current = latest
+                last_change = time.monotonic()
+        seen = current
+        yield {path for path in pending if current[path] is not None}
+
+
+def watch_files(paths, debounce=1.0, interval=1.0, use_inotify=True):
+    """Yield sets of changed paths, one set per burst of saves. Runs until interrupted."""
+    paths = {os.path.abspath(path) for path in paths}
+    if use_inotify and INotify is not None:
+        print("👀 Watching with inotify")
+        watcher = _watch_inotify(paths, debounce)
+    else:
+        print(f"👀 Watching by polling every {interval:g}s")
+        watcher = _watch_polling(paths, debounce, interval)
+    for changed in watcher:
+        if changed:
+            yield changed
@@ -0,0 +1,277 @@
+# utils/google_auth.py
+
+"""
+One Google credential manager for every tool that talks to Sheets or Drive.
+
+    gc = get_sheets_client()       # authorized gspread client, one per process
+    drive = get_drive_service()    # Drive v3 service, one per process
+
+Credentials are loaded once per process with the union of every tool's
+scopes (config.google_config.SCOPES) and kept in memory. A daemon timer
+refreshes them GOOGLE_REFRESH_MARGIN seconds before they expire, in place,
+so the gspread session and the Drive client carry on with the new token and
+no request in a long sync waits on a refresh.
+
+The token file is shared by every tool and worker process. It is only
+touched under an exclusive lock (<token>.lock), written atomically (temp
+file + rename, owner-only), and re-read before refreshing: when several
+processes need a refresh at once, the first calls Google and the others
+adopt the token it saved.
+"""
+
+import os
+import sys
+import json
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import fcntl
+except ImportError:  # Windows: writes stay atomic, just not serialized
+    fcntl = None
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from config.google_config import (
+    GOOGLE_CREDENTIALS, GOOGLE_TOKEN, SCOPES, GOOGLE_REFRESH_MARGIN, GOOGLE_POOL_SIZE,
+)
+
+RETRY_AFTER_FAILURE = 30  # seconds before a failed background refresh is tried again
+
+
+def _utcnow():
+    # google-auth keeps expiries as naive UTC datetimes
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def seconds_left(creds):
+    if creds.expiry is None:
+        return float("inf") if creds.token else 0.0
+    return (creds.expiry - _utcnow()).total_seconds()
+
+
+class CredentialManager:
+    def __init__(self, token_path=GOOGLE_TOKEN, client_secrets=GOOGLE_CREDENTIALS, scopes=SCOPES,
+                 refresh_margin=GOOGLE_REFRESH_MARGIN, pool_size=GOOGLE_POOL_SIZE):
+        self.token_path = token_path
+        self.client_secrets = client_secrets
+        self.scopes = list(scopes)
+        self.refresh_margin = refresh_margin
+        self.pool_size = pool_size
+        self.refreshes = 0
+        self._creds = None
+        self._managed = True  # False for injected credentials: never refreshed or saved
+        self._sheets = None
+        self._drive = None
+        self._timer = None
+        self._lock = threading.RLock()
+
+    # ---- Credentials ----
+
+    def credentials(self):
+        with self._lock:
+            if self._creds is None:
+                self._creds = self._load()
+                self._schedule()
+            elif self._managed and seconds_left(self._creds) < self.refresh_margin:
+                self._refresh()
+            elif self._managed and self._timer is None:
+                self._schedule()  # e.g. in a forked child, where the timer thread didn't survive
+            return self._creds
+
+    def use(self, creds):
+        """Serve `creds` as they are (e.g. replay_credentials()): no token file, no refresh."""
+        with self._lock:
+            self._cancel()
+            self._creds, self._managed = creds, False
+            self._sheets = self._drive = None
+
+    def _load(self):
+        with self._file_lock():
+            creds = self._read_token()
+            if creds is None:
+                creds = self._login()
+                self._save(creds)
+            elif seconds_left(creds) < self.refresh_margin:
+                self._refresh_with(creds)
+                self._save(creds)
+        return creds
+
+    def _read_token(self):
+        """Saved credentials, or None if there are none usable for our scopes."""
+        from google.oauth2.credentials import Credentials
+
+        if not os.path.exists(self.token_path):
+            return None
+        try:
+            with open(self.token_path, "r") as f:
+                info = json.load(f)
+            granted = info.get("scopes") or []
+            if isinstance(granted, str):
+                granted = granted.split()
+            missing = set(self.scopes) - set(granted) if granted else set()
+            if missing:
+                print(f"🔑 Saved Google token lacks {', '.join(sorted(missing))}; authorizing again")
+                return None
+            creds = Credentials.from_authorized_user_info(info, self.scopes)
+        except ValueError as e:  # includes malformed JSON
+            print(f"⚠️  Ignoring unreadable Google token {self.token_path}: {e}")
+            return None
+        return creds if creds.refresh_token else None
+
+    def _login(self):
+        from google_auth_oauthlib.flow import InstalledAppFlow
+
+        flow = InstalledAppFlow.from_client_secrets_file(self.client_secrets, self.scopes)
+        return flow.run_local_server(port=0)
+
+    def _refresh(self):
+        """Refresh the shared credentials in place, or adopt a fresher token another process saved."""
+        with self._file_lock():
+            saved = self._read_token()
+            if saved is not None and saved.token and seconds_left(saved) >= self.refresh_margin:
+                self._creds.token, self._creds.expiry = saved.token, saved.expiry
+            else:
+                self._refresh_with(self._creds)
+                self._save(self._creds)
+        self._schedule()
+
+    def _refresh_with(self, creds):
+        from google.auth.transport.requests import Request
+
+        creds.refresh(Request())
+        self.refreshes += 1
+
+    # ---- Token file ----
+
+    def _save(self, creds):
+        directory = os.path.dirname(os.path.abspath(self.token_path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".token-", suffix=".tmp")  # created 0600
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(creds.to_json())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.token_path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    @contextmanager
+    def _file_lock(self):
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.token_path)), exist_ok=True)
+        with open(f"{self.token_path}.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    # ---- Background refresh ----
+
+    def _schedule(self, delay=None):
+        self._cancel()
+        if not self._managed:
+            return
+        if delay is None:
+            delay = seconds_left(self._creds) - self.refresh_margin
+            if delay == float("inf"):
+                return
+        self._timer = threading.Timer(max(delay, 1.0), self._background_refresh)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _cancel(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _background_refresh(self):
+        try:
+            with self._lock:
+                if self._managed and self._creds is not None:
+                    self._refresh()
+        except Exception as e:
+            print(f"⚠️  Background Google token refresh failed, retrying in {RETRY_AFTER_FAILURE}s: {e}")
+            with self._lock:
+                self._schedule(RETRY_AFTER_FAILURE)
+
+    def _after_fork(self):
+        # Locks may have been held by threads that don't exist in the child, and
+        # pooled connections must not be shared with the parent
+        self._lock = threading.RLock()
+        self._timer = None
+        self._sheets = self._drive = None
+
+    # ---- Pooled clients ----
+
+    def sheets_client(self):
+        """One gspread client per process; its session keeps pool_size connections to the Sheets API."""
+        with self._lock:
+            creds = self.credentials()
+            if self._sheets is None:
+                import gspread
+                from google.auth.transport.requests import AuthorizedSession
+                from requests.adapters import HTTPAdapter
+
+                session = AuthorizedSession(creds)
+                session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=self.pool_size))
+                self._sheets = gspread.authorize(creds, session=session)
+            return self._sheets
+
+    def drive_service(self):
+        """One Drive v3 service per process (httplib2 underneath: don't share it across threads)."""
+        with self._lock:
+            creds = self.credentials()
+            if self._drive is None:
+                from googleapiclient.discovery import build
+
+                self._drive = build("drive", "v3", credentials=creds)
+            return self._drive
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_manager():
+    """Process-wide CredentialManager built from config.google_config."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = CredentialManager()
+        return _manager
+
+
+def get_credentials():
+    return get_manager().credentials()
+
+
+def get_sheets_client():
+    return get_manager().sheets_client()
+
+
+def get_drive_service():
+    return get_manager().drive_service()
+
+
+def use_credentials(creds):
+    get_manager().use(creds)
+
+
+def _after_fork():
+    global _manager_lock
+    _manager_lock = threading.Lock()
+    if _manager is not None:
+        _manager._after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
@@ -0,0 +1,164 @@
+# utils/joplin_client.py
+
+"""
+One pooled client for the Joplin Data API, shared by every Joplin module.
+
+Keeps a keep-alive requests.Session, always sends the token as a query
+parameter, applies a timeout to every call and retries transient failures
+with backoff (POST is never retried, so a create can't be duplicated).
+"""
+
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from config.joplin_config import (
+    JOPLIN_API, JOPLIN_TOKEN,
+    JOPLIN_TIMEOUT, JOPLIN_RETRIES, JOPLIN_BACKOFF, JOPLIN_POOL_SIZE,
+)
+from joplin.utils.throttle import get_limiter
+
+PAGE_SIZE = 100
+
+
+class JoplinClient:
+    def __init__(self, api=JOPLIN_API, token=JOPLIN_TOKEN, timeout=JOPLIN_TIMEOUT,
+                 retries=JOPLIN_RETRIES, backoff=JOPLIN_BACKOFF, pool_size=JOPLIN_POOL_SIZE):
+        self.api = api.rstrip("/")
+        self.token = token
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.limiter = get_limiter("joplin")
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            # 429 is left to the "joplin" limiter's backoff; retrying it here as well
+            # would multiply the attempts per throttled request. urllib3 also retries
+            # any 429 that carries Retry-After unless told not to.
+            status_forcelist=(500, 502, 503, 504),
+            respect_retry_after_header=False,
+            allowed_methods=frozenset({"GET", "PUT", "DELETE", "HEAD"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(self, method, path, params=None, json=None, timeout=None):
+        query = {"token": self.token}
+        query.update(params or {})
+        res = self.limiter.call(
+            self._send, method, f"{self.api}{path}",
+            params=query, json=json, timeout=timeout or self.timeout,
+        )
+        return res.json() if res.content else {}
+
+    def _send(self, method, url, **kwargs):
+        # Raise inside the limited call, so a 429 reaches the limiter as a quota error
+        res = self.session.request(method, url, **kwargs)
+        res.raise_for_status()
+        return res
+
+    def close(self):
+        self.session.close()
+
+    # ---- Service / folders ----
+
+    def ping(self):
+        try:
+            res = self.session.get(f"{self.api}/ping", timeout=3)
+            return res.status_code == 200
+        except requests.RequestException:
+            return False
+
+    def folder_exists(self, folder_id):
+        try:
+            self.request("GET", f"/folders/{folder_id}", params={"fields": "id"})
+            return True
+        except requests.HTTPError:
+            return False
+
+    # ---- Notes ----
+
+    def list_notes(self, folder_id, fields="id,title,updated_time"):
+        """Every note in a folder, following Joplin's page/has_more pagination."""
+        notes = []
+        page = 1
+        while True:
+            data = self.request("GET", f"/folders/{folder_id}/notes",
+                                params={"fields": fields, "limit": PAGE_SIZE, "page": page})
+            notes.extend(data.get("items", []))
+            if not data.get("has_more"):
+                return notes
+            page += 1
+
+    def get_note(self, note_id, fields=None):
+        params = {"fields": fields} if fields else None
+        return self.request("GET", f"/notes/{note_id}", params=params)
+
+    def create_note(self, title, body, parent_id):
+        return self.request("POST", "/notes", json={"title": title, "body": body, "parent_id": parent_id})
+
+    def update_note(self, note_id, **fields):
+        """PUT the given fields; returns the note with at least id and updated_time."""
+        note = self.request("PUT", f"/notes/{note_id}", json=fields)
+        if "updated_time" not in note:
+            note.update(self.get_note(note_id, fields="id,updated_time"))
+        return note
+
+    # ---- Bulk helpers ----
+
+    def _map(self, func, items):
+        with ThreadPoolExecutor(max_workers=self.pool_size) as pool:
+            return list(pool.map(func, items))
+
+    def get_notes(self, note_ids, fields=None):
+        """
+        note_id → note for several notes, fetched concurrently over the pool,
+        or the exception for notes that failed (like update_notes).
+        """
+        def get(note_id):
+            try:
+                return self.get_note(note_id, fields)
+            except Exception as e:
+                return e
+
+        note_ids = list(note_ids)
+        return dict(zip(note_ids, self._map(get, note_ids)))
+
+    def update_notes(self, bodies):
+        """
+        PUT several bodies at once ({note_id: body}). Returns note_id → updated
+        note, or the exception for notes that failed, so one bad note doesn't
+        sink the batch.
+        """
+        def update(note_id):
+            try:
+                return self.update_note(note_id, body=bodies[note_id])
+            except Exception as e:
+                return e
+
+        note_ids = list(bodies)
+        return dict(zip(note_ids, self._map(update, note_ids)))
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Process-wide JoplinClient built from config.joplin_config."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = JoplinClient()
+        return _client
@@ -1,39 +1,49 @@
 #!/usr/bin/env python3
 
-import openpyxl
-import requests
-import sys
-import os
-from dotenv import load_dotenv
 import os
 import sys
-import openpyxl
-import requests
-from dotenv import load_dotenv
+import time
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
-from joplin import (
-    JOPLIN_API, JOPLIN_TOKEN, JOPLIN_NOTEBOOK_ID,
-    WORKBOOK_PATH as DEFAULT_WORKBOOK_PATH  # <- this line fixes the error
-)
+from config.joplin_config import JOPLIN_NOTEBOOK_ID, NOTE_INDEX_CACHE, NOTE_INDEX_CACHE_TTL
+from config.local_config import WORKBOOK_PATH as DEFAULT_WORKBOOK_PATH, WATCH_DEBOUNCE, WATCH_POLL_INTERVAL
+from joplin.utils.sync_state import SyncState, CHANGED, UNCHANGED, EDITED, state_path
+from joplin.utils.note_index import NoteIndex
+from joplin.utils.joplin_client import get_client
+from joplin.utils.template_engine import compile_template
+from joplin.utils.workbook_reader import read_workbooks, tpe_cells
+from joplin.utils.workbook_cache import WorkbookCache
+from joplin.utils.file_watch import watch_files, save_time
+from joplin.utils.cassette import add_cassette_args, cassette_from_args, local_file
+from joplin.utils.metrics import add_metrics_args, metrics_from_args, maybe_stage
 
-# Markdown template with dynamic TPE rows inserted via {TPE_BLOCK}
-TEMPLATE = """|     |     |
+# Markdown template; TPE rows repeat once per exception found in the sheet
+TEMPLATE = compile_template("""|     |     |
 | --- | --- |
-| **Salary for Cap** | {Salary for Cap} |
-| **Cap Space** | {Cap Space} |
-| **1st Apron Space** | {1st Apron Space} |
-| **2nd Apron Space** | {2nd Apron Space} |
+| **Salary for Cap** | {{Salary for Cap}} |
+| **Cap Space** | {{Cap Space}} |
+| **1st Apron Space** | {{1st Apron Space}} |
+| **2nd Apron Space** | {{2nd Apron Space}} |
 
 |     |     |     |     |
 | --- | --- | --- | --- |
 | **Free Agency Exceptions** | **Available?** | **Remaining** | **Triggers Hard Cap?** |
-| **Cap Room Exception** | {Cap Room Exception} | – | No  |
-| **Bi-Annual Exception (BAE)** | {Bi-Annual Exception} | {BAE Amount} | At 1st Apron |
-| **Taxpayer MLE** | {Taxpayer MLE} | {TMLE Amount} | At 2nd Apron |
-| **Full MLE** | {Full MLE} | {FMLE Amount} | At 1st Apron |
+| **Cap Room Exception** | {{Cap Room Exception}} | – | No  |
+| **Bi-Annual Exception (BAE)** | {{Bi-Annual Exception}} | {{BAE Amount}} | At 1st Apron |
+| **Taxpayer MLE** | {{Taxpayer MLE}} | {{TMLE Amount}} | At 2nd Apron |
+| **Full MLE** | {{Full MLE}} | {{FMLE Amount}} | At 1st Apron |
 
-{TPE_BLOCK}
-"""
+| **Traded Player Exceptions** | **Amount** |
+| --- | --- |
+{{#tpes}}
+| {{player}} | {{amount}} |
+{{/tpes}}
+{{^tpes}}
+| – | – |
+{{/tpes}}
+""")
 
 # Cell locations for expected values
 CELL_MAP = {
@@ -66,70 +76,211 @@ def extract_team_data(sheet):
     return values, missing
 
 
-def extract_tpes(sheet, start_row=17, end_row=30):
-    tpe_rows = ["| **Traded Player Exceptions** | **Amount** |", "| --- | --- |"]
-    found = False
+TPE_ROWS = (17, 30)
+
+# Every cell extract_team_data/extract_tpes look at; the reader streams only these
+NEEDED_CELLS = set(CELL_MAP.values()) | tpe_cells(*TPE_ROWS)
+
+
+def extract_tpes(sheet, start_row=TPE_ROWS[0], end_row=TPE_ROWS[1]):
+    tpes = []
     for row in range(start_row, end_row + 1):
         player = sheet[f"Q{row}"].value
         amount = sheet[f"R{row}"].value
         if player and amount:
-            tpe_rows.append(f"| {str(player).strip()} | {str(amount).strip()} |")
-            found = True
-    if not found:
-        tpe_rows.append("| – | – |")
-    return "\n".join(tpe_rows)
-
-
-def get_note_by_title(title):
-    params = {"token": JOPLIN_TOKEN, "query": title, "type": "note"}
-    res = requests.get(f"{JOPLIN_API}/search", params=params)
-    res.raise_for_status()
-    notes = res.json().get("items", [])
-    return notes[0] if notes else None
-
-
-def create_note(title, body):
-    data = {
-        "token": JOPLIN_TOKEN,
-        "title": title,
-        "body": body,
-        "parent_id": JOPLIN_NOTEBOOK_ID
-    }
-    r = requests.post(f"{JOPLIN_API}/notes", json=data)
-    r.raise_for_status()
+            tpes.append({"player": str(player).strip(), "amount": str(amount).strip()})
+    return tpes
+
+
+# Bump when extract_team_data/extract_tpes change so cached results are re-extracted
+EXTRACT_SCHEMA = f"1:{sorted(CELL_MAP.items())}:{TPE_ROWS}"
+
+# CELL_MAP labels → the md_var_map keys used by the Sheets path
+WORKBOOK_KEYS = {
+    "Salary for Cap": "salary_for_cap",
+    "Cap Space": "cap_space",
+    "1st Apron Space": "apron1_space",
+    "2nd Apron Space": "apron2_space",
+    "Cap Room Exception": "room_exception_yesno",
+    "Bi-Annual Exception": "bae_yesno",
+    "Taxpayer MLE": "tp_mle_yesno",
+    "Full MLE": "full_mle_yesno",
+    "BAE Amount": "bae_exception_rem",
+    "TMLE Amount": "tp_mle_rem",
+    "FMLE Amount": "full_mle_rem",
+}
+
+
+def extract_sheet(sheet):
+    values, missing = extract_team_data(sheet)
+    return values, missing, extract_tpes(sheet)
+
+
+def load_teams(workbook_paths, workers=None, use_cache=True):
+    """[(path, team_name, (values, missing, tpes))] for every worksheet."""
+    if use_cache:
+        return WorkbookCache().load(workbook_paths, NEEDED_CELLS, extract_sheet, EXTRACT_SCHEMA, workers)
+    return [(path, title, extract_sheet(sheet))
+            for path, title, sheet in read_workbooks(workbook_paths, NEEDED_CELLS, workers=workers)]
+
+
+def as_md_vars(values, tpes):
+    """Workbook values keyed like md_var_map, with TPEs as tpe_player{n}/tpe_amt{n}."""
+    flat_vars = {WORKBOOK_KEYS.get(field, field): value for field, value in values.items()
+                 if value != f"{{{field}}}"}
+    for n, tpe in enumerate(tpes, start=1):
+        flat_vars[f"tpe_player{n}"] = tpe["player"]
+        flat_vars[f"tpe_amt{n}"] = tpe["amount"]
+    return flat_vars
+
+
+def render_team(values, tpes):
+    return TEMPLATE.render(dict(values, tpes=tpes))
+
+
+def create_note(client, title, body):
+    note = client.create_note(title, body, JOPLIN_NOTEBOOK_ID)
     print(f"🆕 Created note for {title}")
+    return note
 
 
-def update_note(note_id, body):
-    data = {"token": JOPLIN_TOKEN, "body": body}
-    r = requests.put(f"{JOPLIN_API}/notes/{note_id}", json=data)
-    r.raise_for_status()
+def update_note(client, note_id, body):
+    note = client.update_note(note_id, body=body)
     print(f"✅ Updated note {note_id}")
+    return note
 
 
-def main():
-    # Support CLI override of workbook path
-    workbook_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_WORKBOOK_PATH
-    if not os.path.exists(workbook_path):
-        print(f"❌ Workbook not found: {workbook_path}")
-        sys.exit(1)
-
-    wb = openpyxl.load_workbook(workbook_path, data_only=True)
-
-    for sheet in wb.worksheets:
-        team_name = sheet.title
-        values, missing = extract_team_data(sheet)
-        tpe_block = extract_tpes(sheet)
-        content = TEMPLATE.format(**values, TPE_BLOCK=tpe_block)
-
-        note = get_note_by_title(team_name)
-        if note:
-            update_note(note["id"], content)
-        else:
-            create_note(team_name, content)
+def push_team(client, index, state, team_name, content, force=False):
+    """Create or update the team's note; returns "created", "synced", "unchanged" or "edited"."""
+    note = index.current(team_name, client)
+    if not note:
+        note = create_note(client, team_name, content)
+        note_id = note["id"]
+        index.add({"id": note_id, "title": team_name, "updated_time": note.get("updated_time")})
+        state.record(team_name, content, note_id, note.get("updated_time"))
+        return "created"
+
+    note_id = note["id"]
+    status = CHANGED if force else state.check(team_name, content, note_id, note.get("updated_time"))
+    if status == UNCHANGED:
+        print(f"⏩ Unchanged {team_name}")
+        return "unchanged"
+    if status == EDITED:
+        print(f"⚠️  {team_name} was edited in Joplin since the last sync; skipping (use --force to overwrite)")
+        return "edited"
+    note = update_note(client, note_id, content)
+    index.update(team_name, updated_time=note["updated_time"])
+    state.record(team_name, content, note_id, note["updated_time"])
+    return "synced"
+
+
+def sync_teams(client, index, state, teams, force=False, metrics=None):
+    """Render and push each (path, team_name, extracted) entry; returns the teams pushed without error."""
+    synced = []
+    for path, team_name, (values, missing, tpes) in teams:
+        try:
+            with maybe_stage(metrics, "render", team_name):
+                content = render_team(values, tpes)
+            with maybe_stage(metrics, "push", team_name):
+                outcome = push_team(client, index, state, team_name, content, force)
+        except Exception as e:
+            print(f"❌ {team_name}: {e}")
+            if metrics:
+                metrics.outcome(team_name, "failed")
+            continue
+        if metrics:
+            metrics.outcome(team_name, outcome)
+        synced.append((path, team_name))
 
         if missing:
             print(f"⚠️  {team_name}: Missing data for cells {', '.join(missing)}")
+    return synced
+
+
+def watch(args, client, index, state, teams, synced, metrics=None):
+    """Stay resident and re-sync the teams whose values changed on every workbook save.
+
+    Only teams in `synced` (pushed without error) count as up to date; the rest are
+    retried on the next save even if their values didn't change.
+    """
+    synced = set(synced)
+    last = {(os.path.abspath(path), team_name): extracted for path, team_name, extracted in teams
+            if (path, team_name) in synced}
+    use_cache = not args.no_cache
+
+    for changed in watch_files(args.workbooks, args.debounce, args.poll_interval, use_inotify=not args.poll):
+        saved_at = max(save_time(path) for path in changed)
+        try:
+            with maybe_stage(metrics, "load"):
+                reloaded = load_teams(sorted(changed), workers=args.workers, use_cache=use_cache)
+        except Exception as e:
+            # Usually a save still in progress; the next write event retries
+            print(f"❌ Could not read {', '.join(os.path.basename(path) for path in changed)}: {e}")
+            continue
+
+        affected = [(path, team_name, extracted) for path, team_name, extracted in reloaded
+                    if last.get((path, team_name)) != extracted]
+        if not affected:
+            print("⏩ No team values changed")
+            continue
+
+        synced = sync_teams(client, index, state, affected, args.force, metrics)
+        state.save()
+        for path, team_name, extracted in affected:
+            if (path, team_name) in synced:
+                last[(path, team_name)] = extracted
+        print(f"⏱️  {len(synced)}/{len(affected)} team(s) synced {time.time() - saved_at:.2f}s after save")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync local cap workbooks into Joplin team notes.")
+    parser.add_argument("workbooks", nargs="*", default=[DEFAULT_WORKBOOK_PATH],
+                        help="Path(s) to .xlsx workbooks; every worksheet is one team")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Processes used to parse workbooks/worksheets in parallel (default: one per workbook)")
+    parser.add_argument("--force", action="store_true",
+                        help="Push every note, even unchanged or hand-edited ones")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Re-read every worksheet instead of using the parsed-workbook cache")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and re-sync affected teams whenever a workbook is saved")
+    parser.add_argument("--debounce", type=float, default=WATCH_DEBOUNCE,
+                        help="Seconds without further saves before a change is synced")
+    parser.add_argument("--poll", action="store_true",
+                        help="Poll the workbooks instead of using inotify")
+    parser.add_argument("--poll-interval", type=float, default=WATCH_POLL_INTERVAL,
+                        help="Seconds between checks when polling")
+    add_cassette_args(parser)
+    add_metrics_args(parser)
+    args = parser.parse_args()
+
+    for workbook_path in args.workbooks:
+        if not os.path.exists(workbook_path):
+            print(f"❌ Workbook not found: {workbook_path}")
+            sys.exit(1)
+
+    # Metrics hook HTTP after the cassette, so replayed calls are counted too
+    with cassette_from_args(args) as cassette, metrics_from_args("joplin_local_sync", args) as metrics:
+        with metrics.stage("load"):
+            teams = load_teams(args.workbooks, workers=args.workers, use_cache=not args.no_cache)
+        # Under a cassette, replays start from the recorded run's state (see cassette.local_file)
+        state = SyncState(local_file(cassette, "sync_state/joplin_local_sync.json", state_path("joplin_local_sync")))
+
+        with metrics.stage("setup"):
+            client = get_client()
+            index = NoteIndex.load(JOPLIN_NOTEBOOK_ID, client,
+                                   cache_path=local_file(cassette, "note_index.json", NOTE_INDEX_CACHE))
+        try:
+            synced = sync_teams(client, index, state, teams, args.force, metrics)
+            if args.watch:
+                state.save()
+                watch(args, client, index, state, teams, synced, metrics)
+        except KeyboardInterrupt:
+            print("👋 Stopped watching")
+        finally:
+            state.save()
+            if NOTE_INDEX_CACHE_TTL > 0:
+                index.save()
 
 
 if __name__ == "__main__":
@@ -1,16 +1,20 @@
 #!/usr/bin/env python3
 
 import os
+import sys
+import argparse
 import yaml
 from dotenv import load_dotenv
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from joplin.utils.throttle import get_limiter
+from joplin.utils.cassette import add_cassette_args, cassette_from_args, replay_credentials
+from joplin.utils.google_auth import get_drive_service, use_credentials
 
 # ------------------------------------------------------------------------------
 # Load environment variables from .env
-# Used for GOOGLE_CREDENTIALS and GOOGLE_TOKEN_PATH
+# (Google credentials and the token file are configured in config/google_config.py)
 # ------------------------------------------------------------------------------
 
 load_dotenv()
@@ -21,15 +25,6 @@ load_dotenv()
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-# ------------------------------------------------------------------------------
-# Credential + token paths, pulled from .env or default fallback paths
-# CREDENTIALS_PATH is the OAuth 2.0 client credentials downloaded from GCP
-# TOKEN_PATH stores a generated refresh token to avoid repeated logins
-# ------------------------------------------------------------------------------
-
-CREDENTIALS_PATH = os.getenv("GOOGLE_CREDENTIALS", os.path.join(BASE_DIR, "auth/secrets/oauth/credentials.json"))
-TOKEN_PATH = os.getenv("GOOGLE_TOKEN_PATH", os.path.join(BASE_DIR, "auth/secrets/oauth/.token.json"))
-
 # ------------------------------------------------------------------------------
 # Output YAML path: will write config/teamsheets.yaml
 # ------------------------------------------------------------------------------
@@ -43,34 +38,6 @@ CONFIG_PATH = os.getenv("teamsheets.yaml", os.path.join(BASE_DIR, "config", "tea
 
 FOLDER_ID = "1YUwfswiO_iVCb_cTQH6pde-miCzXWAd3"
 
-# ------------------------------------------------------------------------------
-# Required API scopes:
-# - Drive metadata to list files in the shared folder
-# ------------------------------------------------------------------------------
-
-SCOPES = [
-    "https://www.googleapis.com/auth/drive.metadata.readonly",
-]
-
-# ------------------------------------------------------------------------------
-# Authenticate with Google using OAuth2
-# Reuses saved token from TOKEN_PATH if possible, otherwise triggers login
-# ------------------------------------------------------------------------------
-
-def authenticate():
-    creds = None
-    if os.path.exists(TOKEN_PATH):
-        creds = Credentials.from_authorized_user_file(TOKEN_PATH, SCOPES)
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            flow = InstalledAppFlow.from_client_secrets_file(CREDENTIALS_PATH, SCOPES)
-            creds = flow.run_local_server(port=0)
-        with open(TOKEN_PATH, "w") as token_file:
-            token_file.write(creds.to_json())
-    return creds
-
 # ------------------------------------------------------------------------------
 # Extract team name from file name pattern: 'Team Name - GM Name'
 # ------------------------------------------------------------------------------
@@ -84,10 +51,26 @@ def extract_team_name(filename: str) -> str:
 # Return a dict mapping team name → Google Sheets URL
 # ------------------------------------------------------------------------------
 
-def fetch_team_sheet_links(service):
+def list_team_sheet_files(service, fields="id, name"):
     query = f"'{FOLDER_ID}' in parents and mimeType = 'application/vnd.google-apps.spreadsheet'"
-    results = service.files().list(q=query, fields="files(id, name)").execute()
-    files = results.get("files", [])
+    files = []
+    page_token = None
+    while True:
+        request = service.files().list(
+            q=query,
+            fields=f"nextPageToken, files({fields})",
+            pageSize=100,
+            pageToken=page_token,
+        )
+        results = get_limiter("drive").call(request.execute)
+        files.extend(results.get("files", []))
+        page_token = results.get("nextPageToken")
+        if not page_token:
+            return files
+
+
+def fetch_team_sheet_links(service):
+    files = list_team_sheet_files(service)
 
     team_links = {}
     for file in files:
@@ -97,6 +80,22 @@ def fetch_team_sheet_links(service):
 
     return team_links
 
+# ------------------------------------------------------------------------------
+# Fetch modifiedTime + version of every sheet in the folder in one listing
+# Return a dict mapping sheet id → {"name", "modifiedTime", "version"}
+# ------------------------------------------------------------------------------
+
+def fetch_team_sheet_versions(service):
+    files = list_team_sheet_files(service, fields="id, name, modifiedTime, version")
+    return {
+        file["id"]: {
+            "name": file["name"],
+            "modifiedTime": file.get("modifiedTime"),
+            "version": file.get("version"),
+        }
+        for file in files
+    }
+
 # ------------------------------------------------------------------------------
 # Write team_links dictionary to YAML file at CONFIG_PATH
 # ------------------------------------------------------------------------------
@@ -108,14 +107,18 @@ def write_yaml(data, path=CONFIG_PATH):
     print(f"✅ teamsheets.yaml written to {path} with {len(data)} teams.")
 
 # ------------------------------------------------------------------------------
-# Main logic: authenticate, fetch sheet links, write YAML config
+# Main logic: fetch sheet links (shared Google credentials), write YAML config
 # ------------------------------------------------------------------------------
 
 def main():
-    creds = authenticate()
-    drive_service = build("drive", "v3", credentials=creds)
-
-    team_links = fetch_team_sheet_links(drive_service)
+    parser = argparse.ArgumentParser(description="Write config/teamsheets.yaml from the shared TeamSheets folder.")
+    add_cassette_args(parser)
+    args = parser.parse_args()
+
+    with cassette_from_args(args):
+        if args.replay:
+            use_credentials(replay_credentials())
+        team_links = fetch_team_sheet_links(get_drive_service())
     write_yaml(team_links)
 
 if __name__ == "__main__":
@@ -0,0 +1,347 @@
+# utils/metrics.py
+
+"""
+Run metrics for the sync commands: where a run's time went.
+
+    with RunMetrics("joplin_sync") as metrics:
+        with metrics.stage("fetch", team):
+            ...
+        push = metrics.timed("push", push)      # func(team, ...) pipeline stages
+        metrics.outcome(team, "synced")
+
+Records per-team and per-stage durations and, by hooking the same two HTTP
+layers as the cassette (requests' HTTPAdapter.send, httplib2's Http.request),
+every API call's count, errors, bytes each way, time and urllib3 retries,
+grouped by API (sheets, drive, joplin, oauth) and endpoint. Throttle waits and
+quota backoffs come from the shared rate limiters.
+
+On exit the run summary is written as JSON (SYNC_METRICS_DIR/<command>.json
+unless --metrics-json says otherwise) and, when SYNC_METRICS_TEXTFILE_DIR or
+--prom-textfile is set, as a Prometheus textfile for node_exporter; a one-line
+summary is printed either way.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import tempfile
+import threading
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from config.joplin_config import JOPLIN_API, SYNC_METRICS_DIR, SYNC_METRICS_TEXTFILE_DIR
+from joplin.utils.throttle import limiter_stats
+
+# Path segments that are ids (sheet ids, note/folder ids): long tokens with a digit
+_ID_SEGMENT = re.compile(r"^(?=.*\d)[\w-]{16,}$")
+_JOPLIN_HOST = urlsplit(JOPLIN_API).netloc
+OAUTH_HOSTS = {"oauth2.googleapis.com", "accounts.google.com"}
+
+
+def api_name(url):
+    parts = urlsplit(url)
+    host = parts.hostname or ""
+    if host.startswith("sheets."):
+        return "sheets"
+    if parts.path.startswith("/drive") or host.startswith("drive."):
+        return "drive"
+    if host in OAUTH_HOSTS:
+        return "oauth"
+    if parts.netloc == _JOPLIN_HOST:
+        return "joplin"
+    return host
+
+
+def endpoint(method, url):
+    """"PUT /notes/{id}", "GET /v4/spreadsheets/{id}/values:batchGet"."""
+    segments = ["{id}" if _ID_SEGMENT.match(seg) else seg for seg in urlsplit(url).path.split("/") if seg]
+    return f"{method} /{'/'.join(segments)}"
+
+
+def _size(body):
+    if body is None:
+        return 0
+    if isinstance(body, str):
+        return len(body.encode("utf-8"))
+    return len(body) if isinstance(body, (bytes, bytearray)) else 0
+
+
+def _human_bytes(count):
+    for unit in ("B", "KB", "MB", "GB"):
+        if count < 1024 or unit == "GB":
+            return f"{count:.0f} {unit}" if unit == "B" else f"{count:.1f} {unit}"
+        count /= 1024
+
+
+class RunMetrics:
+    def __init__(self, command, json_path=None, prom_path=None):
+        self.command = command
+        self.json_path = json_path or os.path.join(SYNC_METRICS_DIR, f"{command}.json")
+        self.prom_path = prom_path or (
+            os.path.join(SYNC_METRICS_TEXTFILE_DIR, f"{command}.prom") if SYNC_METRICS_TEXTFILE_DIR else None)
+        self.stages = {}     # stage → {"seconds", "count", "max_seconds", "slowest_team"}
+        self.teams = {}      # team → {"outcome", "stages": {stage: seconds}}
+        self.api = {}        # api → totals plus "endpoints"
+        self.status = "running"
+        self.error = None
+        self._lock = threading.Lock()
+        self._patched = None
+        self._started = time.perf_counter()
+        self._started_at = datetime.now(timezone.utc)
+        self.duration = None
+
+    # ---- Stages / teams ----
+
+    def add_stage(self, name, seconds, team=None):
+        with self._lock:
+            stage = self.stages.setdefault(name, {"seconds": 0.0, "count": 0, "max_seconds": 0.0, "slowest_team": None})
+            stage["seconds"] += seconds
+            stage["count"] += 1
+            if seconds > stage["max_seconds"]:
+                stage["max_seconds"], stage["slowest_team"] = seconds, team
+            if team is not None:
+                stages = self.teams.setdefault(team, {"outcome": None, "stages": {}})["stages"]
+                stages[name] = stages.get(name, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name, team=None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage(name, time.perf_counter() - start, team)
+
+    def timed(self, name, func):
+        """Wrap a func(team, ...) so each call is timed as `name` for that team."""
+        def wrapper(team, *args, **kwargs):
+            with self.stage(name, team):
+                return func(team, *args, **kwargs)
+        return wrapper
+
+    def outcome(self, team, outcome):
+        """synced / created / unchanged / edited / failed — the last one recorded wins."""
+        with self._lock:
+            self.teams.setdefault(team, {"outcome": None, "stages": {}})["outcome"] = outcome
+
+    # ---- API calls ----
+
+    def add_call(self, method, url, status, sent, received, seconds, retries=0):
+        api = api_name(url)
+        failed = status is None or status >= 400
+        with self._lock:
+            totals = self.api.setdefault(api, {"calls": 0, "errors": 0, "retries": 0, "bytes_sent": 0,
+                                               "bytes_received": 0, "seconds": 0.0, "endpoints": {}})
+            key = endpoint(method, url)
+            per_endpoint = totals["endpoints"].setdefault(key, {"calls": 0, "errors": 0, "seconds": 0.0})
+            for bucket in (totals, per_endpoint):
+                bucket["calls"] += 1
+                bucket["errors"] += failed
+                bucket["seconds"] += seconds
+            totals["retries"] += retries
+            totals["bytes_sent"] += sent
+            totals["bytes_received"] += received
+
+    def _send(self, original):
+        metrics = self
+
+        def send(adapter, request, **kwargs):
+            start = time.perf_counter()
+            try:
+                response = original(adapter, request, **kwargs)
+            except Exception:
+                metrics.add_call(request.method, request.url, None, _size(request.body), 0,
+                                 time.perf_counter() - start)
+                raise
+            retries = getattr(getattr(response.raw, "retries", None), "history", ()) or ()
+            metrics.add_call(request.method, request.url, response.status_code, _size(request.body),
+                             len(response.content or b""), time.perf_counter() - start, len(retries))
+            return response
+
+        return send
+
+    def _http_request(self, original):
+        metrics = self
+
+        def request(http, uri, method="GET", body=None, headers=None, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                response, content = original(http, uri, method, body, headers, *args, **kwargs)
+            except Exception:
+                metrics.add_call(method, uri, None, _size(body), 0, time.perf_counter() - start)
+                raise
+            metrics.add_call(method, uri, response.status, _size(body), len(content or b""),
+                             time.perf_counter() - start)
+            return response, content
+
+        return request
+
+    def install(self):
+        import httplib2  # only the Drive client uses it; loaded when a hook is installed
+
+        if self._patched is None:
+            self._patched = (HTTPAdapter.send, httplib2.Http.request)
+            HTTPAdapter.send = self._send(self._patched[0])
+            httplib2.Http.request = self._http_request(self._patched[1])
+        return self
+
+    def uninstall(self):
+        import httplib2
+
+        if self._patched is not None:
+            HTTPAdapter.send, httplib2.Http.request = self._patched
+            self._patched = None
+
+    # ---- Summary / export ----
+
+    def summary(self):
+        with self._lock:
+            outcomes = {}
+            for team in self.teams.values():
+                if team["outcome"]:
+                    outcomes[team["outcome"]] = outcomes.get(team["outcome"], 0) + 1
+            return {
+                "command": self.command,
+                "started_at": self._started_at.isoformat(timespec="seconds"),
+                "duration_seconds": round(self.duration if self.duration is not None
+                                          else time.perf_counter() - self._started, 3),
+                "status": self.status,
+                "error": self.error,
+                "teams": {"total": len(self.teams), "outcomes": outcomes},
+                "stages": {name: dict(stage, seconds=round(stage["seconds"], 4),
+                                      max_seconds=round(stage["max_seconds"], 4))
+                           for name, stage in self.stages.items()},
+                "api": {api: dict(totals, seconds=round(totals["seconds"], 4),
+                                  endpoints={key: dict(calls, seconds=round(calls["seconds"], 4))
+                                             for key, calls in totals["endpoints"].items()})
+                        for api, totals in self.api.items()},
+                "throttle": limiter_stats(),
+                "per_team": {team: {"outcome": entry["outcome"],
+                                    "stages": {name: round(s, 4) for name, s in entry["stages"].items()}}
+                             for team, entry in self.teams.items()},
+            }
+
+    def prometheus(self, summary=None):
+        summary = summary or self.summary()
+        command = _label(summary["command"])
+        lines = []
+
+        def metric(name, help_text, kind, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join([f'command="{command}"'] + [f'{k}="{_label(v)}"' for k, v in labels.items()])
+                lines.append(f"{name}{{{label_text}}} {value}")
+
+        finished = self._started_at.timestamp() + summary["duration_seconds"]
+        metric("sync_run_duration_seconds", "Wall time of the last run.", "gauge",
+               [({}, summary["duration_seconds"])])
+        metric("sync_run_success", "1 if the last run finished with no errors and no failed teams.", "gauge",
+               [({}, int(summary["status"] == "ok"))])
+        metric("sync_run_finished_timestamp_seconds", "When the last run finished.", "gauge", [({}, round(finished))])
+        metric("sync_run_teams", "Teams handled by the last run, by outcome.", "gauge",
+               [({"outcome": outcome}, count) for outcome, count in summary["teams"]["outcomes"].items()])
+        metric("sync_stage_seconds", "Time spent per stage, summed over teams and workers.", "gauge",
+               [({"stage": name}, stage["seconds"]) for name, stage in summary["stages"].items()])
+        metric("sync_stage_max_seconds", "Slowest single team per stage.", "gauge",
+               [({"stage": name}, stage["max_seconds"]) for name, stage in summary["stages"].items()])
+        for field, help_text in (("calls", "API calls made."), ("errors", "API calls that failed or returned >= 400."),
+                                 ("retries", "Transport-level retries."), ("bytes_sent", "Request bytes sent."),
+                                 ("bytes_received", "Response bytes received."), ("seconds", "Time spent in API calls.")):
+            metric(f"sync_api_{field}", help_text, "gauge",
+                   [({"api": api}, round(totals[field], 4)) for api, totals in summary["api"].items()])
+        for field, help_text in (("wait_seconds", "Time spent waiting for rate-limiter tokens."),
+                                 ("quota_errors", "Quota (429) errors retried by the rate limiter."),
+                                 ("backoff_seconds", "Backoff time after quota errors.")):
+            metric(f"sync_throttle_{field}", help_text, "gauge",
+                   [({"limiter": name}, stats[field]) for name, stats in summary["throttle"].items()])
+        return "\n".join(lines) + "\n"
+
+    def report(self, summary):
+        stages = " · ".join(f"{name} {stage['seconds']:.2f}s" for name, stage in summary["stages"].items())
+        calls = sum(totals["calls"] for totals in summary["api"].values())
+        per_api = ", ".join(f"{api} {totals['calls']}" for api, totals in summary["api"].items())
+        moved = sum(totals["bytes_sent"] + totals["bytes_received"] for totals in summary["api"].values())
+        retries = sum(totals["retries"] for totals in summary["api"].values()) + \
+            sum(stats["quota_errors"] for stats in summary["throttle"].values())
+        waits = sum(stats["wait_seconds"] + stats["backoff_seconds"] for stats in summary["throttle"].values())
+        status = "" if summary["status"] == "ok" else f" [{summary['status']}]"
+        return (f"📊 {self.command}{status}: {summary['teams']['total']} teams in {summary['duration_seconds']:.2f}s"
+                f"{f' ({stages})' if stages else ''}; {calls} API calls{f' ({per_api})' if per_api else ''}, "
+                f"{_human_bytes(moved)}, {retries} retries, {waits:.2f}s throttled")
+
+    def finish(self, error=None):
+        self.duration = time.perf_counter() - self._started
+        if isinstance(error, KeyboardInterrupt):
+            self.status = "interrupted"
+        elif error is not None and not (isinstance(error, SystemExit) and not error.code):
+            self.status, self.error = "failed", f"{type(error).__name__}: {error}"
+        elif any(team["outcome"] == "failed" for team in self.teams.values()):
+            self.status = "partial"
+        else:
+            self.status = "ok"
+
+        summary = self.summary()
+        if self.json_path == "-":
+            print(json.dumps(summary, indent=2, ensure_ascii=False))
+        else:
+            _write_atomic(self.json_path, json.dumps(summary, indent=2, ensure_ascii=False))
+        if self.prom_path:
+            _write_atomic(self.prom_path, self.prometheus(summary))
+        print(self.report(summary))
+        return summary
+
+    def __enter__(self):
+        return self.install()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.uninstall()
+        try:
+            self.finish(exc)
+        except OSError as e:
+            print(f"⚠️  Could not write run metrics: {e}")
+        return False
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _write_atomic(path, text):
+    """Write via a temp file + rename, so cron/node_exporter never read a half-written file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".metrics-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.chmod(tmp, 0o644)  # mkstemp makes it 0600; node_exporter usually runs as another user
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def maybe_stage(metrics, name, team=None):
+    """metrics.stage(...) for helpers that may run without a RunMetrics."""
+    return metrics.stage(name, team) if metrics else nullcontext()
+
+
+# ---- CLI glue shared by the sync tools ----
+
+def add_metrics_args(parser):
+    parser.add_argument("--metrics-json", metavar="PATH",
+                        help="Where to write the JSON run summary ('-' for stdout; default SYNC_METRICS_DIR/<command>.json)")
+    parser.add_argument("--prom-textfile", metavar="PATH",
+                        help="Also export the run as a Prometheus textfile (*.prom)")
+
+
+def metrics_from_args(command, args):
+    return RunMetrics(command, getattr(args, "metrics_json", None), getattr(args, "prom_textfile", None))
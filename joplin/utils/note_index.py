@@ -0,0 +1,133 @@
+# utils/note_index.py
+
+"""
+In-memory title → note index for the team notebook.
+
+Built from a paginated /folders/{id}/notes listing (only the fields we need),
+so a 30-team run costs one or two list calls instead of a /search per team,
+and doesn't depend on Joplin's search index being current.
+
+An index reused from the on-disk cache only trusts ids and titles: current()
+re-reads a note's updated_time before it is pushed, so notes edited in Joplin
+since the cache was written are still caught by SyncState.check.
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import threading
+
+import requests
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from config.joplin_config import NOTE_INDEX_CACHE, NOTE_INDEX_CACHE_TTL
+from joplin.utils.joplin_client import get_client
+
+NOTE_FIELDS = "id,title,updated_time"
+
+
+class NoteIndex:
+    def __init__(self, notebook_id, notes=(), cached=False):
+        self.notebook_id = notebook_id
+        self.cached = cached  # loaded from disk: updated_time values may be stale
+        self.cache_path = NOTE_INDEX_CACHE
+        self._lock = threading.Lock()
+        self._by_title = {}
+        self._fresh = set()  # titles whose updated_time was read or written this run
+        for note in notes:
+            self.add(note)
+        self._fresh.clear()
+
+    @classmethod
+    def build(cls, notebook_id, client=None):
+        client = client or get_client()
+        return cls(notebook_id, client.list_notes(notebook_id, fields=NOTE_FIELDS))
+
+    @classmethod
+    def load(cls, notebook_id, client=None, cache_path=NOTE_INDEX_CACHE, ttl=NOTE_INDEX_CACHE_TTL):
+        """Reuse the on-disk index if it is younger than `ttl` seconds, else rebuild it."""
+        if ttl > 0 and os.path.exists(cache_path) and time.time() - os.path.getmtime(cache_path) < ttl:
+            try:
+                with open(cache_path, "r", encoding="utf-8") as f:
+                    cached = json.load(f)
+                if cached.get("notebook_id") == notebook_id:
+                    index = cls(notebook_id, cached.get("notes", []), cached=True)
+                    index.cache_path = cache_path
+                    return index
+            except (OSError, ValueError):
+                pass
+
+        index = cls.build(notebook_id, client)
+        index.cache_path = cache_path
+        if ttl > 0:
+            index.save()
+        return index
+
+    def add(self, note):
+        """Insert or refresh a note. With duplicate titles the most recently updated wins."""
+        with self._lock:
+            current = self._by_title.get(note["title"])
+            if current and current["id"] != note["id"] \
+                    and (current.get("updated_time") or 0) > (note.get("updated_time") or 0):
+                print(f"⚠️  Duplicate note title '{note['title']}' in notebook; using {current['id']}")
+                return
+            self._by_title[note["title"]] = dict(note)
+            self._fresh.add(note["title"])
+
+    def update(self, title, **fields):
+        with self._lock:
+            if title in self._by_title:
+                self._by_title[title].update(fields)
+                if "updated_time" in fields:
+                    self._fresh.add(title)
+
+    def current(self, title, client=None):
+        """
+        Like get(), but with the note's live updated_time when the index came
+        from the disk cache. Returns None (and forgets the title) if the cached
+        note no longer exists.
+        """
+        note = self.get(title)
+        if note is None or not self.cached or title in self._fresh:
+            return note
+        client = client or get_client()
+        try:
+            live = client.get_note(note["id"], fields="id,updated_time")
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code != 404:
+                raise
+            with self._lock:
+                self._by_title.pop(title, None)
+            return None
+        self.update(title, updated_time=live.get("updated_time"))
+        return self.get(title)
+
+    def get(self, title, ignore_case=False):
+        with self._lock:
+            note = self._by_title.get(title)
+            if note is None and ignore_case:
+                lowered = title.lower()
+                note = next((n for t, n in self._by_title.items() if t.lower() == lowered), None)
+            return dict(note) if note else None
+
+    def get_id(self, title, ignore_case=False):
+        note = self.get(title, ignore_case)
+        return note["id"] if note else None
+
+    def __len__(self):
+        return len(self._by_title)
+
+    def save(self, cache_path=None):
+        """Write the index to `cache_path` (default: where it was loaded from)."""
+        cache_path = cache_path or self.cache_path
+        with self._lock:
+            data = {"notebook_id": self.notebook_id, "notes": list(self._by_title.values())}
+        directory = os.path.dirname(cache_path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".note_index-", suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, cache_path)
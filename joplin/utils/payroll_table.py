@@ -0,0 +1,60 @@
+# utils/payroll_table.py
+
+"""
+Column-oriented builder for the payroll section of a team note.
+
+The fetched ranges are lined up once into a single DataFrame (padded to the
+longest column), rows without a player are dropped with one mask, and every
+table line is assembled with vectorized string concatenation. The seasons
+come from `payroll_seasons` in md_var_map.yaml, so adding a year is config.
+pandas is imported on the first build, not when the module is imported.
+"""
+
+NAME_KEY = "player_name"
+
+
+def column_values(rows):
+    """First cell of each fetched row; the API omits empty trailing cells."""
+    return [row[0] if row else "" for row in rows]
+
+
+def payroll_frame(list_vars, seasons, name_key=NAME_KEY):
+    import pandas as pd
+
+    keys = [name_key] + [key for season in seasons for key in (season["salary"], season["status"])]
+    frame = pd.DataFrame({
+        key: pd.Series(column_values(list_vars.get(key, [])), dtype="object")
+        for key in keys
+    })
+    frame = frame.fillna("").astype(str)
+    # Row numbers follow the sheet's slot order, even across empty slots
+    frame.insert(0, "#", (frame.index + 1).astype(str))
+    return frame[frame[name_key].str.strip() != ""]
+
+
+class PayrollTable:
+    """Markdown table value understood natively by the template engine."""
+
+    def __init__(self, frame, seasons, name_key=NAME_KEY):
+        self.columns = ["#", name_key] + [key for season in seasons for key in (season["salary"], season["status"])]
+        self.header = ["#", "Player Name"] + [
+            label for season in seasons for label in (f"{season['label']} Salary", "Status")
+        ]
+        self.frame = frame
+
+    def __len__(self):
+        return len(self.frame)
+
+    def to_markdown(self):
+        lines = "| " + self.frame[self.columns[0]]
+        for column in self.columns[1:]:
+            lines = lines + " | " + self.frame[column]
+        lines = lines + " |"
+
+        header = "| " + " | ".join(self.header) + " |\n|" + "|".join("---" for _ in self.header) + "|\n"
+        body = "\n".join(lines.tolist())
+        return header + (body + "\n" if body else "")
+
+
+def build_payroll_table(list_vars, seasons, name_key=NAME_KEY):
+    return PayrollTable(payroll_frame(list_vars, seasons, name_key), seasons, name_key)
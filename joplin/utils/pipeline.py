@@ -0,0 +1,92 @@
+# utils/pipeline.py
+
+"""
+Small threaded pipeline: each stage has its own worker pool and hands work to
+the next stage through a bounded queue, so team N+1 can be fetching while
+team N is still being pushed.
+"""
+
+import queue
+import threading
+from collections import namedtuple
+
+# func(key, payload) -> payload for the next stage
+Stage = namedtuple("Stage", ["name", "func", "workers"])
+
+_DONE = object()
+
+
+def run_pipeline(items, stages, queue_size=8, on_error=None):
+    """
+    Run (key, payload) items through `stages` in order.
+
+    A failure in any stage drops only that item: `on_error(key, stage_name, exc)`
+    is called and the rest of the pipeline keeps going.
+    Returns a list of (key, result) for items that made it through every stage.
+    """
+    queues = [queue.Queue(maxsize=queue_size) for _ in stages]
+    results = []
+    results_lock = threading.Lock()
+    threads = []
+
+    def report_error(key, stage_name, exc):
+        if not on_error:
+            return
+        try:
+            on_error(key, stage_name, exc)
+        except Exception as e:
+            print(f"⚠️  Error handler failed for {key} ({stage_name}): {e}")
+
+    def worker(index, stage, remaining):
+        inbox = queues[index]
+        outbox = queues[index + 1] if index + 1 < len(stages) else None
+
+        try:
+            while True:
+                item = inbox.get()
+                if item is _DONE:
+                    break
+
+                key, payload = item
+                try:
+                    result = stage.func(key, payload)
+                except Exception as e:
+                    report_error(key, stage.name, e)
+                    continue
+
+                if outbox is not None:
+                    outbox.put((key, result))
+                else:
+                    with results_lock:
+                        results.append((key, result))
+        finally:
+            # Last worker out of this stage tells the next stage to shut down,
+            # even if this worker died, so join() below never hangs
+            with remaining["lock"]:
+                remaining["count"] -= 1
+                last = remaining["count"] == 0
+            if last and outbox is not None:
+                for _ in range(stages[index + 1].workers):
+                    outbox.put(_DONE)
+
+    for index, stage in enumerate(stages):
+        if stage.workers < 1:
+            raise ValueError(f"Stage '{stage.name}' needs at least one worker")
+        remaining = {"count": stage.workers, "lock": threading.Lock()}
+        for n in range(stage.workers):
+            t = threading.Thread(
+                target=worker, args=(index, stage, remaining),
+                name=f"{stage.name}-{n}", daemon=True,
+            )
+            t.start()
+            threads.append(t)
+
+    for item in items:
+        queues[0].put(item)
+    for _ in range(stages[0].workers):
+        queues[0].put(_DONE)
+
+    for t in threads:
+        t.join()
+
+    return results
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# utils/range_planner.py
+
+"""
+Compile md_var_map.yaml into the smallest set of A1 ranges worth fetching.
+
+Nearby cells and ranges are merged into bounding rectangles as long as the
+merge doesn't drag in too many unused cells, then each placeholder's value is
+sliced back out of the fetched blocks.
+
+Run directly to see what a map costs:
+    python joplin/utils/range_planner.py [--map config/md_var_map.yaml]
+"""
+
+import os
+import re
+import sys
+import argparse
+from collections import namedtuple
+
+import yaml
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from config.sheets_config import MD_VAR_MAP_PATH
+
+# Merging two rectangles may pull in at most this many cells nobody asked for
+MAX_WASTE_CELLS = 64
+
+A1_RE = re.compile(r"^\$?([A-Za-z]+)\$?(\d+)$")
+
+Rect = namedtuple("Rect", ["row1", "col1", "row2", "col2"])
+
+
+def column_index(letters):
+    index = 0
+    for ch in letters.upper():
+        index = index * 26 + (ord(ch) - ord("A") + 1)
+    return index
+
+
+def column_letters(index):
+    letters = ""
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(ord("A") + rem) + letters
+    return letters
+
+
+def parse_a1(ref):
+    """Parse 'Q6' or 'C8:C27' into a Rect (1-based, inclusive)."""
+    parts = ref.split(":")
+    if len(parts) > 2:
+        raise ValueError(f"Invalid A1 range: {ref}")
+
+    corners = []
+    for part in parts:
+        match = A1_RE.match(part.strip())
+        if not match:
+            raise ValueError(f"Invalid A1 reference: {ref}")
+        corners.append((int(match.group(2)), column_index(match.group(1))))
+
+    (r1, c1), (r2, c2) = corners[0], corners[-1]
+    return Rect(min(r1, r2), min(c1, c2), max(r1, r2), max(c1, c2))
+
+
+def to_a1(rect):
+    start = f"{column_letters(rect.col1)}{rect.row1}"
+    if (rect.row1, rect.col1) == (rect.row2, rect.col2):
+        return start
+    return f"{start}:{column_letters(rect.col2)}{rect.row2}"
+
+
+def area(rect):
+    return (rect.row2 - rect.row1 + 1) * (rect.col2 - rect.col1 + 1)
+
+
+def union(a, b):
+    return Rect(min(a.row1, b.row1), min(a.col1, b.col1), max(a.row2, b.row2), max(a.col2, b.col2))
+
+
+def overlap(a, b):
+    rows = min(a.row2, b.row2) - max(a.row1, b.row1) + 1
+    cols = min(a.col2, b.col2) - max(a.col1, b.col1) + 1
+    return rows * cols if rows > 0 and cols > 0 else 0
+
+
+def contains(outer, inner):
+    return (outer.row1 <= inner.row1 and outer.col1 <= inner.col1
+            and outer.row2 >= inner.row2 and outer.col2 >= inner.col2)
+
+
+def coalesce(rects, max_waste=MAX_WASTE_CELLS):
+    """
+    Greedily merge the pair of rectangles whose bounding box wastes the fewest
+    cells, until every remaining merge would waste more than `max_waste`.
+    """
+    blocks = list(dict.fromkeys(rects))
+
+    while len(blocks) > 1:
+        best = None
+        for i in range(len(blocks)):
+            for j in range(i + 1, len(blocks)):
+                a, b = blocks[i], blocks[j]
+                merged = union(a, b)
+                waste = area(merged) - (area(a) + area(b) - overlap(a, b))
+                if best is None or waste < best[0]:
+                    best = (waste, i, j, merged)
+
+        waste, i, j, merged = best
+        if waste > max_waste:
+            break
+        blocks = [blk for k, blk in enumerate(blocks) if k not in (i, j)] + [merged]
+
+    return sorted(blocks, key=lambda r: (r.col1, r.row1))
+
+
+class RangePlan:
+    """
+    Fetch plan for one md_var_map: `ranges` is what gets sent to batchGet,
+    `extract()` turns the fetched blocks back into (flat_vars, list_vars).
+    """
+
+    def __init__(self, var_map, max_waste=MAX_WASTE_CELLS):
+        self.vars = []
+        for section, entries in var_map.items():
+            if not isinstance(entries, dict):
+                continue  # non-range config (e.g. season lists) lives alongside the ranges
+            for key, ref in entries.items():
+                self.vars.append((key, parse_a1(ref), ":" in ref))
+
+        self.blocks = coalesce([rect for _, rect, _ in self.vars], max_waste)
+        self.ranges = [to_a1(block) for block in self.blocks]
+
+        self._slots = {}
+        for key, rect, _ in self.vars:
+            self._slots[key] = next(i for i, block in enumerate(self.blocks) if contains(block, rect))
+
+    def extract(self, value_ranges):
+        """
+        Slice each placeholder out of the fetched blocks. The API trims trailing
+        empty rows and cells, so anything past the returned data reads as "".
+        """
+        flat_vars = {}
+        list_vars = {}
+
+        for key, rect, is_list in self.vars:
+            block = self.blocks[self._slots[key]]
+            values = value_ranges[self._slots[key]] or []
+
+            rows = []
+            for row in range(rect.row1 - block.row1, rect.row2 - block.row1 + 1):
+                src = values[row] if row < len(values) else []
+                rows.append([
+                    src[col] if col < len(src) else ""
+                    for col in range(rect.col1 - block.col1, rect.col2 - block.col1 + 1)
+                ])
+
+            if is_list:
+                list_vars[key] = rows
+            else:
+                flat_vars[key] = rows[0][0]
+
+        return flat_vars, list_vars
+
+    def report(self):
+        lines = [f"{len(self.vars)} md_var_map keys → {len(self.ranges)} API range(s), "
+                 f"{sum(area(b) for b in self.blocks)} cells fetched"]
+        for i, block in enumerate(self.blocks):
+            keys = [key for key, _, _ in self.vars if self._slots[key] == i]
+            lines.append(f"  {to_a1(block):<10} ← {', '.join(keys)}")
+        return "\n".join(lines)
+
+
+def load_plan(path=MD_VAR_MAP_PATH, max_waste=MAX_WASTE_CELLS):
+    with open(path, "r") as f:
+        return RangePlan(yaml.safe_load(f), max_waste)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report how many Sheets API ranges md_var_map compiles to.")
+    parser.add_argument("--map", default=MD_VAR_MAP_PATH, help="Path to md_var_map.yaml")
+    parser.add_argument("--max-waste", type=int, default=MAX_WASTE_CELLS,
+                        help="Max unused cells a single merge may pull in")
+    args = parser.parse_args()
+
+    print(load_plan(args.map, args.max_waste).report())
+
+
+if __name__ == "__main__":
+    main()
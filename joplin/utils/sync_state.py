@@ -0,0 +1,100 @@
+# utils/sync_state.py
+
+"""
+Persistent per-team record of what was last pushed to Joplin.
+
+Each entry keeps a hash of the rendered body plus the note's id and
+`updated_time` right after our write, which is enough to
+  - skip the PUT when the new render is identical, and
+  - notice when someone edited the note by hand since the last sync.
+"""
+
+import os
+import sys
+import json
+import hashlib
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from config.joplin_config import SYNC_STATE_DIR
+
+CHANGED = "changed"
+UNCHANGED = "unchanged"
+EDITED = "edited"
+
+
+def state_path(name):
+    """State file for one sync tool, e.g. state_path("joplin_sync")."""
+    return os.path.join(SYNC_STATE_DIR, f"{name}.json")
+
+
+def body_hash(body):
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+class SyncState:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Ignoring unreadable sync state {path}: {e}")
+
+    @classmethod
+    def load(cls, name):
+        """State file for one sync tool, e.g. SyncState.load("joplin_sync")."""
+        return cls(state_path(name))
+
+    def get(self, team):
+        with self._lock:
+            return dict(self.entries.get(team, {}))
+
+    def check(self, team, body, note_id=None, remote_updated_time=None):
+        """
+        Compare a fresh render against the last recorded push:
+        UNCHANGED – same body, note untouched since → safe to skip the PUT
+        EDITED    – the note changed in Joplin after our last write
+        CHANGED   – anything else (new team, new note, new body)
+        """
+        entry = self.get(team)
+        if not entry or (note_id and entry.get("note_id") != note_id):
+            return CHANGED
+
+        recorded = entry.get("updated_time")
+        if remote_updated_time is not None and recorded is not None and remote_updated_time != recorded:
+            return EDITED
+
+        return UNCHANGED if entry.get("hash") == body_hash(body) else CHANGED
+
+    def record(self, team, body=None, note_id=None, updated_time=None, **extra):
+        with self._lock:
+            entry = self.entries.setdefault(team, {})
+            if body is not None:
+                entry["hash"] = body_hash(body)
+            if note_id is not None:
+                entry["note_id"] = note_id
+            if updated_time is not None:
+                entry["updated_time"] = updated_time
+            entry.update(extra)
+
+    def save(self):
+        """Write atomically so an interrupted run never leaves a torn file."""
+        with self._lock:
+            data = json.dumps(self.entries, indent=2, sort_keys=True)
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".sync_state-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp, self.path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
@@ -1,14 +1,15 @@
 import sys
 import locale
-import requests
 from pathlib import Path
 
 # Dynamically add the project root to sys.path
 project_root = Path(__file__).resolve().parents[2]
 sys.path.insert(0, str(project_root))
 
-from config.joplin_config import JOPLIN_API, JOPLIN_TOKEN, JOPLIN_NOTEBOOK_ID
+from config.joplin_config import JOPLIN_NOTEBOOK_ID
 from config.sheets_config import MD_TEMPLATE_PATH
+from joplin.utils.note_index import NoteIndex
+from joplin.utils.joplin_client import get_client
 
 def build_team_summary(sheet=None):
     template_path = Path(MD_TEMPLATE_PATH)
@@ -27,29 +28,21 @@ def get_teams():
         "Sacramento Kings", "San Antonio Spurs", "Toronto Raptors", "Utah Jazz", "Washington Wizards"
     ]
 
-def get_or_create_note(title, notebook_id):
-    search_url = f"{JOPLIN_API}/search?query={title}&type=note&token={JOPLIN_TOKEN}"
-    resp = requests.get(search_url)
-    results = resp.json().get("items", [])
-
-    for item in results:
-        if item.get("title") == title:
-            return item["id"]
+def get_or_create_note(client, index, title, notebook_id):
+    note_id = index.get_id(title)
+    if note_id:
+        return note_id
 
     # Create the note if it doesn't exist
-    create_url = f"{JOPLIN_API}/notes?token={JOPLIN_TOKEN}"
-    resp = requests.post(create_url, json={
-        "title": title,
-        "parent_id": notebook_id,
-        "body": ""
-    })
-    return resp.json()["id"]
+    note = client.create_note(title, "", notebook_id)
+    index.add({"id": note["id"], "title": title, "updated_time": note.get("updated_time")})
+    return note["id"]
 
-def get_note_body(note_id):
-    resp = requests.get(f"{JOPLIN_API}/notes/{note_id}", params={"token": JOPLIN_TOKEN})
-    if resp.status_code == 200:
-        return resp.json().get("body", "")
-    return ""
+def get_note_body(client, note_id):
+    try:
+        return client.get_note(note_id, fields="body").get("body", "")
+    except Exception:
+        return ""
 
 def should_update_note(existing_body, new_template):
     # Check for any placeholders in the template that aren't already present in the current body
@@ -58,24 +51,30 @@ def should_update_note(existing_body, new_template):
     existing_placeholders = set(re.findall(r"\{\{(\w+)\}\}", existing_body))
     return not new_placeholders.issubset(existing_placeholders)
 
-def update_note_body(note_id, markdown):
-    update_url = f"{JOPLIN_API}/notes/{note_id}?token={JOPLIN_TOKEN}"
-    resp = requests.put(update_url, json={"body": markdown})
-    return resp.status_code == 200
-
 def main():
     markdown_template = build_team_summary()
     teams = get_teams()
+    client = get_client()
+    index = NoteIndex.load(JOPLIN_NOTEBOOK_ID, client)
 
-    for team in teams:
-        note_id = get_or_create_note(team, JOPLIN_NOTEBOOK_ID)
-        current_body = get_note_body(note_id)
+    note_ids = {team: get_or_create_note(client, index, team, JOPLIN_NOTEBOOK_ID) for team in teams}
+    notes = client.get_notes(note_ids.values(), fields="id,body")
 
-        if should_update_note(current_body, markdown_template):
-            success = update_note_body(note_id, markdown_template)
-            print(f"{'✅' if success else '❌'} Updated {team} with new template.")
+    to_update = {}
+    for team, note_id in note_ids.items():
+        if isinstance(notes[note_id], Exception):
+            print(f"❌ Could not read {team}'s note, skipping: {notes[note_id]}")
+            continue
+        if should_update_note(notes[note_id].get("body", ""), markdown_template):
+            to_update[note_id] = markdown_template
         else:
             print(f"⏩ Skipped {team} — all placeholders already present.")
 
+    results = client.update_notes(to_update)
+    for team, note_id in note_ids.items():
+        if note_id in results:
+            success = not isinstance(results[note_id], Exception)
+            print(f"{'✅' if success else '❌'} Updated {team} with new template.")
+
 if __name__ == "__main__":
     main()
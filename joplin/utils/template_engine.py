@@ -0,0 +1,172 @@
+# utils/template_engine.py
+
+"""
+Compiled Markdown templates for the team notes.
+
+A template is parsed once into literal and placeholder segments and then
+rendered per team in a single join pass. Syntax:
+
+    {{name}}                  value; left as-is if the name has no value
+    {{#rows}} ... {{/rows}}   repeated once per item (dicts supply the inner names)
+    {{^rows}} ... {{/rows}}   rendered only when `rows` is missing or empty
+
+A value may also be a Table, which renders as a Markdown table. Section tags
+alone on a line swallow that line, so blocks don't leave blank lines behind.
+"""
+
+import os
+import re
+import threading
+
+TAG_RE = re.compile(r"\{\{\s*([#^/]?)\s*([^{}#^/]+?)\s*\}\}")
+
+TEXT, VAR, SECTION = "text", "var", "section"
+
+
+class TemplateError(ValueError):
+    pass
+
+
+class Table:
+    """Markdown table value: a header row plus rows of cell strings."""
+
+    def __init__(self, columns, rows, align=None):
+        self.columns = list(columns)
+        self.rows = rows
+        self.align = align or ["---"] * len(self.columns)
+
+    def to_markdown(self):
+        lines = ["| " + " | ".join(self.columns) + " |", "|" + "|".join(self.align) + "|"]
+        lines.extend("| " + " | ".join(str(cell) for cell in row) + " |" for row in self.rows)
+        return "\n".join(lines) + "\n"
+
+
+def _standalone(source, start, end):
+    """If the tag at source[start:end] sits alone on its line, return the line's bounds."""
+    line_start = source.rfind("\n", 0, start) + 1
+    line_end = source.find("\n", end)
+    line_end = len(source) if line_end == -1 else line_end + 1
+    if source[line_start:start].strip() or source[end:line_end].strip():
+        return None
+    return line_start, line_end
+
+
+def parse(source):
+    """Parse template text into a nested segment list."""
+    root = []
+    stack = [(None, root)]
+    pos = 0
+
+    for match in TAG_RE.finditer(source):
+        if match.start() < pos:
+            continue  # swallowed by a standalone section line
+        kind, name = match.group(1), match.group(2)
+        start, end = match.start(), match.end()
+
+        if kind:
+            bounds = _standalone(source, start, end)
+            if bounds:
+                start, end = bounds
+
+        if start > pos:
+            stack[-1][1].append((TEXT, source[pos:start]))
+        pos = end
+
+        if kind in ("#", "^"):
+            children = []
+            stack[-1][1].append((SECTION, name, kind == "^", children))
+            stack.append((name, children))
+        elif kind == "/":
+            if stack[-1][0] != name:
+                raise TemplateError(f"Unexpected closing tag {{{{/{name}}}}}")
+            stack.pop()
+        else:
+            stack[-1][1].append((VAR, name, match.group(0)))
+
+    if len(stack) > 1:
+        raise TemplateError(f"Unclosed section {{{{#{stack[-1][0]}}}}}")
+    if pos < len(source):
+        root.append((TEXT, source[pos:]))
+    return root
+
+
+def _format(value):
+    if hasattr(value, "to_markdown"):
+        return value.to_markdown()
+    return str(value)
+
+
+def _lookup(scopes, name):
+    for scope in reversed(scopes):
+        if isinstance(scope, dict) and name in scope:
+            return scope[name]
+    return None
+
+
+def _render(segments, scopes, out):
+    for segment in segments:
+        kind = segment[0]
+        if kind == TEXT:
+            out.append(segment[1])
+        elif kind == VAR:
+            value = _lookup(scopes, segment[1])
+            out.append(segment[2] if value is None else _format(value))
+        else:
+            _, name, inverted, children = segment
+            value = _lookup(scopes, name)
+            if inverted:
+                if not value:
+                    _render(children, scopes, out)
+            elif isinstance(value, (list, tuple)):
+                for item in value:
+                    _render(children, scopes + [item], out)
+            elif value:
+                _render(children, scopes + [value], out)
+
+
+class CompiledTemplate:
+    def __init__(self, source, known=None):
+        self.source = source
+        self.segments = parse(source)
+        self.placeholders = self._top_level_names(self.segments)
+        self.unknown = sorted(self.placeholders - set(known)) if known is not None else []
+
+    @staticmethod
+    def _top_level_names(segments):
+        return {segment[1] for segment in segments if segment[0] in (VAR, SECTION)}
+
+    def render(self, values):
+        out = []
+        _render(self.segments, [values], out)
+        return "".join(out)
+
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def compile_template(source, known=None):
+    return CompiledTemplate(source, known)
+
+
+def load_template(path, known=None):
+    """
+    Compile a template file, reusing the compiled copy until the file's mtime
+    or size changes. Placeholders not in `known` are reported once per compile.
+    """
+    stat = os.stat(path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached and cached[0] == stamp:
+            return cached[1]
+
+    with open(path, "r", encoding="utf-8") as f:
+        template = CompiledTemplate(f.read(), known)
+    if template.unknown:
+        print(f"⚠️  {os.path.basename(path)}: placeholders not in md_var_map: {', '.join(template.unknown)}")
+
+    with _cache_lock:
+        _cache[path] = (stamp, template)
+    return template
@@ -1,17 +1,205 @@
 # utils/throttle.py
 
+"""
+Process-wide token-bucket rate limiters, one per API.
+
+    sheets = get_limiter("sheets")
+    values = sheets.call(worksheet.batch_get, ranges)
+
+Calls spend tokens from a shared bucket (so bursts go through while there is
+quota left) and quota errors (429 / rateLimitExceeded) are retried with
+jittered exponential backoff, honouring Retry-After when the server sends one.
+"""
+
+import os
+import sys
 import time
+import random
+import threading
 from functools import wraps
 
-def rate_limited(delay=0.5):
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from config.throttle_config import (
+    THROTTLE_SHEETS_RATE, THROTTLE_SHEETS_BURST,
+    THROTTLE_DRIVE_RATE, THROTTLE_DRIVE_BURST,
+    THROTTLE_JOPLIN_RATE, THROTTLE_JOPLIN_BURST,
+)
+
+# name → (requests per second, burst size)
+DEFAULT_LIMITS = {
+    "sheets": (THROTTLE_SHEETS_RATE, THROTTLE_SHEETS_BURST),
+    "drive": (THROTTLE_DRIVE_RATE, THROTTLE_DRIVE_BURST),
+    "joplin": (THROTTLE_JOPLIN_RATE, THROTTLE_JOPLIN_BURST),
+}
+
+QUOTA_STATUS_CODES = {429}
+QUOTA_REASONS = ("rateLimitExceeded", "userRateLimitExceeded", "RESOURCE_EXHAUSTED", "Quota exceeded")
+
+
+def quota_error_info(exc):
+    """
+    Return (is_quota_error, retry_after_seconds) for an exception raised by
+    gspread, googleapiclient or requests. retry_after is None if not given.
+    """
+    response = getattr(exc, "response", None)   # gspread APIError, requests HTTPError
+    if response is None:
+        response = getattr(exc, "resp", None)   # googleapiclient HttpError
+
+    status = getattr(response, "status_code", None) or getattr(response, "status", None)
+    try:
+        status = int(status) if status is not None else None
+    except (TypeError, ValueError):
+        status = None
+
+    headers = getattr(response, "headers", None)
+    if headers is None and isinstance(response, dict):
+        headers = response
+    retry_after = None
+    if headers:
+        raw = headers.get("Retry-After") or headers.get("retry-after")
+        try:
+            retry_after = float(raw) if raw is not None else None
+        except (TypeError, ValueError):
+            retry_after = None
+
+    text = str(exc)
+    is_quota = status in QUOTA_STATUS_CODES or (
+        status in (403, None) and any(reason in text for reason in QUOTA_REASONS)
+    )
+    return is_quota, retry_after
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket with adaptive backoff.
+
+    After a quota error the effective rate is halved and every caller waits out
+    the backoff; each success then nudges the rate back toward the configured one.
+    """
+
+    def __init__(self, name, rate, burst=1, max_retries=5, base_backoff=1.0, max_backoff=64.0):
+        if rate <= 0 or burst < 1:
+            raise ValueError(f"Limiter '{name}' needs rate > 0 and burst >= 1")
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._current_rate = rate
+        self._last = time.monotonic()
+        self._blocked_until = 0.0
+
+        self.calls = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.quota_errors = 0
+        self.backoff_seconds = 0.0
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self._current_rate)
+        self._last = now
+
+    def acquire(self):
+        """Block until a token is available; returns seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._blocked_until:
+                    delay = self._blocked_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    self.calls += 1
+                    if waited:
+                        self.waits += 1
+                        self.wait_seconds += waited
+                    return waited
+                else:
+                    delay = (1 - self._tokens) / self._current_rate
+            time.sleep(delay)
+            waited += delay
+
+    def _on_success(self):
+        with self._lock:
+            if self._current_rate < self.rate:
+                self._current_rate = min(self.rate, self._current_rate * 1.1)
+
+    def _on_quota_error(self, attempt, retry_after):
+        delay = retry_after if retry_after is not None else min(self.max_backoff, self.base_backoff * 2 ** attempt)
+        delay += random.uniform(0, delay * 0.25)
+        with self._lock:
+            self.quota_errors += 1
+            self.backoff_seconds += delay
+            self._current_rate = max(self.rate / 16, self._current_rate / 2)
+            self._tokens = 0.0
+            self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+
+    def call(self, func, *args, **kwargs):
+        """Run func under this limiter, retrying quota errors with backoff."""
+        for attempt in range(self.max_retries + 1):
+            self.acquire()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                is_quota, retry_after = quota_error_info(e)
+                if not is_quota or attempt == self.max_retries:
+                    raise
+                self._on_quota_error(attempt, retry_after)
+                continue
+            self._on_success()
+            return result
+
+    def stats(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "waits": self.waits,
+                "wait_seconds": round(self.wait_seconds, 3),
+                "quota_errors": self.quota_errors,
+                "backoff_seconds": round(self.backoff_seconds, 3),
+                "current_rate": round(self._current_rate, 3),
+            }
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(name, rate=None, burst=None):
+    """Return the process-wide limiter for `name`, creating it on first use."""
+    with _limiters_lock:
+        if name not in _limiters:
+            default_rate, default_burst = DEFAULT_LIMITS.get(name, (1.0, 1))
+            _limiters[name] = RateLimiter(name, rate or default_rate, burst or default_burst)
+        return _limiters[name]
+
+
+def limiter_stats():
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.stats() for limiter in limiters}
+
+
+def rate_limited(limiter="sheets"):
     """
-    Decorator to throttle function calls by sleeping for `delay` seconds after each call.
+    Decorator that routes every call through a shared limiter.
+    Accepts a limiter name, a RateLimiter, or (for old callers) a delay in
+    seconds, which becomes a private one-call-per-`delay` bucket.
     """
+    if isinstance(limiter, (int, float)):
+        limiter = RateLimiter(f"delay-{limiter}", 1.0 / limiter if limiter > 0 else 1e9)
+    elif isinstance(limiter, str):
+        limiter = get_limiter(limiter)
+
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            result = func(*args, **kwargs)
-            time.sleep(delay)
-            return result
+            return limiter.call(func, *args, **kwargs)
         return wrapper
     return decorator
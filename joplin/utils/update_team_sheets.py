@@ -5,59 +5,101 @@ import os
 import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
-import requests
 
-from config.joplin_config import JOPLIN_API, JOPLIN_TOKEN, JOPLIN_NOTEBOOK_ID
+from config.joplin_config import JOPLIN_NOTEBOOK_ID
+from joplin.utils.note_index import NoteIndex
+from joplin.utils.joplin_client import get_client
+from joplin.utils.template_engine import TemplateError, compile_template, load_template as load_compiled_template
+from joplin.utils.joplin_local_sync import load_teams, as_md_vars
+from joplin.utils.metrics import add_metrics_args, metrics_from_args, maybe_stage
 
 TEMPLATE_PATH = os.path.join("templates", "team_sheet_template.md")
 
 def load_template():
-    with open(TEMPLATE_PATH, "r", encoding="utf-8") as f:
-        return f.read()
-
-def get_note_id_by_title(title):
-    res = requests.get(f"{JOPLIN_API}/search", params={
-        "query": title,
-        "type": "note",
-        "token": JOPLIN_TOKEN
-    })
-    items = res.json().get("items", [])
-    for item in items:
-        if item["title"].lower() == title.lower():
-            return item["id"]
-    return None
-
-def init_template(team_name):
-    template = load_template().replace("{{team_name}}", team_name)
-    note_id = get_note_id_by_title(team_name)
+    return load_compiled_template(TEMPLATE_PATH)
+
+def get_note_id_by_title(title, index=None):
+    index = index or NoteIndex.load(JOPLIN_NOTEBOOK_ID, get_client())
+    return index.get_id(title, ignore_case=True)
+
+def _outcome(metrics, team_name, outcome):
+    if metrics:
+        metrics.outcome(team_name, outcome)
+
+def init_template(team_name, metrics=None):
+    with maybe_stage(metrics, "render", team_name):
+        template = load_template().render({"team_name": team_name})
+    with maybe_stage(metrics, "lookup", team_name):
+        note_id = get_note_id_by_title(team_name)
     if not note_id:
         print(f"❌ Note not found: {team_name}")
+        _outcome(metrics, team_name, "failed")
         return
 
-    res = requests.get(f"{JOPLIN_API}/notes/{note_id}", params={"token": JOPLIN_TOKEN})
-    body = res.json().get("body", "")
+    client = get_client()
+    with maybe_stage(metrics, "fetch_note", team_name):
+        body = client.get_note(note_id, fields="body").get("body", "")
     if "{{cap_space}}" in body:
         print(f"⚠️  Template already exists in '{team_name}', skipping.")
+        _outcome(metrics, team_name, "unchanged")
         return
 
     updated_body = body.rstrip() + "\n\n" + template
-    put = requests.put(f"{JOPLIN_API}/notes/{note_id}", params={"token": JOPLIN_TOKEN}, json={
-        "body": updated_body
-    })
+    with maybe_stage(metrics, "push", team_name):
+        client.update_note(note_id, body=updated_body)
+    _outcome(metrics, team_name, "synced")
     print(f"✅ Inserted template into {team_name} → joplin://x-callback-url/openNote?id={note_id}")
 
-def fill_template(spreadsheet_path, team_name):
-    print(f"🔧 (stub) Would load spreadsheet: {spreadsheet_path}")
-    print(f"🔧 (stub) Would extract values using cell ranges from YAML and fill placeholders for: {team_name}")
-    # This will be implemented in Step 3
-    # Plan:
-    # - Load cell range mappings from YAML
-    # - Load .xlsx data using openpyxl/pandas
-    # - Replace placeholders in the loaded Markdown template
-    # - Update the Joplin note body
+def fill_template(spreadsheet_path, team_name, metrics=None):
+    if not os.path.exists(spreadsheet_path):
+        print(f"❌ Spreadsheet not found: {spreadsheet_path}")
+        _outcome(metrics, team_name, "failed")
+        return
+
+    # Parsed values come from the workbook cache, so repeat runs skip openpyxl
+    with maybe_stage(metrics, "load"):
+        teams = {title.lower(): extracted for _, title, extracted in load_teams([spreadsheet_path])}
+    extracted = teams.get(team_name.lower())
+    if not extracted:
+        print(f"❌ No worksheet named '{team_name}' in {spreadsheet_path}")
+        _outcome(metrics, team_name, "failed")
+        return
+    values, missing, tpes = extracted
+
+    with maybe_stage(metrics, "lookup", team_name):
+        note_id = get_note_id_by_title(team_name)
+    if not note_id:
+        print(f"❌ Note not found: {team_name}")
+        _outcome(metrics, team_name, "failed")
+        return
+
+    client = get_client()
+    with maybe_stage(metrics, "fetch_note", team_name):
+        body = client.get_note(note_id, fields="body").get("body", "")
+    try:
+        with maybe_stage(metrics, "render", team_name):
+            fields = dict(as_md_vars(values, tpes), team_name=team_name)
+            updated_body = compile_template(body).render(fields)
+    except TemplateError as e:
+        # The note body is hand-edited, so a stray {{/x}} or unbalanced section is possible
+        print(f"❌ Could not fill the template in '{team_name}' (note {note_id}): {e}")
+        _outcome(metrics, team_name, "failed")
+        return
+    if updated_body == body:
+        print(f"⏩ Nothing to fill in {team_name}")
+        _outcome(metrics, team_name, "unchanged")
+        return
+
+    with maybe_stage(metrics, "push", team_name):
+        client.update_note(note_id, body=updated_body)
+    _outcome(metrics, team_name, "synced")
+    print(f"✅ Filled template in {team_name} → joplin://x-callback-url/openNote?id={note_id}")
+    if missing:
+        print(f"⚠️  {team_name}: Missing data for cells {', '.join(missing)}")
 
 def main():
     parser = argparse.ArgumentParser(description="Update Joplin Team Sheets with Markdown templates.")
+    add_metrics_args(parser)
     subparsers = parser.add_subparsers(dest="command", required=True)
 
     init_cmd = subparsers.add_parser("init-template", help="Insert empty template with placeholders")
@@ -69,10 +111,11 @@ def main():
 
     args = parser.parse_args()
 
-    if args.command == "init-template":
-        init_template(args.team)
-    elif args.command == "fill-template":
-        fill_template(args.spreadsheet, args.team)
+    with metrics_from_args(f"update_team_sheets.{args.command}", args) as metrics:
+        if args.command == "init-template":
+            init_template(args.team, metrics)
+        elif args.command == "fill-template":
+            fill_template(args.spreadsheet, args.team, metrics)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,193 @@
+# utils/workbook_cache.py
+
+"""
+On-disk cache of values extracted from local cap workbooks.
+
+One entry per workbook path holds the per-sheet extraction results as a
+zlib-compressed pickle, validated against the file's size, mtime and sha256.
+An unchanged workbook is answered from the entry without opening it; a changed
+one only has the worksheets whose XML part (or the shared string table they
+index into) changed re-read. Entries across workbooks are evicted least
+recently used first once there are more than WORKBOOK_CACHE_MAX_ENTRIES.
+"""
+
+import os
+import sys
+import json
+import time
+import zlib
+import pickle
+import hashlib
+import zipfile
+import posixpath
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from config.local_config import WORKBOOK_CACHE_DIR, WORKBOOK_CACHE_MAX_ENTRIES
+from joplin.utils.workbook_reader import read_workbooks
+
+FORMAT_VERSION = 1
+INDEX_FILE = "index.json"
+
+_NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+_SHARED_STRINGS = "xl/sharedStrings.xml"
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def sheet_fingerprints(path):
+    """
+    Sheet title → CRC of its worksheet XML part, in workbook order, plus the CRC
+    of the shared string table. Only the zip directory and workbook.xml are read.
+    """
+    with zipfile.ZipFile(path) as zf:
+        rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+        targets = {rel.get("Id"): rel.get("Target") for rel in rels.iter(f"{_NS_PKG_REL}Relationship")}
+        workbook = ET.fromstring(zf.read("xl/workbook.xml"))
+        crcs = {info.filename: info.CRC for info in zf.infolist()}
+
+    sheets = {}
+    for sheet in workbook.iter(f"{_NS_MAIN}sheet"):
+        target = targets.get(sheet.get(f"{_NS_REL}id"), "")
+        part = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+        sheets[sheet.get("name")] = crcs.get(part)
+    return sheets, crcs.get(_SHARED_STRINGS)
+
+
+class WorkbookCache:
+    def __init__(self, cache_dir=WORKBOOK_CACHE_DIR, max_entries=WORKBOOK_CACHE_MAX_ENTRIES):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.index_path = os.path.join(cache_dir, INDEX_FILE)
+
+    def _entry_path(self, path):
+        return os.path.join(self.cache_dir, hashlib.sha1(path.encode("utf-8")).hexdigest() + ".bin")
+
+    def _read_entry(self, path, schema):
+        try:
+            with open(self._entry_path(path), "rb") as f:
+                entry = pickle.loads(zlib.decompress(f.read()))
+        except (OSError, zlib.error, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+            return None
+        if entry.get("format") != FORMAT_VERSION or entry.get("path") != path or entry.get("schema") != schema:
+            return None
+        return entry
+
+    def _write_entry(self, entry):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        target = self._entry_path(entry["path"])
+        tmp = target + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(zlib.compress(pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)))
+        os.replace(tmp, target)
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _touch(self, paths):
+        """Bump `paths` to most recently used and evict entries past max_entries."""
+        index = self._load_index()
+        now = time.time()
+        for path in paths:
+            index[path] = now
+        for path in sorted(index, key=index.get)[:max(0, len(index) - self.max_entries)]:
+            index.pop(path)
+            try:
+                os.remove(self._entry_path(path))
+            except OSError:
+                pass
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp, self.index_path)
+
+    def _validate(self, path, schema):
+        """Return (entry, titles to re-extract); titles is empty when the entry is current."""
+        stat = os.stat(path)
+        entry = self._read_entry(path, schema)
+        if entry and (entry["size"], entry["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+            return entry, []
+
+        sha = file_sha256(path)
+        if entry and entry["sha256"] == sha:
+            # Touched or copied without changes; just refresh the stat key
+            entry.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns, dirty=True)
+            return entry, []
+
+        fingerprints, shared_crc = sheet_fingerprints(path)
+        old_sheets = entry["sheets"] if entry and entry["shared_crc"] == shared_crc else {}
+        sheets = {}
+        stale = []
+        for title, crc in fingerprints.items():
+            cached = old_sheets.get(title)
+            if cached and crc is not None and cached[0] == crc:
+                sheets[title] = cached
+            else:
+                sheets[title] = (crc, None)
+                stale.append(title)
+
+        entry = {
+            "format": FORMAT_VERSION, "path": path, "schema": schema,
+            "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha,
+            "shared_crc": shared_crc, "sheets": sheets, "dirty": True,
+        }
+        return entry, stale
+
+    def load(self, paths, cells, extract, schema="", workers=None):
+        """
+        Extraction results for every worksheet of every workbook in `paths`:
+        [(path, title, extract(grid))] in workbook/sheet order. `extract` runs on
+        the CellGrid of each re-read sheet; `schema` identifies the cells and
+        extractor so that changing either invalidates old entries.
+        """
+        paths = [os.path.abspath(path) for path in paths]
+        entries = {}
+        stale = {}
+        for path in paths:
+            entries[path], titles = self._validate(path, schema)
+            if titles:
+                stale[path] = titles
+
+        if stale:
+            for path, title, grid in read_workbooks(list(stale), cells, workers=workers, sheets=stale):
+                crc = entries[path]["sheets"][title][0]
+                entries[path]["sheets"][title] = (crc, extract(grid))
+
+        for path in paths:
+            entry = entries[path]
+            total = len(entry["sheets"])
+            if path in stale:
+                print(f"📦 {os.path.basename(path)}: re-extracted {len(stale[path])}/{total} sheets")
+            else:
+                print(f"📦 {os.path.basename(path)}: {total} sheets from cache")
+            if entry.pop("dirty", False):
+                self._write_entry(entry)
+        self._touch(paths)
+
+        return [(path, title, result) for path in paths
+                for title, (_, result) in entries[path]["sheets"].items()]
+
+    def clear(self):
+        for path in self._load_index():
+            try:
+                os.remove(self._entry_path(path))
+            except OSError:
+                pass
+        try:
+            os.remove(self.index_path)
+        except OSError:
+            pass
@@ -0,0 +1,131 @@
+# utils/workbook_reader.py
+
+"""
+Streaming, column-targeted reader for local cap workbooks.
+
+Workbooks are opened in openpyxl's read_only mode and only the bounding box
+of the cells we actually use is streamed (the CELL_MAP cells plus the TPE
+window); rows past it are never parsed. Worksheets, and several workbooks,
+are spread across a process pool. openpyxl is only imported once a workbook
+is actually opened, so runs served from the workbook cache never load it.
+"""
+
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+A1_RE = re.compile(r"^([A-Z]+)(\d+)$")
+
+Cell = namedtuple("Cell", ["value"])
+_EMPTY = Cell(None)
+
+
+class CellGrid(dict):
+    """ref → value for the cells that were read; grid["Q3"].value like a worksheet."""
+
+    title = None
+
+    def __getitem__(self, ref):
+        return Cell(self.get(ref)) if ref in self else _EMPTY
+
+
+def column_index(letters):
+    """"A" → 1, "Q" → 17, "AA" → 27."""
+    index = 0
+    for letter in letters:
+        index = index * 26 + ord(letter) - ord("A") + 1
+    return index
+
+
+def tpe_cells(start_row=17, end_row=30, columns=("Q", "R")):
+    return {f"{col}{row}" for row in range(start_row, end_row + 1) for col in columns}
+
+
+def bounding_box(cells):
+    coords = []
+    for ref in cells:
+        match = A1_RE.match(ref)
+        if not match:
+            raise ValueError(f"Invalid cell reference: {ref}")
+        coords.append((int(match.group(2)), column_index(match.group(1)), ref))
+    return (
+        min(r for r, _, _ in coords), max(r for r, _, _ in coords),
+        min(c for _, c, _ in coords), max(c for _, c, _ in coords),
+        {(r, c): ref for r, c, ref in coords},
+    )
+
+
+def read_sheet(ws, cells):
+    """Stream just the rows/columns covering `cells` out of a read-only worksheet."""
+    min_row, max_row, min_col, max_col, wanted = bounding_box(cells)
+    grid = CellGrid()
+    rows = ws.iter_rows(min_row=min_row, max_row=max_row, min_col=min_col, max_col=max_col, values_only=True)
+    for r, row in enumerate(rows, start=min_row):
+        for c, value in enumerate(row, start=min_col):
+            ref = wanted.get((r, c))
+            if ref is not None and value is not None:
+                grid[ref] = value
+    return grid
+
+
+def _read_sheets(path, titles, cells):
+    """Worker: open one workbook read-only and extract the given sheets."""
+    import openpyxl
+
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        results = []
+        for title in titles:
+            results.append((path, title, dict(read_sheet(wb[title], cells))))
+        return results
+    finally:
+        wb.close()
+
+
+def sheet_titles(path):
+    import openpyxl
+
+    wb = openpyxl.load_workbook(path, read_only=True)
+    try:
+        return wb.sheetnames
+    finally:
+        wb.close()
+
+
+def read_workbooks(paths, cells, workers=None, sheets=None):
+    """
+    Extract `cells` from every worksheet of every workbook in `paths`.
+    Returns [(path, title, CellGrid)] in workbook/sheet order. `sheets`
+    optionally limits each workbook to the named worksheets, either one
+    collection for all workbooks or a dict of path → names.
+    """
+    workers = workers or min(len(paths), os.cpu_count() or 1)
+    titles_by_path = {path: sheet_titles(path) for path in paths}
+    tasks = []
+    for path in paths:
+        wanted = sheets.get(path, ()) if isinstance(sheets, dict) else sheets
+        titles = [t for t in titles_by_path[path] if wanted is None or t in wanted]
+        # Opening a workbook (styles, shared strings) dominates a targeted read, so
+        # sheets of one workbook are only split up when there are spare workers
+        chunks = max(1, min(workers // len(paths), len(titles)))
+        for i in range(chunks):
+            if titles[i::chunks]:
+                tasks.append((path, titles[i::chunks]))
+
+    if workers == 1 or len(tasks) <= 1:
+        raw = [item for path, titles in tasks for item in _read_sheets(path, titles, cells)]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            futures = [pool.submit(_read_sheets, path, titles, cells) for path, titles in tasks]
+            raw = [item for future in futures for item in future.result()]
+
+    order = {(path, title): n for n, (path, title) in enumerate(
+        (path, title) for path in paths for title in titles_by_path[path]
+    )}
+    results = []
+    for path, title, values in sorted(raw, key=lambda item: order[(item[0], item[1])]):
+        grid = CellGrid(values)
+        grid.title = title
+        results.append((path, title, grid))
+    return results
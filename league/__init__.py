@@ -0,0 +1,2 @@
+# league/__init__.py
+"""League-wide cap data: snapshots and the tools that read them"""
@@ -0,0 +1,170 @@
+# league/absorption.py
+
+"""
+Assign incoming salaries to a team's trade exceptions and cap room.
+
+Each TPE and the team's cap room is a bin that can take incoming salary up to
+its amount + $250,000 (the trade buffer). The
+solver picks which players go into which bin so the salary left over for
+matching is as small as possible:
+
+  - up to EXACT_MAX_PLAYERS incoming players it runs a branch-and-bound over
+    players in decreasing salary order, pruning on the best assignment found
+    so far and skipping bins whose remaining room is identical;
+  - above that, or when the search would take more than NODE_LIMIT nodes, it
+    returns the better of best-fit decreasing and first-fit in input order
+    (`optimal=False`).
+
+Amounts are handled in whole cents, so ties and exact fits are exact.
+"""
+
+import os
+import sys
+from collections import namedtuple
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from league.trade_rules import TRADE_BUFFER
+
+EXACT_MAX_PLAYERS = 16
+NODE_LIMIT = 200_000
+
+Bin = namedtuple("Bin", ["label", "amount"])
+
+# assignment: bin index per incoming salary (None = left for matching)
+Absorption = namedtuple("Absorption", ["assignment", "absorbed", "remaining", "optimal"])
+
+
+def exception_bins(tpes=(), cap_space=0.0):
+    """
+    Bins for a team's TPEs and cap room. `tpes` is a list of amounts or of
+    (label, amount) pairs, e.g. the tpe_player{n}/tpe_amt{n} slots of a team note.
+    """
+    bins = []
+    for n, tpe in enumerate(tpes, start=1):
+        label, amount = tpe if isinstance(tpe, (tuple, list)) else (f"TPE {n}", tpe)
+        if amount and amount > 0:
+            bins.append(Bin(label, float(amount)))
+    if cap_space and cap_space > 0:
+        bins.append(Bin("Cap Space", float(cap_space)))
+    return bins
+
+
+def _cents(value):
+    return int(round(value * 100))
+
+
+def _fit(salaries, capacities, order, best_fit=True):
+    """Best fit (the fitting bin with the least room left) or first fit, visiting salaries in `order`."""
+    room = list(capacities)
+    assignment = [None] * len(salaries)
+    for i in order:
+        fits = [b for b in range(len(room)) if room[b] >= salaries[i]]
+        if fits:
+            b = min(fits, key=lambda b: room[b]) if best_fit else fits[0]
+            room[b] -= salaries[i]
+            assignment[i] = b
+    return assignment
+
+
+def _heuristic(salaries, capacities, order):
+    candidates = [
+        _fit(salaries, capacities, order),
+        _fit(salaries, capacities, range(len(salaries)), best_fit=False),
+    ]
+    return max(candidates, key=lambda a: sum(salaries[i] for i, b in enumerate(a) if b is not None))
+
+
+class _Done(Exception):
+    pass
+
+
+class _Abort(Exception):
+    pass
+
+
+def _branch_and_bound(salaries, capacities, order, start):
+    """Exact search; returns (assignment, completed) starting from a known-good assignment."""
+    n = len(order)
+    sizes = [salaries[i] for i in order]
+    suffix = [0] * (n + 1)
+    for k in range(n - 1, -1, -1):
+        suffix[k] = suffix[k + 1] + sizes[k]
+
+    best_total = sum(salaries[i] for i, b in enumerate(start) if b is not None)
+    best = list(start)
+    room = list(capacities)
+    current = [None] * len(salaries)
+    nodes = 0
+    upper = min(suffix[0], sum(capacities))
+
+    def visit(k, total):
+        nonlocal best_total, best, nodes
+        nodes += 1
+        if nodes > NODE_LIMIT:
+            raise _Abort
+        if total > best_total:
+            best_total, best = total, list(current)
+            if best_total == upper:
+                raise _Done
+        if k == n or total + min(suffix[k], sum(r for r in room if r >= sizes[-1])) <= best_total:
+            return
+
+        size, i = sizes[k], order[k]
+        tried = set()
+        for b in range(len(room)):
+            if room[b] < size or room[b] in tried:
+                continue
+            tried.add(room[b])  # bins with equal room left are interchangeable
+            room[b] -= size
+            current[i] = b
+            visit(k + 1, total + size)
+            current[i] = None
+            room[b] += size
+        visit(k + 1, total)  # leave this salary for matching
+
+    try:
+        visit(0, 0)
+    except _Done:
+        pass
+    except _Abort:
+        return best, False
+    return best, True
+
+
+def absorb(incoming, bins, exact_max=EXACT_MAX_PLAYERS):
+    """
+    Assign `incoming` salaries to `bins` (see exception_bins), maximising the
+    total absorbed. Returns Absorption(assignment, absorbed, remaining, optimal)
+    where `remaining` lists the salaries that still need matching.
+    """
+    salaries = [_cents(s) for s in incoming]
+    capacities = [_cents(b.amount + TRADE_BUFFER) for b in bins]
+    order = sorted(range(len(salaries)), key=lambda i: -salaries[i])
+
+    assignment = _heuristic(salaries, capacities, order)
+    optimal = not capacities or not salaries
+    if not optimal and len(salaries) <= exact_max:
+        assignment, optimal = _branch_and_bound(salaries, capacities, order, assignment)
+
+    absorbed = sum(incoming[i] for i, b in enumerate(assignment) if b is not None)
+    remaining = [incoming[i] for i, b in enumerate(assignment) if b is None]
+    return Absorption(assignment, absorbed, remaining, optimal)
+
+
+def greedy_absorb(incoming, bins):
+    """
+    The old single-pool greedy rule generalised to several bins: salaries in
+    input order, each into the first bin it fits. Kept for comparison.
+    """
+    room = [b.amount for b in bins]
+    assignment = [None] * len(incoming)
+    for i, salary in enumerate(incoming):
+        for b in range(len(room)):
+            if salary <= room[b] + TRADE_BUFFER:
+                room[b] -= salary
+                assignment[i] = b
+                break
+    absorbed = sum(incoming[i] for i, b in enumerate(assignment) if b is not None)
+    remaining = [incoming[i] for i, b in enumerate(assignment) if b is None]
+    return Absorption(assignment, absorbed, remaining, False)
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# league/cap_engine.py
+
+"""
+Compute each team's cap summary from its payroll rows.
+
+The engine keeps every team's current-season contracts and a running salary
+total, so changing, adding or moving one contract only adjusts that team's
+total and drops its cached summary; nothing else in the league is touched.
+Figures come from config/cap_thresholds.yaml for the season being computed.
+
+Exception rules are the usual simplification:
+  - Cap Room Exception: team is under the cap
+  - Full (non-taxpayer) MLE and BAE: over the cap, under the 1st apron; what's
+    left is capped by the room under the 1st apron (hard cap once used)
+  - Taxpayer MLE: between the 1st and 2nd apron, capped by room under the 2nd
+Amounts already spent can be recorded with use_exception(); payroll rows alone
+don't say.
+
+    python -m league.cap_engine [--snapshot latest] [--team "Charlotte Hornets"]
+"""
+
+import os
+import sys
+import argparse
+import threading
+
+import yaml
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from config.league_config import CAP_THRESHOLDS_PATH
+from league.money import parse_money, parse_money_column, format_money
+
+# md_var_map sections the engine replaces; joplin_sync --local-cap stops fetching them
+COMPUTED_SECTIONS = ("cap_variables", "exceptions")
+
+# exception → (md key for Yes/No, md key for the remaining amount)
+EXCEPTION_KEYS = {
+    "room_exception": ("room_exception_yesno", "room_exception_rem"),
+    "bae": ("bae_yesno", "bae_exception_rem"),
+    "taxpayer_mle": ("tp_mle_yesno", "tp_mle_rem"),
+    "full_mle": ("full_mle_yesno", "full_mle_rem"),
+}
+
+
+def load_thresholds(season, path=CAP_THRESHOLDS_PATH):
+    with open(path, "r", encoding="utf-8") as f:
+        seasons = (yaml.safe_load(f) or {}).get("seasons") or {}
+    if season not in seasons:
+        raise KeyError(f"No cap thresholds for season {season!r} in {path}")
+    return seasons[season]
+
+
+def contracts_from_payroll(list_vars, season):
+    """{player: salary} for one payroll_seasons entry, from fetched payroll ranges."""
+    def column(key):
+        return [row[0] if row else "" for row in list_vars.get(key, [])]
+
+    names = column("player_name")
+    salaries, _ = parse_money_column((column(season["salary"]) + [""] * len(names))[:len(names)])
+    contracts = {}
+    for name, salary in zip(names, salaries):
+        name = str(name).strip()
+        if name and salary == salary and salary:
+            contracts[name] = contracts.get(name, 0.0) + float(salary)
+    return contracts
+
+
+class CapEngine:
+    def __init__(self, thresholds):
+        self.thresholds = thresholds
+        self.contracts = {}   # team → {player: salary}
+        self.totals = {}      # team → salary for cap
+        self.used = {}        # team → {exception: amount already used}
+        self._summaries = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_season(cls, season, path=CAP_THRESHOLDS_PATH):
+        return cls(load_thresholds(season, path))
+
+    # ---- Updates ----
+
+    def set_roster(self, team, contracts):
+        with self._lock:
+            self.contracts[team] = dict(contracts)
+            self.totals[team] = sum(self.contracts[team].values())
+            self._summaries.pop(team, None)
+
+    def set_contract(self, team, player, salary):
+        """Add, change or (salary=None) remove one contract."""
+        with self._lock:
+            roster = self.contracts.setdefault(team, {})
+            old = roster.pop(player, 0.0)
+            if salary:
+                roster[player] = salary
+            self.totals[team] = self.totals.get(team, 0.0) - old + (salary or 0.0)
+            self._summaries.pop(team, None)
+
+    def move_contract(self, player, from_team, to_team):
+        salary = self.contracts.get(from_team, {}).get(player)
+        if salary is None:
+            raise KeyError(f"{player} has no contract with {from_team}")
+        self.set_contract(from_team, player, None)
+        self.set_contract(to_team, player, salary)
+
+    def use_exception(self, team, exception, amount):
+        if exception not in EXCEPTION_KEYS:
+            raise KeyError(f"Unknown exception {exception!r}")
+        with self._lock:
+            used = self.used.setdefault(team, {})
+            used[exception] = used.get(exception, 0.0) + amount
+            self._summaries.pop(team, None)
+
+    # ---- Figures ----
+
+    def summary(self, team):
+        """Numeric cap summary for one team, recomputed only after that team changed."""
+        with self._lock:
+            cached = self._summaries.get(team)
+            if cached is None:
+                cached = self._summaries[team] = self._compute(team)
+            return cached
+
+    def _compute(self, team):
+        t = self.thresholds
+        salary = self.totals.get(team, 0.0)
+        used = self.used.get(team, {})
+        amounts = t.get("exceptions", {})
+
+        def remaining(exception, eligible, room=None):
+            if not eligible:
+                return 0.0
+            left = amounts.get(exception, 0.0) - used.get(exception, 0.0)
+            return max(0.0, left if room is None else min(left, room))
+
+        under_cap = salary < t["salary_cap"]
+        under_apron1 = salary < t["first_apron"]
+        under_apron2 = salary < t["second_apron"]
+        return {
+            "salary_for_cap": salary,
+            "cap_space": t["salary_cap"] - salary,
+            "luxury_tax_space": t["luxury_tax"] - salary,
+            "apron1_space": t["first_apron"] - salary,
+            "apron2_space": t["second_apron"] - salary,
+            "exceptions": {
+                "room_exception": remaining("room_exception", under_cap),
+                "full_mle": remaining("full_mle", not under_cap and under_apron1, t["first_apron"] - salary),
+                "bae": remaining("bae", not under_cap and under_apron1, t["first_apron"] - salary),
+                "taxpayer_mle": remaining("taxpayer_mle", not under_apron1 and under_apron2,
+                                          t["second_apron"] - salary),
+            },
+        }
+
+    def md_vars(self, team):
+        """The summary as display strings keyed like md_var_map (and the *_yesno template keys)."""
+        summary = self.summary(team)
+        values = {key: format_money(value) for key, value in summary.items() if key != "exceptions"}
+        for exception, (yesno_key, rem_key) in EXCEPTION_KEYS.items():
+            amount = summary["exceptions"][exception]
+            values[yesno_key] = "Yes" if amount > 0 else "No"
+            values[rem_key] = format_money(amount)
+        return values
+
+    def teams(self):
+        return sorted(self.contracts)
+
+
+def engine_from_snapshot(store, season, snapshot_id=None, thresholds_path=CAP_THRESHOLDS_PATH):
+    """Engine loaded with every team's contracts from a league snapshot."""
+    engine = CapEngine.for_season(season, thresholds_path)
+    for team in store.teams(snapshot_id):
+        engine.set_roster(team, {player: salary for player, salary, _ in store.roster(team, season, snapshot_id)})
+    return engine
+
+
+def main():
+    from league.snapshot import SnapshotStore
+    from league.trade_search import current_season
+
+    parser = argparse.ArgumentParser(description="Compute cap summaries from a snapshot's payroll rows.")
+    parser.add_argument("--snapshot", default="latest", help="Snapshot id to read payroll from")
+    parser.add_argument("--season", default=None, help="Payroll season label (default: first in md_var_map)")
+    parser.add_argument("--team", action="append", help="Only show these teams")
+    parser.add_argument("--set", nargs=3, action="append", default=[], metavar=("TEAM", "PLAYER", "SALARY"),
+                        help="What-if: set one contract (SALARY 0 removes it) before computing")
+    args = parser.parse_args()
+
+    season = args.season or current_season()
+    engine = engine_from_snapshot(SnapshotStore(), season, args.snapshot)
+    for team, player, salary in args.set:
+        engine.set_contract(team, player, parse_money(salary) or None)
+
+    print(f"{'Team':<28}{'Salary':>16}{'Cap Space':>16}{'1st Apron':>16}{'2nd Apron':>16}  Exceptions")
+    for team in args.team or engine.teams():
+        values = engine.md_vars(team)
+        available = [name for name, (yesno, rem) in EXCEPTION_KEYS.items() if values[yesno] == "Yes"]
+        print(f"{team:<28}{values['salary_for_cap']:>16}{values['cap_space']:>16}"
+              f"{values['apron1_space']:>16}{values['apron2_space']:>16}  {', '.join(available) or '–'}")
+
+
+if __name__ == "__main__":
+    main()
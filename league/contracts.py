@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# league/contracts.py
+
+"""
+League-wide contract projection.
+
+Every contract is one row across a set of NumPy arrays (team, first-year
+salary, first season, years, raise, option/guarantee status), so projecting
+cap hits for every player and team over any range of seasons is a single
+broadcast:
+
+    salary in contract year k = base × (1 + raise × k)
+
+which is how raises work in the CBA (a percentage of the first-year salary,
+not compounded). Statuses are the ones in the payroll table legend; a status
+applies from `status_from` (contract year) onwards, e.g. an option in the
+final year.
+
+Contracts come from a league snapshot (inferred from its payroll seasons) or
+from a CSV file:
+
+    python -m league.contracts                        # league totals, 5 seasons
+    python -m league.contracts --team "Charlotte Hornets" --markdown
+    python -m league.contracts --csv contracts.csv --exclude-options
+"""
+
+import os
+import re
+import sys
+import csv
+import argparse
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from league.money import parse_money, format_money
+
+NO_CONTRACT, GUARANTEED, TEAM_OPTION, PLAYER_OPTION, NON_GUARANTEED, AP_HOLD = -1, 0, 1, 2, 3, 4
+
+# Legend of the payroll table: 🔴 = AP Hold, 🔵 = Team Option, ⚪ = Non-Guaranteed, 🟢 = Player Option
+STATUS_LABELS = {
+    NO_CONTRACT: "",
+    GUARANTEED: "",
+    TEAM_OPTION: "🔵",
+    PLAYER_OPTION: "🟢",
+    NON_GUARANTEED: "⚪",
+    AP_HOLD: "🔴",
+}
+OPTION_STATUSES = (TEAM_OPTION, PLAYER_OPTION, NON_GUARANTEED)
+
+_STATUS_PATTERNS = [
+    (AP_HOLD, re.compile(r"🔴|\bhold\b|\bAP\b", re.IGNORECASE)),
+    (TEAM_OPTION, re.compile(r"🔵|team\s*option|\bTO\b", re.IGNORECASE)),
+    (PLAYER_OPTION, re.compile(r"🟢|player\s*option|\bPO\b", re.IGNORECASE)),
+    (NON_GUARANTEED, re.compile(r"⚪|non[-\s]*guaranteed|\bNG\b", re.IGNORECASE)),
+]
+
+
+def parse_status(text):
+    for code, pattern in _STATUS_PATTERNS:
+        if text and pattern.search(str(text)):
+            return code
+    return GUARANTEED
+
+
+def parse_raise(text):
+    """Annual raise in percent → fraction: "5", "5%" and 5 → 0.05; "0.5" → 0.005."""
+    text = str(text or "").strip().rstrip("%").strip()
+    return float(text) / 100 if text else 0.0
+
+
+def season_year(label):
+    """"2025–26" → 2025."""
+    return int(str(label)[:4])
+
+
+def season_label(year):
+    return f"{year}–{(year + 1) % 100:02d}"
+
+
+Projection = namedtuple("Projection", ["contracts", "years", "cap_hits", "statuses", "team_totals"])
+
+
+class Contracts:
+    def __init__(self, teams, players, base, start, years, raises, status=None, status_from=None):
+        n = len(players)
+        self.team_names = sorted(set(teams))
+        lookup = {team: i for i, team in enumerate(self.team_names)}
+        self.team = np.array([lookup[team] for team in teams], dtype=np.int32)
+        self.players = list(players)
+        self.base = np.asarray(base, dtype=float)
+        self.start = np.asarray(start, dtype=np.int32)
+        self.years = np.asarray(years, dtype=np.int32)
+        self.raises = np.asarray(raises, dtype=float)
+        self.status = np.asarray(status if status is not None else np.zeros(n), dtype=np.int8)
+        self.status_from = np.asarray(status_from if status_from is not None else np.zeros(n), dtype=np.int32)
+
+    def __len__(self):
+        return len(self.players)
+
+    def project(self, first_year, seasons=5, exclude=()):
+        """
+        Cap hits for every contract over `seasons` seasons from `first_year`:
+        (n, seasons) cap_hits and statuses, plus (teams, seasons) team_totals.
+        Seasons whose status is in `exclude` (e.g. OPTION_STATUSES) count as 0.
+        """
+        years = np.arange(first_year, first_year + seasons)
+        k = years[None, :] - self.start[:, None]  # contract year per (contract, season)
+        active = (k >= 0) & (k < self.years[:, None])
+        cap_hits = np.where(active, self.base[:, None] * (1 + self.raises[:, None] * k), 0.0)
+        statuses = np.where(
+            active,
+            np.where(k >= self.status_from[:, None], self.status[:, None], GUARANTEED),
+            NO_CONTRACT,
+        ).astype(np.int8)
+        if exclude:
+            cap_hits = np.where(np.isin(statuses, exclude), 0.0, cap_hits)
+
+        team_totals = np.zeros((len(self.team_names), seasons))
+        np.add.at(team_totals, self.team, cap_hits)
+        return Projection(self, years, cap_hits, statuses, team_totals)
+
+    # ---- Sources ----
+
+    @classmethod
+    def from_snapshot(cls, store, snapshot_id=None):
+        """
+        Infer contracts from a snapshot's payroll seasons: first season with a
+        salary, consecutive seasons paid, raise from the first two years and the
+        first season that carries a status. Contracts are assumed to end with
+        the last stored season they're paid in.
+        """
+        paid = {}
+        for team, _, player, season, salary, status in store.payroll_rows(snapshot_id):
+            if salary and salary > 0:
+                paid.setdefault((team, player), []).append((season_year(season), salary, status))
+
+        rows = []
+        for (team, player), seasons in paid.items():
+            seasons.sort()
+            start = seasons[0][0]
+            run = [seasons[0]]
+            for entry in seasons[1:]:
+                if entry[0] != run[-1][0] + 1:
+                    break
+                run.append(entry)
+            base = run[0][1]
+            raise_pct = (run[1][1] - base) / base if len(run) > 1 else 0.0
+            status, status_from = GUARANTEED, 0
+            for k, (_, _, text) in enumerate(run):
+                code = parse_status(text)
+                if code != GUARANTEED:
+                    status, status_from = code, k
+                    break
+            rows.append((team, player, base, start, len(run), raise_pct, status, status_from))
+        return cls(*zip(*rows)) if rows else cls([], [], [], [], [], [])
+
+    @classmethod
+    def from_csv(cls, path):
+        """
+        Columns: team, player, base_salary, start (season label or year), years,
+        raise_pct (annual raise in percent: 5, 5% and 0.5 mean 5%, 5% and 0.5%), status (legend emoji or words), status_from
+        (contract year the status starts; defaults to the final year for options).
+        """
+        rows = []
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            for record in csv.DictReader(f):
+                years = int(record["years"])
+                raise_pct = parse_raise(record.get("raise_pct"))
+                status = parse_status(record.get("status"))
+                default_from = years - 1 if status in (TEAM_OPTION, PLAYER_OPTION) else 0
+                rows.append((
+                    record["team"], record["player"], parse_money(record["base_salary"]),
+                    season_year(record["start"]), years, raise_pct,
+                    status, int(record.get("status_from") or default_from),
+                ))
+        return cls(*zip(*rows)) if rows else cls([], [], [], [], [], [])
+
+
+# ---- Views ----
+
+def totals_frame(projection):
+    """Teams × seasons payroll totals."""
+    return pd.DataFrame(
+        projection.team_totals,
+        index=projection.contracts.team_names,
+        columns=[season_label(year) for year in projection.years],
+    )
+
+
+def team_frame(projection, team):
+    """One team's players × seasons cap hits, biggest current contract first."""
+    contracts = projection.contracts
+    rows = np.nonzero(contracts.team == contracts.team_names.index(team))[0]
+    rows = rows[projection.cap_hits[rows].any(axis=1)]
+    rows = rows[np.argsort(-projection.cap_hits[rows, 0], kind="stable")]
+    return pd.DataFrame(
+        projection.cap_hits[rows],
+        index=[contracts.players[i] for i in rows],
+        columns=[season_label(year) for year in projection.years],
+    ), projection.statuses[rows]
+
+
+def payroll_view(projection, team):
+    """The team's projection as the same PayrollTable the Joplin notes render."""
+    from joplin.utils.payroll_table import build_payroll_table
+
+    frame, statuses = team_frame(projection, team)
+    seasons = [{"label": season_label(year), "salary": f"sal_{year}", "status": f"stat_{year}"}
+               for year in projection.years]
+    list_vars = {"player_name": [[name] for name in frame.index]}
+    for col, season in enumerate(seasons):
+        list_vars[season["salary"]] = [[format_money(v) if v else ""] for v in frame.iloc[:, col]]
+        list_vars[season["status"]] = [[STATUS_LABELS[int(code)]] for code in statuses[:, col]]
+    return build_payroll_table(list_vars, seasons)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Project every contract's cap hit over several seasons.")
+    parser.add_argument("--snapshot", default="latest", help="Snapshot to infer contracts from")
+    parser.add_argument("--csv", help="Read contracts from a CSV file instead of a snapshot")
+    parser.add_argument("--from", dest="first_year", type=int, default=None,
+                        help="First season's start year (default: earliest contract start)")
+    parser.add_argument("--seasons", type=int, default=5, help="Number of seasons to project")
+    parser.add_argument("--team", help="Show one team's payroll view instead of league totals")
+    parser.add_argument("--exclude-options", action="store_true",
+                        help="Leave team/player option and non-guaranteed years out of the totals")
+    parser.add_argument("--markdown", action="store_true", help="Print the team view as a note payroll table")
+    parser.add_argument("--out", help="Write the table to .csv instead of printing")
+    args = parser.parse_args()
+
+    if args.csv:
+        contracts = Contracts.from_csv(args.csv)
+    else:
+        from league.snapshot import SnapshotStore
+        contracts = Contracts.from_snapshot(SnapshotStore(), args.snapshot)
+    if not len(contracts):
+        print("❌ No contracts found")
+        sys.exit(1)
+
+    first_year = args.first_year or int(contracts.start.min())
+    projection = contracts.project(first_year, args.seasons, OPTION_STATUSES if args.exclude_options else ())
+
+    if args.team and args.markdown:
+        print(payroll_view(projection, args.team).to_markdown())
+        return
+    table = team_frame(projection, args.team)[0] if args.team else totals_frame(projection)
+    if args.out:
+        table.to_csv(args.out, float_format="%.0f")
+    else:
+        print(table.to_string(float_format=lambda x: format_money(x) if x else "–"))
+    print(f"📈 {len(contracts):,} contracts, {len(contracts.team_names)} teams, "
+          f"{season_label(first_year)} to {season_label(first_year + args.seasons - 1)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# league/money.py
+
+"""
+Turn the dollar strings we ingest into numbers.
+
+Every salary path (sheets, workbooks, snapshots, trade files and the salary
+prompts) goes through parse_money: plain numeric cells take a float() fast
+path, everything else one precompiled pattern with the result memoized, since
+a league's payroll repeats the same strings over and over. parse_money_column
+does a whole column (list or pandas Series) in one call.
+"""
+
+import math
+import re
+import numbers
+from functools import lru_cache
+
+# Applied after lowercasing and dropping "$", "," and whitespace
+_AMOUNT = re.compile(
+    r"^(-)?(\d+(?:\.\d*)?|\.\d+)"
+    r"(k|thousand|m|mil|mill|million|millions|b|bil|billion)?"
+    r"(?:dollars?|usd)?$"
+)
+_SEPARATORS = re.compile(r"[\s,$]+")
+# List separators: ";" or "," unless it's a thousands separator ("12,345,678")
+_LIST_SEP = re.compile(r";|,(?!\d{3}(?:\D|$))")
+
+_MULTIPLIERS = {
+    None: 1.0, "k": 1e3, "thousand": 1e3,
+    "m": 1e6, "mil": 1e6, "mill": 1e6, "million": 1e6, "millions": 1e6,
+    "b": 1e9, "bil": 1e9, "billion": 1e9,
+}
+
+MEMO_SIZE = 1 << 16
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def _parse_text(text):
+    negative = text.startswith("(") and text.endswith(")")
+    if negative:
+        text = text[1:-1]
+    match = _AMOUNT.match(_SEPARATORS.sub("", text.lower()))
+    if not match:
+        return None
+    amount = float(match.group(2)) * _MULTIPLIERS[match.group(3)]
+    return -amount if negative or match.group(1) else amount
+
+
+def parse_money(value):
+    """
+    "$12,345,678" → 12345678.0, "($1,000)" / "-$1,000" → -1000.0,
+    "240m" / "7.5 mil" / "1.2 million dollars" → millions.
+    Returns None for blanks and anything that isn't a dollar amount.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, numbers.Real):  # int, float and numpy scalars
+        value = float(value)
+        return value if math.isfinite(value) else None
+
+    text = str(value).strip()
+    if not text:
+        return None
+    try:
+        amount = float(text)  # plain numeric cell
+    except ValueError:
+        return _parse_text(text)
+    return amount if math.isfinite(amount) else None
+
+
+def to_amount(value):
+    """parse_money for typed-in values: raises ValueError instead of returning None."""
+    amount = parse_money(value)
+    if amount is None:
+        raise ValueError(f"Unrecognized salary format: {value!r}")
+    return amount
+
+
+def parse_salary_list(text):
+    """"18000000, 2500000" or "$12,345,678; 7.5m" → [floats]; raises ValueError on a bad entry."""
+    return [to_amount(item) for item in _LIST_SEP.split(text or "") if item.strip()]
+
+
+def _is_blank(value):
+    if value is None:
+        return True
+    if isinstance(value, float):
+        return math.isnan(value)
+    return isinstance(value, str) and not value.strip()
+
+
+def parse_money_column(values, strict=False):
+    """
+    A whole column of cells → floats, parsing each distinct string once.
+
+    `values` is a list/array or a pandas Series. Returns (amounts, errors):
+    a float ndarray (a Series with the same index for Series input) with NaN
+    for blank or unreadable cells, and [(position or index label, raw value)]
+    for the non-blank cells that couldn't be read. strict=True raises
+    ValueError on those instead.
+    """
+    import numpy as np  # only column parsing needs it; keeps the interactive scripts quick to start
+
+    labels = values.index if hasattr(values, "to_numpy") else None
+    raw = values.to_numpy() if labels is not None else np.asarray(values)
+
+    errors = []
+    if raw.dtype.kind in "fiu":
+        amounts = raw.astype(float)
+        amounts[~np.isfinite(amounts)] = np.nan
+    else:
+        parsed = {}
+        amounts = np.empty(len(raw))
+        for i, value in enumerate(raw.astype(object)):
+            key = (type(value), value) if not isinstance(value, float) or value == value else None
+            amount = parsed[key] if key in parsed else parsed.setdefault(key, parse_money(value))
+            if amount is None:
+                amounts[i] = np.nan
+                if not _is_blank(value):
+                    errors.append((labels[i] if labels is not None else i, value))
+            else:
+                amounts[i] = amount
+
+    if strict and errors:
+        shown = ", ".join(f"{where}: {value!r}" for where, value in errors[:5])
+        raise ValueError(f"{len(errors)} unreadable salary cell(s): {shown}")
+    if labels is not None:
+        return type(values)(amounts, index=labels, name=getattr(values, "name", None)), errors
+    return amounts, errors
+
+
+def format_money(amount):
+    """12345678.0 → "$12,345,678", -1000 → "-$1,000" (whole dollars, as the cap sheets show them)."""
+    if amount is None:
+        return ""
+    amount = round(amount)
+    sign = "-" if amount < 0 else ""
+    return f"{sign}${abs(amount):,.0f}"
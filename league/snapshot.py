@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+# league/snapshot.py
+
+"""
+Local snapshot store for league-wide cap data.
+
+Each snapshot is one timestamped pull of every team's cap summary values and
+payroll rows into SQLite, so renderers, the trade tools and ad-hoc reports can
+work offline, and two snapshots can be diffed with a single query.
+
+    python -m league.snapshot take sheets            # live Google Sheets
+    python -m league.snapshot take workbook FILE     # local cap workbook
+    python -m league.snapshot list
+    python -m league.snapshot query apron1_space --above 0
+    python -m league.snapshot diff 3 4
+"""
+
+import os
+import sys
+import sqlite3
+import argparse
+import threading
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from config.league_config import SNAPSHOT_DB
+from league.money import parse_money, parse_money_column
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id        INTEGER PRIMARY KEY AUTOINCREMENT,
+    taken_at  TEXT NOT NULL,
+    source    TEXT NOT NULL,
+    note      TEXT
+);
+CREATE TABLE IF NOT EXISTS team_values (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots(id) ON DELETE CASCADE,
+    team        TEXT NOT NULL,
+    key         TEXT NOT NULL,
+    text        TEXT,
+    amount      REAL,
+    PRIMARY KEY (snapshot_id, team, key)
+);
+CREATE TABLE IF NOT EXISTS payroll (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots(id) ON DELETE CASCADE,
+    team        TEXT NOT NULL,
+    slot        INTEGER NOT NULL,
+    player      TEXT NOT NULL,
+    season      TEXT NOT NULL,
+    salary_text TEXT,
+    salary      REAL,
+    status      TEXT,
+    PRIMARY KEY (snapshot_id, team, slot, season)
+);
+CREATE INDEX IF NOT EXISTS team_values_by_key ON team_values (snapshot_id, key, amount);
+CREATE INDEX IF NOT EXISTS payroll_by_season ON payroll (snapshot_id, season, team);
+"""
+
+class SnapshotStore:
+    def __init__(self, path=SNAPSHOT_DB):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        if path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        self.conn.close()
+
+    def _fetchall(self, sql, params=()):
+        # One connection shared across pipeline threads, so reads take the lock too
+        with self._lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    # ---- Writing ----
+
+    def create_snapshot(self, source, note=None):
+        taken_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        with self._lock, self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO snapshots (taken_at, source, note) VALUES (?, ?, ?)", (taken_at, source, note)
+            )
+            return cur.lastrowid
+
+    def add_team(self, snapshot_id, team, flat_vars, list_vars=None, seasons=()):
+        """
+        Store one team in the shape joplin_sync fetches it: flat_vars is
+        key → display string, list_vars is key → rows from the payroll ranges.
+        """
+        list_vars = list_vars or {}
+        value_rows = [
+            (snapshot_id, team, key, "" if text is None else str(text), parse_money(text))
+            for key, text in flat_vars.items()
+        ]
+
+        def column(key):
+            return [row[0] if row else "" for row in list_vars.get(key, [])]
+
+        names = column("player_name")
+        payroll_rows = []
+        for season in seasons:
+            salaries = (column(season["salary"]) + [""] * len(names))[:len(names)]
+            statuses = (column(season["status"]) + [""] * len(names))[:len(names)]
+            amounts, _ = parse_money_column(salaries)
+            for slot, name in enumerate(names, start=1):
+                if not str(name).strip():
+                    continue
+                amount = amounts[slot - 1]
+                payroll_rows.append((
+                    snapshot_id, team, slot, name, season["label"], salaries[slot - 1],
+                    None if amount != amount else float(amount), statuses[slot - 1],
+                ))
+
+        with self._lock, self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO team_values VALUES (?, ?, ?, ?, ?)", value_rows)
+            self.conn.executemany("INSERT OR REPLACE INTO payroll VALUES (?, ?, ?, ?, ?, ?, ?, ?)", payroll_rows)
+
+    # ---- Reading ----
+
+    def list_snapshots(self):
+        return self._fetchall(
+            "SELECT s.id, s.taken_at, s.source, s.note, COUNT(DISTINCT v.team) "
+            "FROM snapshots s LEFT JOIN team_values v ON v.snapshot_id = s.id "
+            "GROUP BY s.id ORDER BY s.id"
+        )
+
+    def latest_id(self):
+        row = self._fetchall("SELECT MAX(id) FROM snapshots")[0]
+        if row[0] is None:
+            raise LookupError(f"No snapshots in {self.path}; run `python -m league.snapshot take` first")
+        return row[0]
+
+    def resolve(self, snapshot_id=None):
+        return self.latest_id() if snapshot_id in (None, "latest") else int(snapshot_id)
+
+    def teams(self, snapshot_id=None):
+        snapshot_id = self.resolve(snapshot_id)
+        return [row[0] for row in self._fetchall(
+            "SELECT DISTINCT team FROM team_values WHERE snapshot_id = ? ORDER BY team", (snapshot_id,)
+        )]
+
+    def team_values(self, team, snapshot_id=None, seasons=()):
+        """Rebuild (flat_vars, list_vars) for a renderer, same shape as a live fetch."""
+        snapshot_id = self.resolve(snapshot_id)
+        flat_vars = dict(self._fetchall(
+            "SELECT key, text FROM team_values WHERE snapshot_id = ? AND team = ?", (snapshot_id, team)
+        ))
+
+        rows = self._fetchall(
+            "SELECT slot, player, season, salary_text, status FROM payroll "
+            "WHERE snapshot_id = ? AND team = ? ORDER BY slot", (snapshot_id, team)
+        )
+        slots = max((row[0] for row in rows), default=0)
+        list_vars = {"player_name": [[""] for _ in range(slots)]}
+        by_label = {season["label"]: season for season in seasons}
+        for season in seasons:
+            list_vars[season["salary"]] = [[""] for _ in range(slots)]
+            list_vars[season["status"]] = [[""] for _ in range(slots)]
+        for slot, player, label, salary_text, status in rows:
+            list_vars["player_name"][slot - 1] = [player]
+            season = by_label.get(label)
+            if season:
+                list_vars[season["salary"]][slot - 1] = [salary_text]
+                list_vars[season["status"]][slot - 1] = [status]
+        return flat_vars, list_vars
+
+    def roster(self, team, season, snapshot_id=None):
+        """[(player, salary, status)] for one team and season, biggest contracts first."""
+        snapshot_id = self.resolve(snapshot_id)
+        return self._fetchall(
+            "SELECT player, salary, status FROM payroll "
+            "WHERE snapshot_id = ? AND team = ? AND season = ? AND salary IS NOT NULL "
+            "ORDER BY salary DESC", (snapshot_id, team, season)
+        )
+
+    def payroll_rows(self, snapshot_id=None):
+        """Every payroll row of a snapshot: (team, slot, player, season, salary, status)."""
+        snapshot_id = self.resolve(snapshot_id)
+        return self._fetchall(
+            "SELECT team, slot, player, season, salary, status FROM payroll "
+            "WHERE snapshot_id = ? ORDER BY team, slot, season", (snapshot_id,)
+        )
+
+    def query(self, key, above=None, below=None, snapshot_id=None):
+        """Teams whose numeric `key` is above/below a threshold, e.g. apron1_space > 0."""
+        snapshot_id = self.resolve(snapshot_id)
+        sql = "SELECT team, amount, text FROM team_values WHERE snapshot_id = ? AND key = ? AND amount IS NOT NULL"
+        params = [snapshot_id, key]
+        if above is not None:
+            sql += " AND amount > ?"
+            params.append(above)
+        if below is not None:
+            sql += " AND amount < ?"
+            params.append(below)
+        return self._fetchall(sql + " ORDER BY amount DESC", params)
+
+    def diff(self, old_id, new_id):
+        """Rows that differ between two snapshots: (table, team, what, old, new)."""
+        params = {"old": old_id, "new": new_id}
+        # Two LEFT JOINs instead of FULL OUTER JOIN, which older SQLite builds lack
+        values = self._fetchall(
+            """
+            SELECT 'value', a.team, a.key, b.text, a.text
+            FROM team_values a LEFT JOIN team_values b
+              ON b.snapshot_id = :old AND b.team = a.team AND b.key = a.key
+            WHERE a.snapshot_id = :new AND b.text IS NOT a.text
+            UNION ALL
+            SELECT 'value', b.team, b.key, b.text, NULL
+            FROM team_values b LEFT JOIN team_values a
+              ON a.snapshot_id = :new AND a.team = b.team AND a.key = b.key
+            WHERE b.snapshot_id = :old AND a.key IS NULL
+            """, params,
+        )
+        payroll = self._fetchall(
+            """
+            SELECT 'payroll', a.team, a.player || ' ' || a.season,
+                   b.salary_text || ' ' || COALESCE(b.status, ''), a.salary_text || ' ' || COALESCE(a.status, '')
+            FROM payroll a LEFT JOIN payroll b
+              ON b.snapshot_id = :old AND b.team = a.team AND b.player = a.player AND b.season = a.season
+            WHERE a.snapshot_id = :new AND (b.salary_text IS NOT a.salary_text OR b.status IS NOT a.status)
+            UNION ALL
+            SELECT 'payroll', b.team, b.player || ' ' || b.season,
+                   b.salary_text || ' ' || COALESCE(b.status, ''), NULL
+            FROM payroll b LEFT JOIN payroll a
+              ON a.snapshot_id = :new AND a.team = b.team AND a.player = b.player AND a.season = b.season
+            WHERE b.snapshot_id = :old AND a.player IS NULL
+            """, params,
+        )
+        return sorted(values + payroll, key=lambda row: (row[1], row[0], row[2]))
+
+
+# ---- Snapshot sources ----
+
+def take_sheets_snapshot(store, workers=4, note=None, teams=None):
+    """Pull every team in teamsheets.yaml (or just `teams`) from Google Sheets into a new snapshot."""
+    from joplin import joplin_sync
+    from joplin.utils.google_auth import get_sheets_client
+    from joplin.utils.pipeline import Stage, run_pipeline
+    from joplin.utils.throttle import get_limiter
+
+    gc = get_sheets_client()
+    sheets = get_limiter("sheets")
+    seasons = joplin_sync.load_md_var_map().get("payroll_seasons", [])
+    snapshot_id = store.create_snapshot("sheets", note)
+
+    def fetch(team, url):
+        spreadsheet = sheets.call(gc.open_by_key, joplin_sync.sheet_id_from_url(url))
+        return joplin_sync.fetch_sheet_values(sheets.call(spreadsheet.worksheet, "Roster"))
+
+    def save(team, values):
+        store.add_team(snapshot_id, team, *values, seasons=seasons)
+        print(f"📸 {team}")
+
+    team_sheets = joplin_sync.load_team_sheets()
+    if teams is not None:
+        team_sheets = {team: url for team, url in team_sheets.items() if team in teams}
+
+    run_pipeline(
+        team_sheets.items(),
+        [Stage("fetch", fetch, workers), Stage("save", save, 1)],
+        on_error=lambda team, stage, e: print(f"❌ {team} ({stage}): {e}"),
+    )
+    return snapshot_id
+
+
+def take_workbook_snapshot(store, workbook_path, note=None):
+    """Snapshot every worksheet of a local cap workbook (summary cells + TPEs)."""
+    from joplin.utils.joplin_local_sync import load_teams, as_md_vars
+
+    snapshot_id = store.create_snapshot("workbook", note or os.path.basename(workbook_path))
+    for _, team, (values, _, tpes) in load_teams([workbook_path]):
+        store.add_team(snapshot_id, team, as_md_vars(values, tpes))
+        print(f"📸 {team}")
+    return snapshot_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Take, inspect and diff league snapshots.")
+    parser.add_argument("--db", default=SNAPSHOT_DB, help="Snapshot database path")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    take = sub.add_parser("take", help="Take a new snapshot")
+    take.add_argument("source", choices=["sheets", "workbook"])
+    take.add_argument("workbook", nargs="?", help="Workbook path (workbook source only)")
+    take.add_argument("--workers", type=int, default=4, help="Concurrent sheet fetches")
+    take.add_argument("--note", help="Free-text note stored with the snapshot")
+
+    sub.add_parser("list", help="List snapshots")
+
+    query = sub.add_parser("query", help="Teams whose value for KEY is above/below a threshold")
+    query.add_argument("key", help="md_var_map key, e.g. apron1_space")
+    query.add_argument("--above", type=float)
+    query.add_argument("--below", type=float)
+    query.add_argument("--snapshot", default="latest")
+
+    diff = sub.add_parser("diff", help="Show what changed between two snapshots")
+    diff.add_argument("old", type=int)
+    diff.add_argument("new", type=int)
+
+    args = parser.parse_args()
+    store = SnapshotStore(args.db)
+
+    if args.command == "take":
+        if args.source == "workbook":
+            if not args.workbook:
+                parser.error("take workbook needs a workbook path")
+            snapshot_id = take_workbook_snapshot(store, args.workbook, args.note)
+        else:
+            snapshot_id = take_sheets_snapshot(store, args.workers, args.note)
+        print(f"✅ Snapshot {snapshot_id} saved to {store.path}")
+
+    elif args.command == "list":
+        for snapshot_id, taken_at, source, note, teams in store.list_snapshots():
+            print(f"{snapshot_id:>4}  {taken_at}  {source:<8} {teams:>3} teams  {note or ''}")
+
+    elif args.command == "query":
+        for team, amount, text in store.query(args.key, args.above, args.below, args.snapshot):
+            print(f"{team:<28} {text}")
+
+    elif args.command == "diff":
+        for kind, team, what, old, new in store.diff(args.old, args.new):
+            print(f"{team:<28} {what:<32} {old or '–'} → {new or '–'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# league/trade_eval.py
+
+"""
+Batch trade-legality screening.
+
+Reads a file of proposed two-team trades and evaluates both sides of every
+trade at once: each side's TPE / cap-space pool first absorbs incoming
+salaries (the optimal assignment from league/absorption.py, as in
+scripts/salary_check.py), then whatever is left is checked against the
+three-tier matching limit for that side's outgoing salary. Totals, limits,
+legality and the usual absorption cases (a pool that takes every salary that
+fits it, or where at most two compete for it) are NumPy arrays over all trades;
+only sides where three or more salaries compete for a pool run the exact
+solver, one trade at a time.
+
+    python -m league.trade_eval trades.csv --out results.csv
+
+Trades file (CSV columns or YAML list-of-mappings keys):
+    id, team_a, team_b, a_sends, b_sends, a_tpe, b_tpe
+Salary lists are YAML lists, or strings separated by ";" (dollar strings like
+"$12,345,678" are fine); TPE pools are optional and default to 0.
+"""
+
+import os
+import re
+import sys
+import csv
+import time
+import argparse
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from league.money import parse_money, to_amount
+from league.absorption import absorb as absorb_salaries, exception_bins
+from league.trade_rules import TRADE_BUFFER, matching_limits, formula
+
+Trade = namedtuple("Trade", ["trade_id", "team_a", "team_b", "a_sends", "b_sends", "a_tpe", "b_tpe"])
+
+_LIST_SEP = re.compile(r"[;|\n]")
+
+RESULT_COLUMNS = [
+    "trade_id", "team", "partner", "outgoing", "incoming", "absorbed", "matched",
+    "limit", "tier", "formula", "over", "legal", "trade_legal",
+]
+
+
+def parse_salaries(value):
+    """A YAML list or a ";"-separated string of salaries → list of floats."""
+    if value is None or value == "":
+        return []
+    items = value if isinstance(value, (list, tuple)) else _LIST_SEP.split(str(value))
+    return [to_amount(item) for item in items if not (isinstance(item, str) and not item.strip())]
+
+
+def make_trade(record, default_id):
+    return Trade(
+        trade_id=str(record.get("id") or default_id),
+        team_a=str(record.get("team_a") or "A"),
+        team_b=str(record.get("team_b") or "B"),
+        a_sends=parse_salaries(record.get("a_sends")),
+        b_sends=parse_salaries(record.get("b_sends")),
+        a_tpe=parse_money(record.get("a_tpe")) or 0.0,
+        b_tpe=parse_money(record.get("b_tpe")) or 0.0,
+    )
+
+
+def load_trades(path):
+    """Trades from a .csv or .yaml/.yml file."""
+    if path.endswith((".yaml", ".yml")):
+        import yaml
+        with open(path, "r", encoding="utf-8") as f:
+            records = yaml.safe_load(f) or []
+        if isinstance(records, dict):
+            records = records.get("trades", [])
+    else:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            records = list(csv.DictReader(f))
+    return [make_trade(record, n) for n, record in enumerate(records, start=1)]
+
+
+def salary_matrix(lists):
+    """Ragged salary lists → zero-padded (n, max_len) array."""
+    width = max((len(salaries) for salaries in lists), default=0)
+    matrix = np.zeros((len(lists), max(width, 1)))
+    for row, salaries in enumerate(lists):
+        matrix[row, :len(salaries)] = salaries
+    return matrix
+
+
+def absorb(incoming, pools):
+    """
+    TPE / cap-space absorption, row-wise over an (n, k) salary matrix: the
+    largest total of each row's salaries that fits in its pool plus the
+    $250,000 buffer. Rows where the answer is forced are resolved as arrays:
+    every salary that fits on its own also fits together with the others, or
+    at most two fit on their own (then it's both if they fit together, else
+    the larger). Only the rest go through league.absorption.absorb.
+    Returns the absorbed total per row.
+    """
+    pools = np.asarray(pools, dtype=float)
+    # Whole cents, like league.absorption, so exact fits agree with the solver
+    cents = np.round(incoming * 100)
+    capacity = np.round((pools + TRADE_BUFFER) * 100)
+    fits = (cents > 0) & (cents <= capacity[:, None])
+    fitting = np.where(fits, incoming, 0.0)
+
+    all_fitting_fit = np.where(fits, cents, 0.0).sum(axis=1) <= capacity
+    absorbed = np.where(all_fitting_fit, fitting.sum(axis=1), fitting.max(axis=1))
+    absorbed[pools <= 0] = 0.0
+
+    for row in np.flatnonzero((pools > 0) & ~all_fitting_fit & (fits.sum(axis=1) > 2)):
+        salaries = [s for s in incoming[row] if s > 0]
+        absorbed[row] = absorb_salaries(salaries, exception_bins([pools[row]])).absorbed
+    return absorbed
+
+
+def evaluate_trades(trades):
+    """
+    Both sides of every trade in one vectorized pass. Returns a DataFrame with
+    one row per (trade, team): outgoing/incoming totals, salary absorbed by the
+    team's pool, the matched remainder, limit, formula tier, overage and
+    legality, plus whether the trade is legal for both sides.
+    """
+    n = len(trades)
+    sends = salary_matrix([t.a_sends for t in trades] + [t.b_sends for t in trades])
+    # Row i (side A of trade i) receives side B's salaries and vice versa
+    receives = np.concatenate([sends[n:], sends[:n]])
+    pools = np.array([t.a_tpe for t in trades] + [t.b_tpe for t in trades], dtype=float)
+
+    outgoing = sends.sum(axis=1)
+    incoming = receives.sum(axis=1)
+    absorbed = absorb(receives, pools)
+    matched = incoming - absorbed
+    limits, tiers = matching_limits(outgoing)
+    over = np.maximum(0.0, matched - limits)
+    legal = over <= 0
+    trade_legal = np.tile(legal[:n] & legal[n:], 2)
+
+    order = np.arange(2 * n).reshape(2, n).T.ravel()  # A then B for each trade
+    frame = pd.DataFrame({
+        "trade_id": [t.trade_id for t in trades] * 2,
+        "team": [t.team_a for t in trades] + [t.team_b for t in trades],
+        "partner": [t.team_b for t in trades] + [t.team_a for t in trades],
+        "outgoing": outgoing,
+        "incoming": incoming,
+        "absorbed": absorbed,
+        "matched": matched,
+        "limit": limits,
+        "tier": tiers,
+        "over": over,
+        "legal": legal,
+        "trade_legal": trade_legal,
+    }).iloc[order].reset_index(drop=True)
+    return frame
+
+
+def with_formulas(results):
+    """Add the human-readable limit formula column (kept out of the hot path)."""
+    results = results.copy()
+    results["formula"] = [formula(out, tier) for out, tier in zip(results["outgoing"], results["tier"])]
+    return results[RESULT_COLUMNS]
+
+
+def write_results(results, path=None):
+    if path is None:
+        print(results.to_string(index=False, float_format=lambda x: f"{x:,.2f}"))
+    elif path.endswith(".json"):
+        results.to_json(path, orient="records", indent=2)
+    else:
+        results.to_csv(path, index=False, float_format="%.2f")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Screen a file of proposed trades for salary-matching legality.")
+    parser.add_argument("trades", help="Trades file (.csv or .yaml)")
+    parser.add_argument("--out", help="Write results to .csv or .json instead of printing")
+    parser.add_argument("--illegal-only", action="store_true", help="Only report trades illegal for either side")
+    args = parser.parse_args()
+
+    trades = load_trades(args.trades)
+    start = time.perf_counter()
+    results = evaluate_trades(trades)
+    elapsed = time.perf_counter() - start
+    legal_count = int(results["trade_legal"].sum()) // 2
+
+    if args.illegal_only:
+        results = results[~results["trade_legal"]]
+    write_results(with_formulas(results), args.out)
+
+    print(f"✅ {legal_count}/{len(trades)} trades legal for both sides (evaluated in {elapsed * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
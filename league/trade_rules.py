@@ -0,0 +1,83 @@
+# league/trade_rules.py
+
+"""
+Salary-matching rules for trades (2025–26 CBA figures).
+
+Shared by the interactive scripts/salary_check.py and the batch tools in
+league/, so a new season's numbers only change here. numpy is imported by
+the vectorized helpers only, so the scalar path stays quick to import.
+"""
+
+TRADE_BUFFER = 250_000            # added on top of every matching limit / TPE
+SMALL_TRADE_MAX = 7_501_817.73    # outgoing up to here: 200% + buffer
+MID_TRADE_MAX = 30_007_270.94     # outgoing up to here: outgoing + MID_TRADE_ALLOWANCE
+MID_TRADE_ALLOWANCE = 7_751_817.73
+LARGE_TRADE_RATE = 1.25           # above MID_TRADE_MAX: 125% + buffer
+
+# Formula tiers; TIER_NONE means nothing was sent out, so nothing can be matched
+TIER_NONE, TIER_SMALL, TIER_MID, TIER_LARGE = 0, 1, 2, 3
+
+RULES = {
+    TIER_NONE: "No outgoing salary to match against",
+    TIER_SMALL: f"Can bring back up to 200% more + ${TRADE_BUFFER:,}",
+    TIER_MID: f"Can bring back up to ${MID_TRADE_ALLOWANCE:,.2f} more",
+    TIER_LARGE: f"Can bring back up to {LARGE_TRADE_RATE:.0%} more + ${TRADE_BUFFER:,}",
+}
+
+FORMULAS = {
+    TIER_NONE: "",
+    TIER_SMALL: "({outgoing:,.2f} × 2) + " + f"{TRADE_BUFFER:,}",
+    TIER_MID: "{outgoing:,.2f} + " + f"{MID_TRADE_ALLOWANCE:,.2f}",
+    TIER_LARGE: "({outgoing:,.2f} × " + f"{LARGE_TRADE_RATE}) + {TRADE_BUFFER:,}",
+}
+
+
+def matching_limit(outgoing):
+    """(limit, tier) for one outgoing salary total."""
+    if outgoing <= 0:
+        return 0.0, TIER_NONE
+    if outgoing <= SMALL_TRADE_MAX:
+        return outgoing * 2 + TRADE_BUFFER, TIER_SMALL
+    if outgoing <= MID_TRADE_MAX:
+        return outgoing + MID_TRADE_ALLOWANCE, TIER_MID
+    return outgoing * LARGE_TRADE_RATE + TRADE_BUFFER, TIER_LARGE
+
+
+def matching_limits(outgoing):
+    """Vectorized matching_limit: (limits, tiers) arrays for an array of outgoing totals."""
+    import numpy as np
+
+    outgoing = np.asarray(outgoing, dtype=float)
+    tiers = np.select(
+        [outgoing <= 0, outgoing <= SMALL_TRADE_MAX, outgoing <= MID_TRADE_MAX],
+        [TIER_NONE, TIER_SMALL, TIER_MID],
+        TIER_LARGE,
+    )
+    limits = np.select(
+        [tiers == TIER_SMALL, tiers == TIER_MID, tiers == TIER_LARGE],
+        [outgoing * 2 + TRADE_BUFFER, outgoing + MID_TRADE_ALLOWANCE, outgoing * LARGE_TRADE_RATE + TRADE_BUFFER],
+        0.0,
+    )
+    return limits, tiers
+
+
+def min_outgoing(incoming):
+    """
+    Inverse of matching_limits: the smallest outgoing total whose limit covers
+    `incoming`, vectorized. The limit is continuous and increasing, so a team
+    receiving `incoming` must send out at least this much.
+    """
+    import numpy as np
+
+    incoming = np.asarray(incoming, dtype=float)
+    small_top = SMALL_TRADE_MAX * 2 + TRADE_BUFFER
+    mid_top = MID_TRADE_MAX + MID_TRADE_ALLOWANCE
+    return np.select(
+        [incoming <= small_top, incoming <= mid_top],
+        [(incoming - TRADE_BUFFER) / 2, incoming - MID_TRADE_ALLOWANCE],
+        (incoming - TRADE_BUFFER) / LARGE_TRADE_RATE,
+    )
+
+
+def formula(outgoing, tier):
+    return FORMULAS[tier].format(outgoing=outgoing)
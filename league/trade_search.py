@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# league/trade_search.py
+
+"""
+Search two rosters for salary-legal trade packages.
+
+A package is a non-empty group of players from each side; it is legal when
+each team's incoming salary fits under the matching limit for what it sends
+out (league/trade_rules.py, same rule as salary_check's evaluate_legality).
+TPEs and cap space are not applied here; screen candidates that need them
+with league/trade_eval.py.
+
+Rather than pairing every subset of one roster with every subset of the other:
+  - each roster's subset sums are built meet-in-the-middle (two half-roster
+    tables combined with one outer sum) and sorted;
+  - since the limit is increasing, team B's legal outgoing totals for a team A
+    package worth `a` form one interval [min_outgoing(a), limit(a)], located
+    with a binary search over the sorted sums;
+  - only the few candidates at the end of each interval the objective prefers
+    are scored, so full 15-man rosters stay cheap. Large searches are split
+    across processes.
+
+    python -m league.trade_search "Charlotte Hornets" "Boston Celtics" --objective min_added
+"""
+
+import os
+import sys
+import time
+import argparse
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import yaml
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from config.sheets_config import MD_VAR_MAP_PATH
+from league.trade_rules import matching_limits, min_outgoing
+
+MAX_ROSTER = 24        # players per side; 2^24 subsets is the most we enumerate
+CHUNK_SIZE = 4096      # team A packages scored at a time
+PARALLEL_MIN = 1 << 17  # team A packages before the search is spread over processes
+
+# name → (score to minimise, given team A / team B outgoing totals and player counts;
+#         which end of each legal interval of team B totals holds the best scores)
+OBJECTIVES = {
+    "min_added": (lambda a, b, na, nb: b - a, "low"),     # team A takes back the least salary
+    "max_added": (lambda a, b, na, nb: a - b, "high"),    # team A takes back the most salary
+    "closest": (lambda a, b, na, nb: np.abs(b - a), "near"),  # most even salary swap
+    "fewest_players": (lambda a, b, na, nb: (na + nb) * 1e10 + np.abs(b - a), "near"),
+}
+
+Packages = namedtuple("Packages", ["sums", "masks", "counts"])
+
+
+def _half_subsets(salaries, offset):
+    sums = np.zeros(1)
+    masks = np.zeros(1, dtype=np.int64)
+    counts = np.zeros(1, dtype=np.int16)
+    for i, salary in enumerate(salaries):
+        sums = np.concatenate([sums, sums + salary])
+        masks = np.concatenate([masks, masks | np.int64(1 << (offset + i))])
+        counts = np.concatenate([counts, counts + 1])
+    return sums, masks, counts
+
+
+def enumerate_packages(salaries, max_players=None, include_mask=0):
+    """
+    Every non-empty subset of a roster (bit i = player i), sorted by total
+    salary. Subsets with more than `max_players` or missing any player in
+    `include_mask` are dropped.
+    """
+    if len(salaries) > MAX_ROSTER:
+        raise ValueError(f"{len(salaries)} players is more than {MAX_ROSTER}; narrow it with --exclude")
+    half = len(salaries) // 2
+    low = _half_subsets(salaries[:half], 0)
+    high = _half_subsets(salaries[half:], half)
+    if max_players:
+        low = [column[low[2] <= max_players] for column in low]
+        high = [column[high[2] <= max_players] for column in high]
+
+    sums = (low[0][:, None] + high[0][None, :]).ravel()
+    masks = (low[1][:, None] | high[1][None, :]).ravel()
+    counts = (low[2][:, None] + high[2][None, :]).ravel()
+
+    keep = counts >= 1
+    if max_players:
+        keep &= counts <= max_players
+    if include_mask:
+        keep &= (masks & include_mask) == include_mask
+    order = np.argsort(sums[keep], kind="stable")
+    return Packages(sums[keep][order], masks[keep][order], counts[keep][order])
+
+
+def _size_groups(packages):
+    """Split team B's packages by player count; each group stays sorted by salary."""
+    groups = []
+    for count in np.unique(packages.counts):
+        index = np.nonzero(packages.counts == count)[0]
+        groups.append((packages.sums[index], int(count), index))
+    return groups
+
+
+def search_chunk(a_sums, a_counts, a_index, b_groups, objective, top):
+    """
+    Best `top` legal pairs for a slice of team A packages:
+    (a index, b index, score) arrays plus the number of legal pairs seen.
+    """
+    score_fn, edge = OBJECTIVES[objective]
+    a_limits, _ = matching_limits(a_sums)
+    floors = min_outgoing(a_sums)
+    found = []
+    legal_pairs = 0
+
+    for b_sums, b_count, b_index in b_groups:
+        lo = np.searchsorted(b_sums, floors, side="left")
+        hi = np.searchsorted(b_sums, a_limits, side="right")
+        live = hi > lo
+        if not live.any():
+            continue
+        legal_pairs += int((hi - lo)[live].sum())
+        lo, hi, rows = lo[live], hi[live], np.nonzero(live)[0]
+
+        # Score each row's single best candidate first; only rows whose best
+        # could still make the top `top` get their full window expanded
+        if edge == "low":
+            first = lo
+        elif edge == "high":
+            first = hi - 1
+        else:
+            nearest = np.clip(np.searchsorted(b_sums, a_sums[rows]), lo, hi - 1)
+            below = np.maximum(nearest - 1, lo)
+            closer = np.abs(b_sums[below] - a_sums[rows]) < np.abs(b_sums[nearest] - a_sums[rows])
+            first = np.where(closer, below, nearest)
+        if len(rows) > top:
+            row_best = score_fn(a_sums[rows], b_sums[first], a_counts[rows], b_count)
+            keep = np.argpartition(row_best, top - 1)[:top]
+            lo, hi, rows = lo[keep], hi[keep], rows[keep]
+
+        if edge == "low":
+            start, width = lo, top
+        elif edge == "high":
+            start, width = hi - top, top
+        else:
+            start, width = np.searchsorted(b_sums, a_sums[rows]) - top, 2 * top
+        positions = start[:, None] + np.arange(width)
+        valid = (positions >= lo[:, None]) & (positions < hi[:, None])
+        row_of = np.broadcast_to(rows[:, None], positions.shape)[valid]
+        positions = positions[valid]
+
+        a = a_sums[row_of]
+        b = b_sums[positions]
+        b_limits, _ = matching_limits(b)
+        ok = (b <= a_limits[row_of]) & (a <= b_limits)  # exact check at the interval edges
+        found.append((
+            a_index[row_of[ok]],
+            b_index[positions[ok]],
+            score_fn(a[ok], b[ok], a_counts[row_of[ok]], b_count),
+        ))
+
+    if not found:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64), np.array([]), legal_pairs
+    a_hits, b_hits, scores = (np.concatenate(parts) for parts in zip(*found))
+    best = _top(scores, top)
+    return a_hits[best], b_hits[best], scores[best], legal_pairs
+
+
+def _top(scores, top):
+    if len(scores) > top:
+        best = np.argpartition(scores, top - 1)[:top]
+    else:
+        best = np.arange(len(scores))
+    return best[np.argsort(scores[best], kind="stable")]
+
+
+_worker_args = None
+
+
+def _init_worker(*args):
+    global _worker_args
+    _worker_args = args
+
+
+def _search_range(bounds):
+    a_packages, b_groups, objective, top = _worker_args
+    start, stop = bounds
+    return _search_slices(a_packages, b_groups, objective, top, start, stop)
+
+
+def _search_slices(a_packages, b_groups, objective, top, start, stop):
+    results = []
+    for lo in range(start, stop, CHUNK_SIZE):
+        hi = min(lo + CHUNK_SIZE, stop)
+        index = np.arange(lo, hi)
+        results.append(search_chunk(
+            a_packages.sums[lo:hi], a_packages.counts[lo:hi], index, b_groups, objective, top
+        ))
+    return _merge(results, top)
+
+
+def _merge(results, top):
+    if not results:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64), np.array([]), 0
+    a_hits, b_hits, scores, counts = zip(*results)
+    a_hits, b_hits, scores = np.concatenate(a_hits), np.concatenate(b_hits), np.concatenate(scores)
+    best = _top(scores, top)
+    return a_hits[best], b_hits[best], scores[best], sum(counts)
+
+
+def search(roster_a, roster_b, objective="min_added", top=20, max_players=None,
+           include=(), workers=None):
+    """
+    Rank legal packages between two rosters of (player, salary). Returns
+    (list of result dicts, number of legal packages found).
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective {objective!r}; choose from {', '.join(OBJECTIVES)}")
+    names_a = [player for player, _ in roster_a]
+    names_b = [player for player, _ in roster_b]
+    include_a = sum(1 << i for i, name in enumerate(names_a) if name in include)
+    include_b = sum(1 << i for i, name in enumerate(names_b) if name in include)
+
+    a_packages = enumerate_packages(np.array([s for _, s in roster_a], dtype=float), max_players, include_a)
+    b_packages = enumerate_packages(np.array([s for _, s in roster_b], dtype=float), max_players, include_b)
+    b_groups = _size_groups(b_packages)
+
+    total = len(a_packages.sums)
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and total >= PARALLEL_MIN:
+        step = -(-total // workers)
+        bounds = [(start, min(start + step, total)) for start in range(0, total, step)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(a_packages, b_groups, objective, top)) as pool:
+            a_hits, b_hits, scores, legal_pairs = _merge(list(pool.map(_search_range, bounds)), top)
+    else:
+        a_hits, b_hits, scores, legal_pairs = _search_slices(a_packages, b_groups, objective, top, 0, total)
+
+    results = []
+    for rank, (ai, bi, score) in enumerate(zip(a_hits, b_hits, scores), start=1):
+        a_out, b_out = a_packages.sums[ai], b_packages.sums[bi]
+        (a_limit, b_limit), _ = matching_limits([a_out, b_out])
+        results.append({
+            "rank": rank,
+            "a_sends": [names_a[i] for i in range(len(names_a)) if a_packages.masks[ai] >> i & 1],
+            "b_sends": [names_b[i] for i in range(len(names_b)) if b_packages.masks[bi] >> i & 1],
+            "a_out": a_out,
+            "b_out": b_out,
+            "a_added": b_out - a_out,
+            "a_limit": a_limit,
+            "b_limit": b_limit,
+            "score": score,
+        })
+    return results, legal_pairs
+
+
+# ---- Rosters ----
+
+def current_season(path=MD_VAR_MAP_PATH):
+    with open(path, "r", encoding="utf-8") as f:
+        seasons = (yaml.safe_load(f) or {}).get("payroll_seasons") or []
+    return seasons[0]["label"] if seasons else None
+
+
+def load_rosters(store, teams, season, snapshot_id=None, exclude=()):
+    """{team: [(player, salary)]} from a snapshot, skipping excluded and unpaid players."""
+    rosters = {}
+    for team in teams:
+        rows = store.roster(team, season, snapshot_id)
+        if not rows:
+            raise LookupError(f"No {season} payroll for {team} in snapshot {store.resolve(snapshot_id)}")
+        rosters[team] = [(player, salary) for player, salary, _ in rows
+                         if player not in exclude and salary and salary > 0]
+    return rosters
+
+
+def main():
+    from league.snapshot import SnapshotStore, take_sheets_snapshot
+    from league.trade_eval import write_results
+
+    parser = argparse.ArgumentParser(description="Enumerate and rank salary-legal trade packages between two teams.")
+    parser.add_argument("team_a", help="Team name as in the snapshot (objectives are from this team's side)")
+    parser.add_argument("team_b", help="Trade partner")
+    parser.add_argument("--season", default=None, help="Payroll season label (default: first in md_var_map)")
+    parser.add_argument("--snapshot", default="latest", help="Snapshot id to read rosters from")
+    parser.add_argument("--live", action="store_true", help="Fetch both rosters from Google Sheets instead")
+    parser.add_argument("--objective", choices=sorted(OBJECTIVES), default="min_added")
+    parser.add_argument("--top", type=int, default=20, help="Number of packages to report")
+    parser.add_argument("--max-players", type=int, default=None, help="Most players either side may send")
+    parser.add_argument("--include", nargs="*", default=[], help="Players every package must contain")
+    parser.add_argument("--exclude", nargs="*", default=[], help="Players never to trade")
+    parser.add_argument("--workers", type=int, default=None, help="Processes for large searches (default: all cores)")
+    parser.add_argument("--out", help="Write results to .csv or .json instead of printing")
+    args = parser.parse_args()
+
+    season = args.season or current_season()
+    if args.live:
+        store = SnapshotStore(":memory:")
+        snapshot_id = take_sheets_snapshot(store, note="trade_search", teams=[args.team_a, args.team_b])
+    else:
+        store = SnapshotStore()
+        snapshot_id = args.snapshot
+    rosters = load_rosters(store, [args.team_a, args.team_b], season, snapshot_id, set(args.exclude))
+
+    start = time.perf_counter()
+    results, legal_pairs = search(
+        rosters[args.team_a], rosters[args.team_b], args.objective, args.top,
+        args.max_players, set(args.include), args.workers,
+    )
+    elapsed = time.perf_counter() - start
+
+    table = pd.DataFrame(results, columns=["rank", "a_sends", "b_sends", "a_out", "b_out", "a_added",
+                                           "a_limit", "b_limit", "score"])
+    table["a_sends"] = table["a_sends"].map(", ".join)
+    table["b_sends"] = table["b_sends"].map(", ".join)
+    table = table.rename(columns={"a_sends": f"{args.team_a} sends", "b_sends": f"{args.team_b} sends"})
+    write_results(table, args.out)
+    print(f"🔎 {legal_pairs:,} legal packages; best {len(results)} by {args.objective} ({elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
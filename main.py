@@ -1,8 +1,31 @@
 #!/usr/bin/env python3
 
+"""
+Entry point for every tool in the repo.
+
+    python main.py sync --full                 # a registered command (see --help)
+    python main.py -m scripts.salary_check     # any module, run as __main__
+    python main.py worker start                # keep imports + parsed config resident
+    python main.py imports                     # cold import time per command
+
+Command modules are only imported when a command runs, so starting one tool
+never pays for the others' libraries. With a warm worker up, commands are
+forked from it instead: stdin/stdout/stderr are handed over the worker's unix
+socket, so the command reads and prints on this terminal and its exit code
+comes back here, but imports, md_var_map and the compiled template are
+already loaded. The worker refuses (and this process runs the command
+itself) when code or config changed since it started, or when this shell's
+environment differs for any setting the config read.
+"""
+
 import sys
 import os
+import json
+import time
+import signal
+import socket
 import argparse
+import importlib
 import runpy
 
 # --- Resolve project root and fix sys.path + cwd ---
@@ -10,22 +33,477 @@ PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, PROJECT_ROOT)
 os.chdir(PROJECT_ROOT)  # Force working directory to project root
 
+from config.worker_config import WORKER_SOCKET, WORKER_LOG, WORKER_IDLE_TIMEOUT
+
+# name → (module, help); modules are imported only when their command runs
+COMMANDS = {
+    "sync": ("joplin.joplin_sync", "Sync Google team sheets into Joplin notes"),
+    "local-sync": ("joplin.utils.joplin_local_sync", "Sync local cap workbooks into Joplin team notes"),
+    "team-sheets": ("joplin.utils.update_team_sheets", "Insert or fill the team sheet template in a note"),
+    "team-markdown": ("joplin.utils.team_markdown_builder", "Add the team summary template to every team note"),
+    "teamsheets-yaml": ("joplin.utils.make_teamsheets_yaml", "Write config/teamsheets.yaml from the Drive folder"),
+    "range-plan": ("joplin.utils.range_planner", "Report the Sheets API ranges md_var_map compiles to"),
+    "snapshot": ("league.snapshot", "Take, inspect and diff league snapshots"),
+    "cap": ("league.cap_engine", "Compute cap summaries from a snapshot's payroll rows"),
+    "contracts": ("league.contracts", "Project every contract's cap hit over several seasons"),
+    "trade-eval": ("league.trade_eval", "Screen a file of proposed trades for salary-matching legality"),
+    "trade-search": ("league.trade_search", "Rank salary-legal trade packages between two teams"),
+    "salary-check": ("scripts.salary_check", "Interactive salary-matching check"),
+    "annual-salary": ("scripts.calc_anual_salary", "Split a contract total into a per-year salary"),
+    "jira-project": ("jira.utils.proj_switcher", "Switch the JIRA CLI's active project"),
+}
+
+
 def run_module(module_path):
     try:
-        runpy.run_module(module_path, run_name="__main__")
+        if module_path in sys.modules:
+            # Already imported (preloaded by the worker): run its file afresh as __main__
+            runpy.run_path(sys.modules[module_path].__file__, run_name="__main__")
+        else:
+            runpy.run_module(module_path, run_name="__main__")
     except ModuleNotFoundError as e:
         print(f"❌ Module '{module_path}' not found.\n{e}")
+        return 1
     except Exception as e:
         print(f"❌ Error running module '{module_path}':\n{e}")
+        return 1
+    return 0
+
+
+def run_command(module_path, argv):
+    """Run a module's main() (or the module itself as __main__) with `argv`; returns the exit code."""
+    sys.argv = [module_path] + argv
+    try:
+        module = importlib.import_module(module_path)
+    except ModuleNotFoundError as e:
+        print(f"❌ Module '{module_path}' not found.\n{e}")
+        return 1
+    if not callable(getattr(module, "main", None)):
+        return run_module(module_path)
+    try:
+        module.main()
+    except SystemExit as e:
+        return exit_code(e)
+    return 0
+
+
+def exit_code(e):
+    if e.code is None or isinstance(e.code, int):
+        return e.code or 0
+    print(e.code, file=sys.stderr)
+    return 1
+
+
+# ---- Warm worker: client side ----
+
+def run_in_worker(module_path, argv, as_main=False):
+    """Exit code of the command run by the warm worker, or None to run it here."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(WORKER_SOCKET)
+        socket.send_fds(sock, [b"\0"], [0, 1, 2])
+        request = {"module": module_path, "argv": argv, "as_main": as_main,
+                   "cwd": os.getcwd(), "env": dict(os.environ)}
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+    except OSError:
+        sock.close()
+        return None
+
+    pid = None
+    with sock, sock.makefile("r", encoding="utf-8") as replies:
+        while True:
+            try:
+                line = replies.readline()
+            except KeyboardInterrupt:
+                # Ctrl-C reaches this process only; pass it on to the forked command
+                if pid:
+                    os.kill(pid, signal.SIGINT)
+                continue
+            if not line:
+                print("❌ Warm worker closed the connection before the command finished", file=sys.stderr)
+                return 1
+            reply = json.loads(line)
+            if "pid" in reply:
+                pid = reply["pid"]
+            elif "exit" in reply:
+                return reply["exit"]
+            elif "cold" in reply:
+                print(f"♻️  {reply['cold']}; running without it (python main.py worker restart)", file=sys.stderr)
+                return None
+
+
+def worker_request(command):
+    """One control message (status/stop) to a running worker, or None if none is up."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(WORKER_SOCKET)
+        socket.send_fds(sock, [b"\0"], [])
+        sock.sendall(json.dumps({"control": command}).encode("utf-8") + b"\n")
+        with sock.makefile("r", encoding="utf-8") as replies:
+            return json.loads(replies.readline() or "null")
+    except OSError:
+        return None
+    finally:
+        sock.close()
+
+
+# ---- Warm worker: server side ----
+
+# Libraries the command modules import on first use rather than at import time
+WARM_IMPORTS = (
+    "numpy", "pandas", "openpyxl", "httplib2", "gspread",
+    "googleapiclient.discovery", "google_auth_oauthlib.flow", "google.oauth2.credentials",
+    "google.auth.transport.requests",
+)
+
+
+def warm_up():
+    """Load what every sync run parses first, once, before any command is forked."""
+    from config.sheets_config import MD_TEMPLATE_PATH
+    from joplin.joplin_sync import template_known
+    from joplin.utils.joplin_client import get_client
+    from joplin.utils.template_engine import load_template
+
+    load_template(MD_TEMPLATE_PATH, known=template_known())
+    get_client()  # the pooled session; no connection is opened until a command uses it
+
+
+def preload():
+    """Import every command module and warm_up(); returns the env keys the config read."""
+    read_keys = set()
+    getenv = os.getenv
+
+    def recording_getenv(key, default=None):
+        read_keys.add(key)
+        return getenv(key, default)
+
+    os.getenv = recording_getenv
+    try:
+        for module_path in [module for module, _ in COMMANDS.values()] + list(WARM_IMPORTS):
+            try:
+                importlib.import_module(module_path)
+            except Exception as e:
+                print(f"⚠️  Could not preload {module_path}: {e}")
+        try:
+            warm_up()
+        except Exception as e:
+            print(f"⚠️  Warm-up failed, commands will load on demand: {e}")
+    finally:
+        os.getenv = getenv
+    return read_keys
+
+
+def source_files():
+    """Project files the worker has loaded: imported modules plus config/ and templates/."""
+    files = set()
+    for module in list(sys.modules.values()):
+        path = getattr(module, "__file__", None) or ""
+        if path.startswith(PROJECT_ROOT + os.sep):
+            files.add(path)
+    for directory in ("config", "templates"):
+        for root, _, names in os.walk(os.path.join(PROJECT_ROOT, directory)):
+            files.update(os.path.join(root, name) for name in names if not name.endswith(".pyc"))
+    return sorted(files)
+
+
+def changed_since(files, started):
+    for path in files:
+        try:
+            if os.stat(path).st_mtime > started:
+                return os.path.relpath(path, PROJECT_ROOT)
+        except OSError:
+            return os.path.relpath(path, PROJECT_ROOT)
+    return None
+
+
+def serve():
+    started = time.time()
+    start = time.perf_counter()
+    config_keys = preload()
+    config_env = {key: os.environ.get(key) for key in config_keys}
+    files = source_files()
+    preload_seconds = time.perf_counter() - start
+
+    if os.path.exists(WORKER_SOCKET):
+        os.remove(WORKER_SOCKET)
+    os.makedirs(os.path.dirname(WORKER_SOCKET), exist_ok=True)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o077)  # the socket carries our environment; owner only
+    try:
+        server.bind(WORKER_SOCKET)
+    finally:
+        os.umask(old_umask)
+    server.listen(16)
+    server.settimeout(5)
+    print(f"🔥 Warm worker {os.getpid()} ready on {WORKER_SOCKET} "
+          f"({len(files)} files preloaded in {preload_seconds:.2f}s)", flush=True)
+
+    children = set()
+    served = 0
+    last_active = time.monotonic()
+    try:
+        while True:
+            for pid in list(children):
+                if os.waitpid(pid, os.WNOHANG)[0]:
+                    children.discard(pid)
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                idle = time.monotonic() - last_active
+                if WORKER_IDLE_TIMEOUT and not children and idle > WORKER_IDLE_TIMEOUT:
+                    print(f"💤 Idle for {idle:.0f}s, exiting", flush=True)
+                    return
+                continue
+            last_active = time.monotonic()
+            conn.settimeout(None)
+            try:
+                request, fds = read_request(conn)
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Bad request: {e}", flush=True)
+                conn.close()
+                continue
+
+            if "control" in request:
+                if request["control"] == "stop":
+                    send(conn, {"stopped": os.getpid()})
+                    conn.close()
+                    print("👋 Stopped", flush=True)
+                    return
+                send(conn, {"pid": os.getpid(), "uptime": round(time.time() - started), "served": served,
+                            "running": len(children), "preload_seconds": round(preload_seconds, 3),
+                            "socket": WORKER_SOCKET})
+                conn.close()
+                continue
+
+            changed = changed_since(files, started)
+            env = request.get("env", {})
+            differs = sorted(key for key, value in config_env.items() if env.get(key) != value)
+            if changed or differs:
+                reason = (f"Warm worker is out of date ({changed} changed)" if changed else
+                          f"Warm worker was started with different {', '.join(differs)}")
+                send(conn, {"cold": reason})
+                for fd in fds:
+                    os.close(fd)
+                conn.close()
+                if changed:
+                    print(f"♻️  {changed} changed, exiting", flush=True)
+                    return
+                continue
+
+            pid = os.fork()
+            if pid == 0:
+                server.close()
+                run_forked(conn, fds, request)  # never returns
+            served += 1
+            children.add(pid)
+            for fd in fds:
+                os.close(fd)
+            conn.close()
+    finally:
+        server.close()
+        if os.path.exists(WORKER_SOCKET):
+            os.remove(WORKER_SOCKET)
+
+
+def read_request(conn):
+    if hasattr(socket, "SO_PEERCRED"):
+        import struct
+
+        _, uid, _ = struct.unpack("3i", conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, 12))
+        if uid != os.getuid():
+            raise ValueError(f"connection from uid {uid}")
+    _, fds, _, _ = socket.recv_fds(conn, 1, 3)
+    line = b""
+    while not line.endswith(b"\n"):
+        chunk = conn.recv(1 << 16)
+        if not chunk:
+            break
+        line += chunk
+    return json.loads(line), fds
+
+
+def send(conn, message):
+    conn.sendall(json.dumps(message).encode("utf-8") + b"\n")
+
+
+def run_forked(conn, fds, request):
+    """In the forked child: take over the client's stdio, cwd and env, run the command, report back."""
+    code = 1
+    try:
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        for target, fd in zip((0, 1, 2), fds):
+            os.dup2(fd, target)
+            os.close(fd)
+        sys.stdin = open(0, "r", encoding="utf-8", closefd=False)
+        sys.stdout = open(1, "w", encoding="utf-8", buffering=1, closefd=False)
+        sys.stderr = open(2, "w", encoding="utf-8", buffering=1, closefd=False)
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["env"])
+        send(conn, {"pid": os.getpid()})
+        try:
+            if request.get("as_main"):
+                sys.argv = [request["module"]] + request["argv"]
+                code = run_module(request["module"])
+            else:
+                code = run_command(request["module"], request["argv"])
+        except SystemExit as e:
+            code = exit_code(e)
+        except KeyboardInterrupt:
+            code = 130
+        except BaseException:
+            import traceback
+
+            traceback.print_exc()
+            code = 1
+        sys.stdout.flush()
+        sys.stderr.flush()
+        send(conn, {"exit": code})
+    finally:
+        os._exit(code)
+
+
+def start_worker(foreground=False):
+    status = worker_request("status")
+    if status:
+        print(f"🔥 Warm worker already running (pid {status['pid']})")
+        return 0
+    if foreground:
+        serve()
+        return 0
+
+    os.makedirs(os.path.dirname(WORKER_LOG), exist_ok=True)
+    if os.fork():
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            status = worker_request("status")
+            if status:
+                print(f"🔥 Warm worker {status['pid']} ready on {WORKER_SOCKET} "
+                      f"(preloaded in {status['preload_seconds']:.2f}s; log: {WORKER_LOG})")
+                return 0
+            time.sleep(0.05)
+        print(f"❌ Warm worker did not come up; see {WORKER_LOG}")
+        return 1
+
+    os.setsid()
+    with open(os.devnull, "rb") as devnull, open(WORKER_LOG, "ab") as log:
+        os.dup2(devnull.fileno(), 0)
+        os.dup2(log.fileno(), 1)
+        os.dup2(log.fileno(), 2)
+    try:
+        serve()
+    finally:
+        os._exit(0)
+
+
+def worker_main(argv):
+    parser = argparse.ArgumentParser(prog="main.py worker", description="Manage the warm worker.")
+    parser.add_argument("action", choices=("start", "stop", "status", "restart"))
+    parser.add_argument("--foreground", action="store_true", help="Serve from this terminal instead of detaching")
+    args = parser.parse_args(argv)
+
+    if args.action in ("stop", "restart"):
+        stopped = worker_request("stop")
+        print(f"👋 Stopped warm worker {stopped['stopped']}" if stopped else "⏩ No warm worker running")
+        if args.action == "stop":
+            return 0
+        time.sleep(0.1)
+    if args.action in ("start", "restart"):
+        return start_worker(args.foreground)
+
+    status = worker_request("status")
+    if not status:
+        print(f"⏩ No warm worker running on {WORKER_SOCKET}")
+        return 1
+    print(f"🔥 Warm worker {status['pid']}: up {status['uptime']}s, {status['served']} commands served, "
+          f"{status['running']} running")
+    return 0
+
+
+# ---- Import-time report ----
+
+def import_times(module_path):
+    """(total µs, {top-level package: self µs}) for a cold `import module_path`."""
+    import subprocess
+
+    code = f"import sys; sys.path.insert(0, {PROJECT_ROOT!r}); import {module_path}"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            cwd=PROJECT_ROOT, capture_output=True, text=True)
+    total, packages = 0, {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        packages[name.split(".")[0]] = packages.get(name.split(".")[0], 0) + int(self_us)
+        if name == module_path:
+            total = int(cumulative)
+    if result.returncode:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return total, packages
+
+
+def imports_main(argv):
+    parser = argparse.ArgumentParser(prog="main.py imports",
+                                     description="Report the cold import time of each command (python -X importtime).")
+    parser.add_argument("commands", nargs="*", metavar="COMMAND", help="Commands to measure (default: all)")
+    parser.add_argument("--top", type=int, default=4, help="Heaviest packages to list per command")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.commands if name not in COMMANDS]
+    if unknown:
+        parser.error(f"unknown command(s): {', '.join(unknown)}")
+
+    print("⏱️  Cold import time per command (what a warm worker saves on every run)")
+    for name in args.commands or list(COMMANDS):
+        try:
+            total, packages = import_times(COMMANDS[name][0])
+        except RuntimeError as e:
+            print(f"  {name:<16} ❌ {e}")
+            continue
+        heaviest = sorted(packages.items(), key=lambda item: -item[1])[:args.top]
+        print(f"  {name:<16} {total / 1000:7.1f} ms   "
+              + " · ".join(f"{package} {us / 1000:.0f}" for package, us in heaviest))
+    return 0
+
 
 def main():
-    parser = argparse.ArgumentParser(description="Run project module")
-    parser.add_argument("-m", "--module", help="Module path to run", required=True)
+    parser = argparse.ArgumentParser(
+        description="Run a project command or module.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="commands:\n" + "\n".join(f"  {name:<16} {text}" for name, (_, text) in COMMANDS.items())
+        + "\n  worker           start | stop | status | restart the warm worker"
+        + "\n  imports          cold import time per command",
+    )
+    parser.add_argument("-m", "--module", help="Module path to run")
+    parser.add_argument("--cold", action="store_true", help="Run in this process even if a warm worker is up")
+    parser.add_argument("command", nargs="?", help="Command name (see below)")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="Arguments for the command")
     args, unknown = parser.parse_known_args()
 
+    if args.module:
+        module_path, argv = args.module, ([args.command] if args.command else []) + args.args + unknown
+    elif args.command == "worker":
+        return worker_main(args.args)
+    elif args.command == "imports":
+        return imports_main(args.args)
+    elif args.command in COMMANDS:
+        module_path, argv = COMMANDS[args.command][0], args.args + unknown
+    else:
+        parser.print_help()
+        return 0 if args.command is None else 2
+
+    if not args.cold:
+        code = run_in_worker(module_path, argv, as_main=bool(args.module))
+        if code is not None:
+            return code
+
     # Simulate command-line args for the module being run
-    sys.argv = [args.module] + unknown
-    run_module(args.module)
+    if args.module:
+        sys.argv = [module_path] + argv
+        return run_module(module_path)
+    return run_command(module_path, argv)
+
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
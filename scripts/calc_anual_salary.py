@@ -1,30 +1,14 @@
-import re
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from league.money import to_amount
 
 
 def parse_salary_input(salary_input):
-    # Remove $ sign and commas, make lowercase
-    salary_input = salary_input.lower().replace('$', '').replace(',', '').strip()
-
-    # Match formats like "240m", "240 million", "240mil", etc.
-    million_match = re.match(r'^(\d+(\.\d+)?)(\s*)(m|mil|million)(\s*dollars*)?$', salary_input)
-    if million_match:
-        number = float(million_match.group(1))
-        return number * 1_000_000
-
-    # Match plain number like "240000000"
-    number_match = re.match(r'^\d+(\.\d+)?$', salary_input)
-    if number_match:
-        return float(salary_input)
-
-    # Try to catch phrases like "240 million dollars" with extra spaces
-    words = salary_input.split()
-    if len(words) >= 2 and words[1].startswith("mil"):
-        try:
-            return float(words[0]) * 1_000_000
-        except ValueError:
-            pass
-
-    raise ValueError("Unrecognized salary format.")
+    # "$240,000,000", "240m", "240 million dollars", "7.5 mil", ...
+    return to_amount(salary_input)
 
 
 def calculate_salary_per_year():
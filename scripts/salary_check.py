@@ -1,10 +1,11 @@
-import re
+import os
+import sys
 
-def parse_salary(s):
-    return float(re.sub(r"[^\d.]", "", s.strip()))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-def parse_salary_list(salary_str):
-    return [parse_salary(s) for s in salary_str.split(",") if s.strip()]
+from league.trade_rules import RULES, matching_limit, formula as limit_formula
+from league.absorption import absorb, exception_bins
+from league.money import to_amount as parse_salary, parse_salary_list
 
 def lookup_team_name(abbr):
     teams = {
@@ -21,37 +22,14 @@ def lookup_team_name(abbr):
     }
     return teams.get(abbr.upper(), f"[Unknown: {abbr.upper()}]")
 
-def absorb_with_tpe_or_space(salaries, absorber_pool):
-    absorbed = []
-    remaining = []
-    available = absorber_pool
-
-    for s in salaries:
-        if s <= available + 250_000:
-            absorbed.append(s)
-            available -= s  # absorbed into TPE/space
-        else:
-            remaining.append(s)
-
-    return absorbed, remaining, absorber_pool - available
-
 def evaluate_legality(team_name, outgoing, incoming):
     if outgoing <= 0:
         print(f"❌ {team_name} has invalid outgoing salary.")
         return False, 0.0, "", 0.0
 
-    if outgoing <= 7_501_817.73:
-        limit = (outgoing * 2) + 250_000
-        rule = "Can bring back up to 200% more + $250,000"
-        formula = f"({outgoing:,.2f} × 2) + 250,000"
-    elif outgoing <= 30_007_270.94:
-        limit = outgoing + 7_751_817.73
-        rule = "Can bring back up to $7,751,817.73 more"
-        formula = f"{outgoing:,.2f} + 7,751,817.73"
-    else:
-        limit = (outgoing * 1.25) + 250_000
-        rule = "Can bring back up to 125% more + $250,000"
-        formula = f"({outgoing:,.2f} × 1.25) + 250,000"
+    limit, tier = matching_limit(outgoing)
+    rule = RULES[tier]
+    formula = limit_formula(outgoing, tier)
 
     delta = incoming - outgoing
     over = max(0, incoming - limit)
@@ -84,16 +62,26 @@ if __name__ == "__main__":
     charlotte_salaries = parse_salary_list(input(f"{team_a} is sending out: "))
     other_team_salaries = parse_salary_list(input(f"{team_b} is sending out: "))
 
-    tpe_input = input("\nEnter TPE or Cap Space amount available to Charlotte (or leave blank): ").strip()
-    tpe_pool = parse_salary(tpe_input) if tpe_input else 0.0
+    tpe_input = input("\nEnter Charlotte's TPE amounts, comma-separated (or leave blank): ").strip()
+    tpe_amounts = parse_salary_list(tpe_input) if tpe_input else []
+    space_input = input("Enter Charlotte's Cap Space available (or leave blank): ").strip()
+    cap_space = parse_salary(space_input) if space_input else 0.0
 
-    absorbed, remaining, absorbed_total = absorb_with_tpe_or_space(other_team_salaries, tpe_pool)
+    bins = exception_bins(tpe_amounts, cap_space)
+    result = absorb(other_team_salaries, bins)
+    absorbed = [s for s, b in zip(other_team_salaries, result.assignment) if b is not None]
+    remaining = result.remaining
+    absorbed_total = result.absorbed
 
     print(f"\n💼 TPE / Cap Space Application")
-    print(f"Available: ${tpe_pool:,.2f}")
+    print(f"Available: {', '.join(f'{b.label} ${b.amount:,.2f}' for b in bins) or 'none'}")
+    for b, bin_ in enumerate(bins):
+        used = [s for s, a in zip(other_team_salaries, result.assignment) if a == b]
+        if used:
+            print(f"  {bin_.label}: absorbs {[f'${s:,.2f}' for s in used]}")
     print(f"Absorbed Salaries: {[f'${s:,.2f}' for s in absorbed]}")
     print(f"Remaining for Matching: {[f'${s:,.2f}' for s in remaining]}")
-    print(f"Total Absorbed: ${absorbed_total:,.2f}")
+    print(f"Total Absorbed: ${absorbed_total:,.2f}{'' if result.optimal else ' (best effort, not proven optimal)'}")
 
     outgoing_total = sum(charlotte_salaries)
     incoming_total = sum(remaining)
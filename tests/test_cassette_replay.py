@@ -0,0 +1,65 @@
+import os
+import re
+import sys
+import subprocess
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+pytest.importorskip("openpyxl")
+
+from benchmarks.fake_joplin import FakeJoplin
+from benchmarks.fake_sheets import team_names, write_workbooks
+
+TEAMS = 3
+
+
+@pytest.fixture
+def server():
+    server = FakeJoplin().start()
+    server.seed_notes(team_names(TEAMS))
+    yield server
+    server.stop()
+
+
+def local_sync(tmp_path, server, *args):
+    env = dict(
+        os.environ,
+        JOPLIN_API=server.url,
+        JOPLIN_TOKEN="test",
+        JOPLIN_NOTEBOOK_ID=server.notebook_id,
+        SYNC_STATE_DIR=str(tmp_path / "sync_state"),
+        NOTE_INDEX_CACHE=str(tmp_path / "note_index.json"),
+        WORKBOOK_CACHE_DIR=str(tmp_path / "workbook_cache"),
+        SYNC_METRICS_DIR=str(tmp_path / "metrics"),
+    )
+    env.pop("SYNC_METRICS_TEXTFILE_DIR", None)
+    proc = subprocess.run(
+        [sys.executable, "-m", "joplin.utils.joplin_local_sync", *args],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    assert proc.returncode == 0, proc.stderr
+    return proc.stdout
+
+
+def pushed(output):
+    return sorted(re.findall(r"✅ Updated note (\w+)", output))
+
+
+def test_replay_pushes_the_recorded_teams(tmp_path, server):
+    workbooks = write_workbooks(str(tmp_path / "workbooks"), TEAMS)
+    cassette = str(tmp_path / "run.jsonl.gz")
+    state_file = tmp_path / "sync_state" / "joplin_local_sync.json"
+
+    recorded = local_sync(tmp_path, server, *workbooks, "--record", cassette)
+    assert len(pushed(recorded)) == TEAMS
+    state_after_record = state_file.read_text(encoding="utf-8")
+
+    replayed = local_sync(tmp_path, server, *workbooks, "--replay", cassette, "--replay-latency", "none")
+    assert pushed(replayed) == pushed(recorded)
+    assert "edited in Joplin" not in replayed
+    assert "unmatched" not in replayed
+    # The replay worked on a scratch copy of the recorded state
+    assert state_file.read_text(encoding="utf-8") == state_after_record
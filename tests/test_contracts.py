@@ -0,0 +1,28 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from league.contracts import Contracts, parse_raise
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("1", 0.01), ("1%", 0.01), ("5", 0.05), (" 5 % ", 0.05), ("0.5", 0.005), ("", 0.0), (None, 0.0),
+])
+def test_parse_raise_is_always_percent(text, expected):
+    assert parse_raise(text) == pytest.approx(expected)
+
+
+def test_from_csv_one_percent_raise(tmp_path):
+    path = tmp_path / "contracts.csv"
+    path.write_text(
+        "team,player,base_salary,start,years,raise_pct\n"
+        "Charlotte Hornets,Player One,\"$10,000,000\",2025–26,3,1\n",
+        encoding="utf-8",
+    )
+    contracts = Contracts.from_csv(str(path))
+    assert contracts.raises[0] == pytest.approx(0.01)
+    cap_hits = contracts.project(2025, seasons=3).cap_hits[0]
+    assert cap_hits == pytest.approx([10_000_000, 10_100_000, 10_200_000])